@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic PII CSVs for the benchmarks.
+
+Two shapes are generated:
+
+    narrow  id, name, email, phone, ssn, card_number, customer_identifier, amount
+    wide    the narrow columns plus a second email and phone, a date of birth
+            and 16 non-sensitive numeric/text columns (27 columns in total)
+
+Every sensitive kind the masker knows (email, phone, SSN, card, identifier,
+generic) is present. The same (shape, rows, seed) always produces the same
+bytes, so results from different commits are measured on identical input.
+
+Usage:
+    python benchmarks/generate_data.py --rows 1000000 --shape wide [--seed 0] [--out FILE]
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+
+SHAPES = ("narrow", "wide")
+
+_FIRST_NAMES = ("Alice", "Bob", "Carol", "Dave", "Erin", "Frank", "Grace", "Heidi", "Ivan", "Judy")
+_LAST_NAMES = ("Smith", "Jones", "Garcia", "Müller", "Nguyen", "O'Brien", "Kowalski", "Rossi")
+_DOMAINS = ("example.com", "mail.example.org", "corp.example.net")
+_CITIES = ("Springfield", "Riverside", "Fairview", "Kingston, NY", "Salem")
+
+_NARROW_HEADER = ["id", "name", "email", "phone", "ssn", "card_number", "customer_identifier", "amount"]
+_WIDE_EXTRA_HEADER = ["secondary_email", "work_phone", "dob"] + [f"metric_{i}" for i in range(12)] + [
+    "city",
+    "notes",
+    "status",
+    "score",
+]
+
+# Rows formatted per write; keeps memory flat for any row count
+_BATCH_ROWS = 10_000
+
+
+def header(shape: str) -> list[str]:
+    if shape not in SHAPES:
+        raise ValueError(f"Unknown shape: {shape!r} (expected one of {', '.join(SHAPES)})")
+    return _NARROW_HEADER + (_WIDE_EXTRA_HEADER if shape == "wide" else [])
+
+
+def _card_number(rng: random.Random) -> str:
+    """16-digit number with a valid Luhn check digit, grouped in fours."""
+    digits = [4] + [rng.randrange(10) for _ in range(14)]
+    total = 0
+    for i, digit in enumerate(reversed(digits)):
+        if i % 2 == 0:
+            digit *= 2
+            if digit > 9:
+                digit -= 9
+        total += digit
+    digits.append((10 - total % 10) % 10)
+    text = "".join(map(str, digits))
+    return " ".join(text[i : i + 4] for i in range(0, 16, 4))
+
+
+def _quote(value: str) -> str:
+    return f'"{value}"' if "," in value or '"' in value else value
+
+
+def _row(rng: random.Random, index: int, shape: str) -> str:
+    first, last = rng.choice(_FIRST_NAMES), rng.choice(_LAST_NAMES)
+    fields = [
+        str(index),
+        f"{first} {last}",
+        f"{first.lower()}.{index}@{rng.choice(_DOMAINS)}",
+        f"+1-{rng.randrange(200, 1000)}-{rng.randrange(200, 1000)}-{rng.randrange(10000):04d}",
+        f"{rng.randrange(100, 900):03d}-{rng.randrange(1, 100):02d}-{rng.randrange(1, 10000):04d}",
+        _card_number(rng),
+        f"CUST-{rng.randrange(16**8):08X}",
+        f"{rng.uniform(0, 10000):.2f}",
+    ]
+    if shape == "wide":
+        fields += [
+            # Every 10th secondary email is missing, so null handling is exercised too
+            "" if index % 10 == 0 else f"{last.lower()}{index}@{rng.choice(_DOMAINS)}",
+            f"({rng.randrange(200, 1000)}) {rng.randrange(200, 1000)}-{rng.randrange(10000):04d}",
+            f"{rng.randrange(1940, 2006)}-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}",
+        ]
+        fields += [str(rng.randrange(1_000_000)) for _ in range(6)]
+        fields += [f"{rng.random():.6f}" for _ in range(6)]
+        fields += [
+            rng.choice(_CITIES),
+            rng.choice(("", "follow up", "vip", "churn risk, call back")),
+            rng.choice(("active", "inactive", "pending")),
+            str(rng.randrange(101)),
+        ]
+    return ",".join(_quote(field) for field in fields)
+
+
+def generate_csv(output_path: Path, rows: int, shape: str = "narrow", seed: int = 0) -> Path:
+    """
+    Write a synthetic CSV with `rows` data rows.
+
+    Args:
+        output_path: File to write (parent directories are created).
+        rows: Number of data rows (the header is extra).
+        shape: "narrow" or "wide".
+        seed: Random seed; the same arguments always produce the same file.
+
+    Returns:
+        The output path.
+
+    Raises:
+        ValueError: If the shape is unknown or rows is negative.
+    """
+    columns = header(shape)
+    if rows < 0:
+        raise ValueError("rows must not be negative")
+    rng = random.Random(f"{shape}:{seed}")
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w", encoding="utf-8", newline="") as f:
+        f.write(",".join(columns) + "\n")
+        for start in range(0, rows, _BATCH_ROWS):
+            batch = range(start + 1, min(start + _BATCH_ROWS, rows) + 1)
+            f.write("\n".join(_row(rng, index, shape) for index in batch) + "\n")
+    return output_path
+
+
+def dataset_path(data_dir: Path, rows: int, shape: str, seed: int = 0) -> Path:
+    """Cached location of a generated dataset; generated on first use."""
+    path = data_dir / f"{shape}_{rows}_s{seed}.csv"
+    if not path.exists():
+        tmp_path = path.with_suffix(".csv.part")
+        generate_csv(tmp_path, rows, shape, seed)
+        tmp_path.replace(path)
+    return path
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic PII CSV.")
+    parser.add_argument("--rows", type=int, default=1000, help="Data rows to generate")
+    parser.add_argument("--shape", choices=SHAPES, default="narrow", help="Column layout")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--out", type=Path, help="Output file (default: <shape>_<rows>.csv)")
+    args = parser.parse_args()
+
+    path = generate_csv(args.out or Path(f"{args.shape}_{args.rows}.csv"), args.rows, args.shape, args.seed)
+    print(f"Wrote {path} ({path.stat().st_size / 1e6:.1f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
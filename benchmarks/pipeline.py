@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Per-stage benchmarks on synthetic PII CSVs.
+
+For every shape and row count (see generate_data.py) each stage is timed on its
+own, `--repeat` times:
+
+    read_csv          _read_csv_flexible (dialect sniffing + parse)
+    mask_dataframe    mask_dataframe on the parsed frame
+    checksum          generate_checksum of the input file
+    encrypt           encrypt_csv_output
+    decrypt           decrypt_csv_output (plain)
+    decrypt_masked    decrypt_csv_output(mask=True)
+    security_summary  render_file_security_summary from the masking stats
+
+The median and minimum seconds plus rows/s and MB/s (of the input file) are
+written with `--json`, together with the commit and library versions, so runs
+on different commits can be compared with `--compare`.
+
+Usage:
+    python benchmarks/pipeline.py [--rows 1000 10000 100000] [--shape narrow wide]
+                                  [--only read_csv mask_dataframe] [--repeat 3]
+                                  [--csv-engine c|pyarrow] [--json results.json]
+                                  [--compare baseline.json]
+
+Generated inputs are cached in --data-dir. The 10M-row datasets are about 1 GB
+(narrow) and 2.5 GB (wide) on disk, and read_csv/mask_dataframe hold the whole
+frame in memory.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from generate_data import SHAPES, dataset_path  # noqa: E402
+
+BENCHMARKS = (
+    "read_csv",
+    "mask_dataframe",
+    "checksum",
+    "encrypt",
+    "decrypt",
+    "decrypt_masked",
+    "security_summary",
+)
+
+DEFAULT_ROWS = (1_000, 10_000, 100_000)
+
+
+def _time(fn: Callable[[], object], repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _metadata() -> dict:
+    import numpy
+    import pandas
+
+    return {
+        "commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "pandas": pandas.__version__,
+        "numpy": numpy.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def _ensure_key() -> None:
+    """Encrypt/decrypt need a key; benchmarks use a throwaway one when ENCRYPTION_KEY is unset."""
+    from cryptography.fernet import Fernet
+
+    from src import config
+
+    if config.DEFAULT_KEY is None:
+        config.DEFAULT_KEY = Fernet.generate_key().decode()
+
+
+def _bench_dataset(csv_path: Path, rows: int, selected: list[str], repeat: int, work_dir: Path) -> dict:
+    """Time each selected benchmark on one input file."""
+    from src.decrypt_csv import decrypt_csv_output
+    from src.encrypt_csv import encrypt_csv_output
+    from src.generate_checksum import generate_checksum
+    from src.mask_sensitive_columns import MaskStats, _read_csv_flexible, mask_dataframe
+    from src.reporting import render_file_security_summary
+
+    size = csv_path.stat().st_size
+    df = stats = enc_path = None
+
+    def frame():
+        nonlocal df
+        if df is None:
+            df = _read_csv_flexible(csv_path)
+        return df
+
+    def mask_stats():
+        nonlocal stats
+        if stats is None:
+            stats = MaskStats()
+            mask_dataframe(frame(), stats=stats)
+        return stats
+
+    def encrypted():
+        nonlocal enc_path
+        if enc_path is None:
+            enc_path = encrypt_csv_output(csv_path, output_dir=work_dir)
+        return enc_path
+
+    cases = {
+        "read_csv": lambda: _read_csv_flexible(csv_path),
+        "mask_dataframe": lambda: mask_dataframe(frame()),
+        "checksum": lambda: generate_checksum(csv_path, output_dir=work_dir),
+        "encrypt": lambda: encrypt_csv_output(csv_path, output_dir=work_dir),
+        "decrypt": lambda: decrypt_csv_output(encrypted(), output_dir=work_dir),
+        "decrypt_masked": lambda: decrypt_csv_output(encrypted(), mask=True, output_dir=work_dir),
+        "security_summary": lambda: render_file_security_summary(
+            csv_path, mask_stats().to_dict(), True, "ok", work_dir
+        ),
+    }
+    # Inputs shared between cases are built before timing starts
+    setup = {"mask_dataframe": frame, "decrypt": encrypted, "decrypt_masked": encrypted, "security_summary": mask_stats}
+
+    results = {}
+    for name in selected:
+        if name in setup:
+            setup[name]()
+        timings = _time(cases[name], repeat)
+        median = statistics.median(timings)
+        results[name] = {
+            "median_s": round(median, 6),
+            "min_s": round(min(timings), 6),
+            "rows_per_s": round(rows / median, 1) if median > 0 else None,
+            "mb_per_s": round(size / 1e6 / median, 2) if median > 0 else None,
+        }
+    return results
+
+
+def _compare(results: dict, baseline: dict) -> None:
+    """Print median time ratios (current / baseline) for the cases both runs measured."""
+    print(f"\nCompared with {baseline['meta'].get('commit') or 'baseline'} (ratio < 1 is faster)")
+    for case, benches in results["cases"].items():
+        for name, current in benches.items():
+            before = baseline.get("cases", {}).get(case, {}).get(name)
+            if before and before["median_s"] > 0:
+                ratio = current["median_s"] / before["median_s"]
+                print(f"  {case:<16} {name:<18} {before['median_s']:>10.4f}s -> {current['median_s']:>10.4f}s  x{ratio:.2f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline stages on synthetic PII CSVs.")
+    parser.add_argument("--rows", type=int, nargs="+", default=list(DEFAULT_ROWS), help="Row counts to benchmark")
+    parser.add_argument("--shape", choices=SHAPES, nargs="+", default=list(SHAPES), help="Column layouts")
+    parser.add_argument("--only", choices=BENCHMARKS, nargs="+", default=list(BENCHMARKS), help="Benchmarks to run")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark (median is reported)")
+    parser.add_argument("--seed", type=int, default=0, help="Dataset seed")
+    parser.add_argument(
+        "--data-dir", type=Path, default=PROJECT_ROOT / "benchmarks" / "data", help="Generated dataset cache"
+    )
+    parser.add_argument("--csv-engine", choices=("c", "pyarrow"), default="c", help="config.CSV_ENGINE for read_csv")
+    parser.add_argument("--json", type=Path, help="Write results to this JSON file")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON from an earlier run to compare against")
+    args = parser.parse_args()
+
+    from src import config
+
+    _ensure_key()
+    config.CSV_ENGINE = args.csv_engine
+    results = {
+        "meta": {**_metadata(), "repeat": args.repeat, "seed": args.seed, "csv_engine": args.csv_engine},
+        "cases": {},
+    }
+
+    print(f"{'case':<16} {'benchmark':<18} {'median s':>10} {'rows/s':>12} {'MB/s':>8}")
+    for shape in args.shape:
+        for rows in args.rows:
+            case = f"{shape}/{rows}"
+            csv_path = dataset_path(args.data_dir, rows, shape, args.seed)
+            with tempfile.TemporaryDirectory() as work_dir:
+                benches = _bench_dataset(csv_path, rows, args.only, args.repeat, Path(work_dir))
+            results["cases"][case] = benches
+            for name, bench in benches.items():
+                print(f"{case:<16} {name:<18} {bench['median_s']:>10.4f} {bench['rows_per_s']:>12,.0f} {bench['mb_per_s']:>8.1f}")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Wrote {args.json}")
+    if args.compare:
+        _compare(results, json.loads(args.compare.read_text(encoding="utf-8")))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the pipeline entry points.
+
+Every entry point runs in a fresh interpreter `--repeat` times. The reported
+time is the median wall time minus the median of a bare `python -c pass`, i.e.
+what our imports and argument parsing cost on top of interpreter startup. A
+separate `-X importtime` run records which heavy third-party packages each
+entry point loads and the slowest packages it imports.
+
+Usage:
+    python benchmarks/startup.py [--repeat 7] [--json startup.json] [--check]
+
+With --check the exit code is 1 if an entry point exceeds its budget in
+BUDGET_MS or imports a package listed in HEAVY_MODULES that it should not need.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+ENTRY_POINTS = {
+    "import src.processor": ["-c", "import src.processor"],
+    "import src.decrypt_csv": ["-c", "import src.decrypt_csv"],
+    "import src.verify_file_integrity": ["-c", "import src.verify_file_integrity"],
+    "main.py --help": ["main.py", "--help"],
+    "python -m src.download_csv --help": ["-m", "src.download_csv", "--help"],
+}
+
+# Milliseconds above bare interpreter startup; generous enough for CI runners
+BUDGET_MS = {
+    "import src.processor": 250,
+    "import src.decrypt_csv": 150,
+    "import src.verify_file_integrity": 150,
+    "main.py --help": 300,
+    "python -m src.download_csv --help": 250,
+}
+
+# Loaded only by the stages that need them (masking, reports)
+HEAVY_MODULES = ("pandas", "numpy", "matplotlib")
+
+
+def _run(args: list[str], *extra: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *extra, *args],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def _median_ms(args: list[str], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _run(args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def _import_profile(args: list[str], top: int = 5) -> tuple[list[str], list[tuple[str, float]]]:
+    """Heavy packages imported, and the slowest packages imported outside src/ (cumulative ms)."""
+    stderr = _run(args, "-X", "importtime").stderr
+    by_package: dict[str, float] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # column header
+        package = name.strip().split(".")[0]
+        if package not in ("src", "site", "encodings"):
+            by_package[package] = max(by_package.get(package, 0.0), int(cumulative) / 1000)
+    heavy = sorted(package for package in by_package if package in HEAVY_MODULES)
+    slowest = sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+    return heavy, slowest
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure cold-start time of the pipeline entry points.")
+    parser.add_argument("--repeat", type=int, default=7, help="Runs per entry point (median is reported)")
+    parser.add_argument("--json", type=Path, help="Write results to this JSON file")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if a budget is exceeded")
+    args = parser.parse_args()
+
+    baseline = _median_ms(["-c", "pass"], args.repeat)
+    results = {"python": sys.version.split()[0], "baseline_ms": round(baseline, 1), "entry_points": {}}
+    failed = False
+
+    print(f"{'entry point':<36} {'ms':>8} {'budget':>8}  heavy imports")
+    for label, entry_args in ENTRY_POINTS.items():
+        elapsed = max(_median_ms(entry_args, args.repeat) - baseline, 0.0)
+        heavy, slowest = _import_profile(entry_args)
+        budget = BUDGET_MS[label]
+        ok = elapsed <= budget and not heavy
+        failed |= not ok
+        results["entry_points"][label] = {
+            "ms": round(elapsed, 1),
+            "budget_ms": budget,
+            "heavy_imports": heavy,
+            "slowest_imports_ms": {name: round(ms, 1) for name, ms in slowest},
+            "ok": ok,
+        }
+        print(f"{label:<36} {elapsed:>8.1f} {budget:>8}  {', '.join(heavy) or '-'}{'' if ok else '  <-- over budget'}")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Wrote {args.json}")
+    return 1 if args.check and failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
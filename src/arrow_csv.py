@@ -0,0 +1,140 @@
+"""
+Optional PyArrow CSV engine (config.CSV_ENGINE = "pyarrow").
+
+Files are parsed by Arrow's multi-threaded reader and text columns are kept as
+Arrow-backed `string[pyarrow]` columns instead of Python objects. Dates and
+timestamps are left as text, as the default pandas parser leaves them, so the
+masked output does not change with the engine.
+
+read_csv_arrow returns None whenever Arrow cannot parse a file the way pandas
+would (pyarrow missing, duplicate column names, unsupported encoding, malformed
+input...), and the caller falls back to the default parser.
+"""
+
+import io
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA_SAMPLE_BYTES = 64 * 1024
+# Same as pandas' default NA strings, so nulls are detected identically
+_NULL_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+_TRUE_VALUES = ["True", "TRUE", "true"]
+_FALSE_VALUES = ["False", "FALSE", "false"]
+
+_warned_missing = False
+
+
+def _pyarrow_csv():
+    global _warned_missing
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+    except ImportError:
+        if not _warned_missing:
+            logger.warning("CSV_ENGINE=pyarrow but pyarrow is not installed; using the default parser.")
+            _warned_missing = True
+        return None, None
+    return pa, pacsv
+
+
+def _invalid_row(row) -> str:
+    """
+    Match pandas' on_bad_lines="skip": rows with too many fields are dropped.
+    Rows with too few are padded with nulls by pandas, which Arrow cannot do,
+    so they fail the parse and the default parser is used instead.
+    """
+    return "skip" if row.actual_columns > row.expected_columns else "error"
+
+
+def _read_table(pa, pacsv, data: io.BytesIO | Path, dialect: dict, column_types: dict):
+    encoding = dialect["encoding"]
+    return pacsv.read_csv(
+        data,
+        # Arrow skips a UTF-8 BOM itself
+        read_options=pacsv.ReadOptions(encoding="utf8" if encoding.startswith("utf-8") else encoding),
+        parse_options=pacsv.ParseOptions(
+            delimiter=dialect["delimiter"],
+            invalid_row_handler=_invalid_row,
+        ),
+        convert_options=pacsv.ConvertOptions(
+            column_types=column_types,
+            null_values=_NULL_VALUES,
+            true_values=_TRUE_VALUES,
+            false_values=_FALSE_VALUES,
+            strings_can_be_null=True,
+        ),
+    )
+
+
+def _text_overrides(pa, schema) -> tuple[dict, list]:
+    """
+    Columns to read as text: dates/timestamps (pandas leaves them as text) and
+    floats (converted afterwards with pandas' number parser, which also accepts
+    forms Arrow reads differently, such as "+639..." integers). Returns the
+    column types and the names of the numeric ones.
+    """
+    types, numeric = {}, []
+    for field in schema:
+        if pa.types.is_temporal(field.type):
+            types[field.name] = pa.string()
+        elif pa.types.is_floating(field.type):
+            types[field.name] = pa.string()
+            numeric.append(field.name)
+    return types, numeric
+
+
+def read_csv_arrow(source: Path | bytes, dialect: dict) -> "pd.DataFrame | None":
+    """
+    Parse a CSV (path or raw bytes) with Arrow using a detected dialect.
+
+    Returns the frame with text columns as string[pyarrow], or None if the
+    default parser should be used instead.
+    """
+    import pandas as pd
+
+    pa, pacsv = _pyarrow_csv()
+    if pa is None:
+        return None
+
+    def data():
+        return io.BytesIO(source) if isinstance(source, bytes) else source
+
+    try:
+        # The overrides are found on a sample first, so this usually takes one full parse
+        head = source[:_SCHEMA_SAMPLE_BYTES] if isinstance(source, bytes) else _head(source)
+        if b"\n" in head:
+            head = head[: head.rindex(b"\n") + 1]
+        column_types, numeric = _text_overrides(pa, _read_table(pa, pacsv, io.BytesIO(head), dialect, {}).schema)
+        table = _read_table(pa, pacsv, data(), dialect, column_types)
+        late_types, late_numeric = _text_overrides(pa, table.schema)
+        if late_types:
+            column_types, numeric = {**column_types, **late_types}, numeric + late_numeric
+            table = _read_table(pa, pacsv, data(), dialect, column_types)
+    except (pa.ArrowException, UnicodeError, LookupError, ValueError) as exc:
+        logger.debug("Arrow could not parse the CSV (%s); using the default parser.", exc)
+        return None
+
+    if len(set(table.column_names)) != len(table.column_names):
+        return None  # pandas renames duplicate columns ("a", "a.1"); keep its behavior
+    string_dtype = pd.StringDtype("pyarrow")
+    df = table.to_pandas(types_mapper={pa.string(): string_dtype, pa.large_string(): string_dtype}.get)
+    for column in numeric:
+        try:
+            df[column] = pd.to_numeric(df[column].astype(object))
+        except (ValueError, TypeError):
+            pass  # not numeric after all: pandas would keep it as text too
+    return df
+
+
+def _head(path: Path) -> bytes:
+    with open(path, "rb") as f:
+        return f.read(_SCHEMA_SAMPLE_BYTES)
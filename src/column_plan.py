@@ -0,0 +1,136 @@
+"""
+Column classification shared by masking, masked decryption and reporting.
+
+A header is turned into a ColumnPlan: the sensitive columns, in header order,
+and the masking kind of each. Classification uses one compiled regex per kind
+(the generic one built from config.SENSITIVE_COLUMN_PATTERNS), and plans are
+cached by header, so files and chunks that share a schema classify it once.
+"""
+
+import hashlib
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, Iterable
+
+from . import config
+
+# Masking kinds in priority order (a column gets the first that matches) and the
+# name fragments that select them; anything else matching the configured
+# patterns is "generic"
+_KIND_KEYWORDS = (
+    ("email", ("email",)),
+    ("ssn", ("ssn", "social_security")),
+    ("card", ("credit_card", "cc_number", "card_number")),
+    ("phone", ("phone",)),
+    ("identifier", ("identifier", "id_number", "student_id", "studentid")),
+)
+
+# Report table rows, in order, and the masking kind each one shows
+KIND_LABELS = {
+    "SSN": "ssn",
+    "Email": "email",
+    "Credit Card": "card",
+    "Phone": "phone",
+    "Identifier": "identifier",
+}
+
+# Plans kept for this many distinct headers
+_PLAN_CACHE_SIZE = 256
+
+
+def _keywords_regex(keywords: Iterable[str]) -> re.Pattern | None:
+    keywords = [keyword for keyword in keywords if keyword]
+    return re.compile("|".join(map(re.escape, keywords))) if keywords else None
+
+
+_KIND_REGEXES = tuple((kind, _keywords_regex(keywords)) for kind, keywords in _KIND_KEYWORDS)
+
+
+def _normalize(column_name: Hashable) -> str:
+    return str(column_name).lower().replace(" ", "_").replace("-", "_")
+
+
+@dataclass(frozen=True)
+class ColumnPlan:
+    """The sensitive columns of one header, in header order, as (column, kind) pairs."""
+
+    columns: tuple[tuple[Hashable, str], ...]
+
+
+class _Classifier:
+    """Compiled classification for one set of generic patterns."""
+
+    def __init__(self, patterns: tuple[str, ...]):
+        self.patterns = patterns
+        self._generic = _keywords_regex(pattern.lower() for pattern in patterns)
+
+    def kind(self, column_name: Hashable) -> str | None:
+        name = _normalize(column_name)
+        for kind, regex in _KIND_REGEXES:
+            if regex.search(name):
+                return kind
+        if self._generic is not None and self._generic.search(name):
+            return "generic"
+        return None
+
+
+_classifier: _Classifier | None = None
+_plans: "OrderedDict[str, ColumnPlan]" = OrderedDict()
+
+
+def _current_classifier() -> _Classifier:
+    """Classifier for the configured patterns, recompiled (and plans dropped) when they change."""
+    global _classifier
+    patterns = tuple(config.SENSITIVE_COLUMN_PATTERNS)
+    if _classifier is None or _classifier.patterns != patterns:
+        _classifier = _Classifier(patterns)
+        _plans.clear()
+    return _classifier
+
+
+def classify_column(column_name: Hashable) -> str | None:
+    """Masking kind of one column ("email", "ssn", "card", "phone", "identifier", "generic"), or None."""
+    return _current_classifier().kind(column_name)
+
+
+def header_key(columns: Iterable[Hashable]) -> str:
+    """Stable hash of a header; files with the same columns in the same order share it."""
+    digest = hashlib.sha256()
+    for column in columns:
+        digest.update(repr(column).encode("utf-8", "surrogatepass"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def column_plan(columns: Iterable[Hashable]) -> ColumnPlan:
+    """
+    Masking plan for a header (e.g. DataFrame.columns), cached by header hash.
+
+    Args:
+        columns: Column names in header order.
+
+    Returns:
+        The ColumnPlan listing the sensitive columns and their kinds.
+    """
+    columns = list(columns)
+    classifier = _current_classifier()
+    key = header_key(columns)
+    plan = _plans.get(key)
+    if plan is not None:
+        _plans.move_to_end(key)
+        return plan
+
+    plan = ColumnPlan(tuple((column, kind) for column in columns if (kind := classifier.kind(column)) is not None))
+    _plans[key] = plan
+    if len(_plans) > _PLAN_CACHE_SIZE:
+        _plans.popitem(last=False)
+    return plan
+
+
+def extend_plan(plan: ColumnPlan, columns: Iterable[Hashable], kinds: dict) -> ColumnPlan:
+    """`plan` plus the extra {column: kind} classifications (e.g. from content detection), in header order."""
+    if not kinds:
+        return plan
+    merged = {**kinds, **dict(plan.columns)}
+    return ColumnPlan(tuple((column, merged[column]) for column in columns if column in merged))
@@ -14,6 +14,16 @@ LOG_DIR = PROJECT_ROOT / "logs"
 _key = os.environ.get("ENCRYPTION_KEY") or ""
 DEFAULT_KEY = _key.strip() or None
 
+# Envelope encryption: each .bin file has its own random data key, wrapped by the current
+# master key (ENCRYPTION_KEY) under ENCRYPTION_KEY_ID (defaults to a fingerprint of the key).
+# Retired master keys, still needed to decrypt or rotate older files, are listed in
+# ENCRYPTION_KEYRING as "id:key,id:key"
+ENCRYPTION_KEY_ID = os.environ.get("ENCRYPTION_KEY_ID", "").strip() or None
+ENCRYPTION_KEYRING = os.environ.get("ENCRYPTION_KEYRING", "")
+
+# Plaintext bytes per independently encrypted frame in .bin files
+ENCRYPTION_CHUNK_SIZE = 1024 * 1024
+
 # Columns to mask (case-insensitive partial match)
 SENSITIVE_COLUMN_PATTERNS = [
     "ssn", "social_security", "credit_card", "cc_number", "card_number",
@@ -21,9 +31,62 @@ SENSITIVE_COLUMN_PATTERNS = [
     "student_id", "studentid", "id_number", "identifier", "answer"
 ]
 
+# Optional content detection: columns whose names match no pattern are classified from a
+# random sample of at most CONTENT_SAMPLE_ROWS rows (seeded, so runs are reproducible)
+# once CONTENT_HIT_RATIO of the sampled non-null values look like emails, phones,
+# SSNs or (Luhn-valid) card numbers
+CONTENT_DETECTION = os.environ.get("CONTENT_DETECTION", "").lower() in ("true", "1", "yes")
+CONTENT_SAMPLE_ROWS = int(os.environ.get("CONTENT_SAMPLE_ROWS", 1000))
+CONTENT_HIT_RATIO = float(os.environ.get("CONTENT_HIT_RATIO", 0.8))
+CONTENT_SAMPLE_SEED = 0
+
+# CSV parser for whole-file reads: "c" (pandas' default) or "pyarrow" (multi-threaded,
+# text kept as string[pyarrow]; falls back to "c" for files Arrow cannot parse).
+# Streamed files always use the default parser
+CSV_ENGINE = os.environ.get("CSV_ENGINE", "c")
+
+# Inputs larger than this are streamed in chunks of MASK_CHUNK_ROWS rows instead of
+# being loaded into memory whole
+STREAMING_THRESHOLD_BYTES = int(os.environ.get("STREAMING_THRESHOLD_BYTES", 256 * 1024 * 1024))
+MASK_CHUNK_ROWS = 100_000
+
+# Masked output: "csv" (<stem>_masked.csv), "parquet" (<stem>_masked.parquet, needs
+# pyarrow) or "both"; the masked checksum covers each file written
+MASKED_OUTPUT_FORMAT = os.environ.get("MASKED_OUTPUT_FORMAT", "csv")
+PARQUET_COMPRESSION = "zstd"
+PARQUET_ROW_GROUP_ROWS = MASK_CHUNK_ROWS
+
 # Checksum file extension
 CHECKSUM_EXT = ".checksum"
 
+# Checksum file format: "sha256" (one digest) or "merkle" (per-block digests, hashed on
+# CHECKSUM_THREADS threads, that let a failed verification report which ranges changed)
+CHECKSUM_FORMAT = os.environ.get("CHECKSUM_FORMAT", "sha256")
+MERKLE_BLOCK_SIZE = 1024 * 1024
+CHECKSUM_THREADS = os.cpu_count() or 1
+
+# Watch mode (--watch): poll interval, and how long a file's size and mtime must stay
+# the same before it is treated as completely written
+WATCH_POLL_SECONDS = float(os.environ.get("WATCH_POLL_SECONDS", 0.1))
+WATCH_SETTLE_SECONDS = float(os.environ.get("WATCH_SETTLE_SECONDS", 0.3))
+
+# Downloads (src.download_csv): concurrent downloads for --manifest, connections per host,
+# socket timeout, and retries after connection errors, timeouts and 408/429/5xx
+# responses (waiting DOWNLOAD_RETRY_BACKOFF seconds, doubled after each retry)
+DOWNLOAD_WORKERS = int(os.environ.get("DOWNLOAD_WORKERS", 8))
+DOWNLOAD_PER_HOST = int(os.environ.get("DOWNLOAD_PER_HOST", 2))
+DOWNLOAD_TIMEOUT = float(os.environ.get("DOWNLOAD_TIMEOUT", 30))
+DOWNLOAD_RETRIES = int(os.environ.get("DOWNLOAD_RETRIES", 3))
+DOWNLOAD_RETRY_BACKOFF = 0.5
+# Downloads larger than this many bytes are aborted (0 = no limit)
+DOWNLOAD_MAX_BYTES = int(os.environ.get("DOWNLOAD_MAX_BYTES", 0))
+# Per-directory record of downloaded files and the checksums computed while
+# streaming them, so the pipeline does not hash them again
+DOWNLOAD_RECORDS_NAME = ".downloads.json"
+
 # Pipeline reporting outputs
 SUMMARY_JSON_NAME = "pipeline_summary.json"
 SUMMARY_PNG_NAME = "pipeline_summary.png"
+
+# Incremental runs: per-file fingerprints of the last successful run
+RUN_MANIFEST_NAME = "run_manifest.json"
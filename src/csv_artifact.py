@@ -0,0 +1,45 @@
+"""In-memory per-file artifact shared by the pipeline stages (one disk read per input)."""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+
+@dataclass
+class CsvArtifact:
+    """
+    Raw bytes of one CSV plus everything derived from them during a pipeline run.
+
+    Stages that accept a CsvArtifact in place of a path use `raw` instead of reading
+    the file again, and fill in the parsed/masked fields for the stages after them.
+    """
+
+    path: Path
+    raw: bytes
+    dialect: dict | None = None
+    frame: Any = None  # pandas.DataFrame once parsed
+    masked: Any = None  # masked pandas.DataFrame
+    masked_path: Path | None = None
+    masked_raw: bytes | None = None
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+    @property
+    def stem(self) -> str:
+        return self.path.stem
+
+    def masked_artifact(self) -> "CsvArtifact":
+        """Artifact for the masked output, so it can be checksummed without re-reading it."""
+        if self.masked_path is None or self.masked_raw is None:
+            raise ValueError(f"No masked output recorded for {self.name}")
+        return CsvArtifact(path=self.masked_path, raw=self.masked_raw, frame=self.masked)
+
+
+def load_csv_artifact(csv_file: str | Path) -> CsvArtifact:
+    """Read a CSV file once into a CsvArtifact."""
+    csv_path = Path(csv_file)
+    if not csv_path.exists():
+        raise FileNotFoundError(f"CSV file not found: {csv_path}")
+    return CsvArtifact(path=csv_path, raw=csv_path.read_bytes())
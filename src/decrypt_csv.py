@@ -2,19 +2,30 @@
 """Decrypt CSV file output."""
 
 import io
+import shutil
 from pathlib import Path
+from typing import BinaryIO
 
-import pandas as pd
-from cryptography.fernet import Fernet, InvalidToken
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
 
 from . import config
-from .mask_sensitive_columns import mask_dataframe
+from .encrypted_format import MAGIC, is_framed, open_decrypted
+from .key_ring import configured_key_ring
+
+# pandas (via mask_sensitive_columns) is only imported when rows are parsed or masked,
+# so plain decryption stays cheap to start
 
 
 def decrypt_csv_output(csv_file: str | Path, mask: bool = False, output_dir: Path | None = None) -> Path:
     """
     Decrypt an encrypted CSV file and save the plaintext output.
 
+    Both the chunked, framed format written by encrypt_csv_output and legacy
+    single-token Fernet files are accepted. The master key is picked from the
+    key ring by the ID in the file's header. Framed files are decrypted frame by
+    frame straight to disk; with `mask=True` the plaintext is masked in row
+    chunks as it is decrypted, so it is never held in memory whole.
+
     Args:
         csv_file: Path to the encrypted file (.bin) to decrypt.
         mask: If True, mask sensitive columns. If False, keep data unmasked (default).
@@ -27,14 +38,7 @@ def decrypt_csv_output(csv_file: str | Path, mask: bool = False, output_dir: Pat
         ValueError: If decryption key is not configured or decryption fails.
         FileNotFoundError: If the encrypted file does not exist.
     """
-    encrypted_path = Path(csv_file)
-    if not encrypted_path.exists():
-        raise FileNotFoundError(f"Encrypted file not found: {encrypted_path}")
-
-    if config.DEFAULT_KEY is None:
-        raise ValueError(
-            "Decryption key not configured. Set ENCRYPTION_KEY environment variable."
-        )
+    encrypted_path = _check_encrypted_input(csv_file)
 
     # Determine output filename based on mask parameter
     stem = encrypted_path.stem.replace('_encrypted', '')
@@ -46,24 +50,145 @@ def decrypt_csv_output(csv_file: str | Path, mask: bool = False, output_dir: Pat
     
     target_dir.mkdir(parents=True, exist_ok=True)
 
-    key = config.DEFAULT_KEY
-    fernet = Fernet(key.encode() if isinstance(key, str) else key)
+    # Stream to a temporary file so a failed frame never leaves partial plaintext behind
+    tmp_path = output_path.with_name(output_path.name + ".part")
+    try:
+        if mask:
+            _mask_decrypted(encrypted_path, tmp_path)
+        else:
+            with _open_plaintext(encrypted_path) as plaintext, open(tmp_path, "wb") as out:
+                shutil.copyfileobj(plaintext, out, config.ENCRYPTION_CHUNK_SIZE)
+        tmp_path.replace(output_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    return output_path
+
+
+def decrypt_byte_range(csv_file: str | Path, start: int, end: int | None = None) -> bytes:
+    """
+    Decrypt only plaintext bytes [start, end) of an encrypted file.
+
+    For framed files only the frames overlapping the range are read and
+    authenticated, so a few KB can be pulled from a multi-GB file cheaply.
+
+    Args:
+        csv_file: Path to the encrypted file (.bin).
+        start: First plaintext byte offset to return.
+        end: Offset one past the last byte to return (defaults to end of file).
+
+    Returns:
+        The decrypted bytes (shorter than requested if the range runs past the end).
+
+    Raises:
+        ValueError: If decryption key is not configured, the range is invalid or decryption fails.
+        FileNotFoundError: If the encrypted file does not exist.
+    """
+    if start < 0 or (end is not None and end < start):
+        raise ValueError(f"Invalid byte range: [{start}, {end})")
+    encrypted_path = _check_encrypted_input(csv_file)
+    with _open_plaintext(encrypted_path, start, end) as plaintext:
+        return plaintext.read()
+
+
+def decrypt_rows(csv_file: str | Path, start: int, stop: int | None = None, mask: bool = False):
+    """
+    Decrypt and parse only data rows [start, stop) of an encrypted CSV.
+
+    Rows can span frames (and quoted fields can hold newlines), so the plaintext
+    is streamed from the beginning, but decryption stops as soon as the last
+    requested row has been parsed and nothing else is kept in memory.
+
+    Args:
+        csv_file: Path to the encrypted file (.bin).
+        start: Index of the first data row (0 is the row after the header).
+        stop: Index one past the last row to return (defaults to all remaining rows).
+        mask: If True, mask sensitive columns of the returned rows.
+
+    Returns:
+        pandas DataFrame holding the requested rows, indexed from `start`.
+
+    Raises:
+        ValueError: If decryption key is not configured, the range is invalid or decryption fails.
+        FileNotFoundError: If the encrypted file does not exist.
+    """
+    import pandas as pd
+    from .mask_sensitive_columns import _read_options, mask_dataframe
+
+    if start < 0 or (stop is not None and stop < start):
+        raise ValueError(f"Invalid row range: [{start}, {stop})")
+    encrypted_path = _check_encrypted_input(csv_file)
+    dialect = _plaintext_dialect(encrypted_path)
+    with _open_plaintext(encrypted_path) as plaintext:
+        df = pd.read_csv(
+            plaintext,
+            # A callable, not range(): pandas would build a set of `start` row numbers
+            skiprows=lambda row: 0 < row <= start,
+            nrows=None if stop is None else stop - start,
+            **_read_options(dialect),
+        )
+    df.index = pd.RangeIndex(start, start + len(df))
+    return mask_dataframe(df, inplace=True) if mask else df
+
+
+def _check_encrypted_input(csv_file: str | Path) -> Path:
+    encrypted_path = Path(csv_file)
+    if not encrypted_path.exists():
+        raise FileNotFoundError(f"Encrypted file not found: {encrypted_path}")
+    if config.DEFAULT_KEY is None and not config.ENCRYPTION_KEYRING.strip():
+        raise ValueError(
+            "Decryption key not configured. Set ENCRYPTION_KEY environment variable."
+        )
+    return encrypted_path
+
+
+def _open_plaintext(encrypted_path: Path, start: int = 0, end: int | None = None) -> BinaryIO:
+    """Binary stream of the plaintext; framed files are decrypted lazily, legacy tokens up front."""
+    with open(encrypted_path, "rb") as f:
+        framed = is_framed(f.read(len(MAGIC)))
+    if framed:
+        return open_decrypted(encrypted_path, configured_key_ring(), start, end)
+    return io.BytesIO(_decrypt_legacy_token(encrypted_path)[start:end])
+
+
+def _plaintext_dialect(encrypted_path: Path) -> dict:
+    """Detect the CSV dialect from the first decrypted frame(s)."""
+    from .mask_sensitive_columns import _SNIFF_BYTES, _streaming_dialect
+
+    with _open_plaintext(encrypted_path, 0, _SNIFF_BYTES) as plaintext:
+        return _streaming_dialect(plaintext.read())
+
+
+def _mask_decrypted(encrypted_path: Path, output_path: Path) -> None:
+    """Mask while decrypting: plaintext chunks are parsed and masked row chunk by row chunk."""
+    from .mask_sensitive_columns import _mask_csv_chunked, _read_options
+
+    dialect = _plaintext_dialect(encrypted_path)
+    _mask_csv_chunked(
+        lambda: _open_plaintext(encrypted_path),
+        output_path,
+        _read_options(dialect),
+        config.MASK_CHUNK_ROWS,
+    )
+
+
+def _decrypt_legacy_token(encrypted_path: Path) -> bytes:
+    """
+    Decrypt a file written as one Fernet token (format used before framed files).
+
+    The token does not name its master key, so every key in the ring is tried,
+    the current one first.
+    """
+    ring = configured_key_ring()
+    if not ring.keys:
+        raise ValueError("Decryption key not configured. Set ENCRYPTION_KEY environment variable.")
+    keys = [key for _, key in sorted(ring.keys.items(), key=lambda item: item[0] != ring.current_id)]
+    fernet = MultiFernet([Fernet(key.encode()) for key in keys])
 
     with open(encrypted_path, "rb") as f:
         encrypted_data = f.read()
 
     try:
-        decrypted_data = fernet.decrypt(encrypted_data)
+        return fernet.decrypt(encrypted_data)
     except InvalidToken:
         raise ValueError("Decryption failed. Invalid or wrong encryption key.")
-
-    # If masking is requested, mask the sensitive columns
-    if mask:
-        df = pd.read_csv(io.BytesIO(decrypted_data))
-        df = mask_dataframe(df)
-        decrypted_data = df.to_csv(index=False).encode('utf-8')
-
-    with open(output_path, "wb") as f:
-        f.write(decrypted_data)
-
-    return output_path
@@ -1,46 +1,347 @@
-"""Download an external CSV file into input folder."""
+"""Download external CSV files into input folder."""
 
 import argparse
+import json
 import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from http.client import IncompleteRead
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlsplit
 from urllib.request import Request, urlopen
 
 from . import config
+from .download_records import current_record, record_download
+from .generate_checksum import _BLOCK_SIZE, _StreamingChecksum
 
 DEFAULT_DATASET_URL = "https://raw.githubusercontent.com/mwaskom/seaborn-data/master/tips.csv"
 
+# HTTP statuses worth another attempt; other HTTP errors fail at once
+_RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
 logger = logging.getLogger(__name__)
 
 
-def download_csv(url: str = DEFAULT_DATASET_URL, output_file: str | Path | None = None) -> Path:
-    """Download a CSV file from URL and save into input directory."""
+def _fetch(
+    url: str,
+    destination: Path,
+    timeout: float,
+    max_bytes: int,
+    force: bool = False,
+) -> tuple[int, str, bool]:
+    """
+    Stream `url` to `destination`, hashing it on the way.
+
+    The body is written in blocks to `<destination>.part`, which replaces
+    `destination` only once complete, so readers never see a partial file.
+    Unless `force`, a destination that still holds an earlier download of
+    `url` is revalidated with If-None-Match / If-Modified-Since. On a 304, or
+    when the body turns out identical, the file is left untouched (mtime too).
+
+    Returns:
+        (bytes transferred, SHA-256 of the content as generate_checksum
+        computes it, whether the destination was written).
+    """
+    current = None if force else current_record(destination, url)
+    headers = {"User-Agent": "csv-pipeline/1.0"}
+    if current is not None:
+        if current.get("etag"):
+            headers["If-None-Match"] = current["etag"]
+        if current.get("last_modified"):
+            headers["If-Modified-Since"] = current["last_modified"]
+
+    part_path = destination.with_name(destination.name + ".part")
+    hasher = _StreamingChecksum()
+    size = 0
+    try:
+        with urlopen(Request(url, headers=headers), timeout=timeout) as response:
+            length = response.headers.get("Content-Length")
+            if max_bytes and length and length.isdigit() and int(length) > max_bytes:
+                raise ValueError(f"Download from {url} is {int(length)} bytes, over the {max_bytes} byte limit")
+            etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+            with open(part_path, "wb") as f:
+                while block := response.read(_BLOCK_SIZE):
+                    size += len(block)
+                    if max_bytes and size > max_bytes:
+                        raise ValueError(f"Download from {url} exceeds the {max_bytes} byte limit")
+                    hasher.update(block)
+                    f.write(block)
+
+        if not size:
+            raise ValueError(f"Downloaded file is empty from URL: {url}")
+        checksum = hasher.hexdigest()
+        written = current is None or checksum != current["sha256"]
+        if written:
+            os.replace(part_path, destination)
+        else:
+            part_path.unlink()  # same content as the file already there
+    except HTTPError as exc:
+        part_path.unlink(missing_ok=True)
+        if exc.code == 304 and current is not None:
+            return 0, current["sha256"], False
+        raise
+    except BaseException:
+        part_path.unlink(missing_ok=True)
+        raise
+
+    record_download(destination, url, checksum, etag, last_modified)
+    return size, checksum, written
+
+
+def _retryable(exc: Exception) -> bool:
+    if isinstance(exc, HTTPError):
+        return exc.code in _RETRY_STATUSES
+    # Connection errors, timeouts (URLError wraps the socket errors) and bodies cut short
+    return isinstance(exc, (URLError, TimeoutError, ConnectionError, IncompleteRead))
+
+
+def download_csv(
+    url: str = DEFAULT_DATASET_URL,
+    output_file: str | Path | None = None,
+    timeout: float | None = None,
+    max_bytes: int | None = None,
+    force: bool = False,
+) -> Path:
+    """
+    Download a CSV file from URL and save into input directory.
+
+    The file is streamed to disk and its checksum computed on the way (see
+    download_records). Downloads over `max_bytes` (defaults to
+    config.DOWNLOAD_MAX_BYTES; 0 means no limit) raise ValueError. If the
+    output file still holds an earlier download of `url` and the server
+    reports it unchanged, the file is not rewritten (pass `force` to download
+    it regardless).
+    """
     config.INPUT_DIR.mkdir(parents=True, exist_ok=True)
 
     destination = Path(output_file) if output_file else (config.INPUT_DIR / "external_dataset.csv")
     destination.parent.mkdir(parents=True, exist_ok=True)
 
-    request = Request(url, headers={"User-Agent": "csv-pipeline/1.0"})
-    with urlopen(request, timeout=30) as response:
-        content = response.read()
+    _, _, written = _fetch(
+        url,
+        destination,
+        config.DOWNLOAD_TIMEOUT if timeout is None else timeout,
+        config.DOWNLOAD_MAX_BYTES if max_bytes is None else max_bytes,
+        force,
+    )
+    if written:
+        logger.info("Downloaded CSV from %s to %s", url, destination)
+    else:
+        logger.info("%s is unchanged upstream; kept %s", url, destination)
+    return destination
 
-    if not content:
-        raise ValueError(f"Downloaded file is empty from URL: {url}")
 
-    destination.write_bytes(content)
-    logger.info("Downloaded CSV from %s to %s", url, destination)
-    return destination
+def load_manifest(manifest_file: str | Path) -> list[tuple[str, Path]]:
+    """
+    Read a download manifest.
+
+    The manifest is JSON: either an object mapping URL to destination, or a list
+    of {"url": ..., "output": ...} objects. Relative destinations are resolved
+    against config.INPUT_DIR.
+
+    Args:
+        manifest_file: Path to the manifest.
+
+    Returns:
+        (url, destination) pairs in manifest order.
+
+    Raises:
+        FileNotFoundError: If the manifest does not exist.
+        ValueError: If the manifest is malformed or two URLs share a destination.
+    """
+    manifest_file = Path(manifest_file)
+    if not manifest_file.exists():
+        raise FileNotFoundError(f"Download manifest not found: {manifest_file}")
+    try:
+        data = json.loads(manifest_file.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"Download manifest is not valid JSON: {manifest_file} ({exc})") from exc
+
+    if isinstance(data, dict):
+        entries = list(data.items())
+    elif isinstance(data, list) and all(isinstance(entry, dict) for entry in data):
+        entries = [(entry.get("url"), entry.get("output")) for entry in data]
+    else:
+        raise ValueError(f"Download manifest must be a JSON object or a list of objects: {manifest_file}")
+
+    pairs, seen = [], set()
+    for url, output in entries:
+        if not isinstance(url, str) or not url or not isinstance(output, str) or not output:
+            raise ValueError(f"Download manifest entry needs a url and an output: {url!r} -> {output!r}")
+        destination = Path(output)
+        if not destination.is_absolute():
+            destination = config.INPUT_DIR / destination
+        if destination in seen:
+            raise ValueError(f"Download manifest writes {destination} more than once")
+        seen.add(destination)
+        pairs.append((url, destination))
+    return pairs
+
+
+class _HostLimits:
+    """One semaphore per host, so no host gets more than `per_host` connections at once."""
+
+    def __init__(self, per_host: int):
+        self.per_host = per_host
+        self._lock = threading.Lock()
+        self._semaphores: dict[str, threading.Semaphore] = {}
+
+    def __call__(self, url: str) -> threading.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.Semaphore(self.per_host)
+            return self._semaphores[host]
+
+
+def _download_one(
+    url: str,
+    destination: Path,
+    host_limits: _HostLimits,
+    timeout: float,
+    max_bytes: int,
+    retries: int,
+    backoff: float,
+    force: bool,
+) -> dict:
+    result = {"url": url, "output": str(destination), "status": "failed", "bytes": 0, "attempts": 0}
+    started = time.perf_counter()
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    for attempt in range(retries + 1):
+        result["attempts"] = attempt + 1
+        try:
+            with host_limits(url):
+                result["bytes"], result["sha256"], written = _fetch(url, destination, timeout, max_bytes, force)
+        except Exception as exc:
+            result["error"] = f"{type(exc).__name__}: {exc}"
+            if attempt < retries and _retryable(exc):
+                logger.warning("Download of %s failed (%s); retrying", url, result["error"])
+                time.sleep(backoff * 2**attempt)  # outside the host slot, so others can use it
+                continue
+            logger.error("Download of %s failed: %s", url, result["error"])
+            break
+        result["status"] = "ok" if written else "unchanged"
+        result.pop("error", None)
+        break
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def download_many(
+    pairs: list[tuple[str, str | Path]],
+    workers: int | None = None,
+    per_host: int | None = None,
+    timeout: float | None = None,
+    max_bytes: int | None = None,
+    retries: int | None = None,
+    backoff: float | None = None,
+    force: bool = False,
+) -> list[dict]:
+    """
+    Download several URLs concurrently.
+
+    Args:
+        pairs: (url, destination) pairs, e.g. from load_manifest.
+        workers: Downloads in flight at once (defaults to config.DOWNLOAD_WORKERS).
+        per_host: Connections at once to any one host (defaults to config.DOWNLOAD_PER_HOST).
+        timeout: Socket timeout in seconds per attempt (defaults to config.DOWNLOAD_TIMEOUT).
+        max_bytes: Size limit per file (defaults to config.DOWNLOAD_MAX_BYTES; 0 means no limit).
+        retries: Further attempts after a connection error, timeout or 408/429/5xx
+            response (defaults to config.DOWNLOAD_RETRIES).
+        backoff: Seconds before the first retry, doubled for each later one
+            (defaults to config.DOWNLOAD_RETRY_BACKOFF).
+        force: Download every URL in full, without conditional requests.
+
+    Returns:
+        One result per pair, in input order: url, output, status ("ok",
+        "unchanged" when the existing file was kept, or "failed"), bytes
+        transferred, sha256 (unless failed), seconds (including retries),
+        attempts and, for failures, error. A failed URL does not stop the others.
+    """
+    workers = config.DOWNLOAD_WORKERS if workers is None else workers
+    per_host = config.DOWNLOAD_PER_HOST if per_host is None else per_host
+    if workers < 1 or per_host < 1:
+        raise ValueError("workers and per_host must be at least 1")
+    timeout = config.DOWNLOAD_TIMEOUT if timeout is None else timeout
+    max_bytes = config.DOWNLOAD_MAX_BYTES if max_bytes is None else max_bytes
+    retries = config.DOWNLOAD_RETRIES if retries is None else retries
+    backoff = config.DOWNLOAD_RETRY_BACKOFF if backoff is None else backoff
+
+    host_limits = _HostLimits(per_host)
+    with ThreadPoolExecutor(max_workers=min(workers, max(len(pairs), 1))) as pool:
+        futures = [
+            pool.submit(_download_one, url, Path(destination), host_limits, timeout, max_bytes, retries, backoff, force)
+            for url, destination in pairs
+        ]
+        return [future.result() for future in futures]
+
+
+def _print_report(results: list[dict], wall_s: float) -> None:
+    """Per-URL table, slowest first, so slow sources stand out."""
+    print(f"{'status':<7} {'bytes':>12} {'seconds':>8} {'tries':>5}  url")
+    for result in sorted(results, key=lambda r: r["seconds"], reverse=True):
+        line = f"{result['status']:<7} {result['bytes']:>12,} {result['seconds']:>8.3f} {result['attempts']:>5}  {result['url']}"
+        if result["status"] == "failed":
+            line += f"  ({result['error']})"
+        print(line)
+    total = sum(result["bytes"] for result in results)
+    unchanged = sum(result["status"] == "unchanged" for result in results)
+    failed = sum(result["status"] == "failed" for result in results)
+    print(f"{len(results)} URL(s), {total:,} bytes in {wall_s:.2f}s, {unchanged} unchanged, {failed} failed")
 
 
 def main() -> int:
-    parser = argparse.ArgumentParser(description="Download an external CSV file.")
+    parser = argparse.ArgumentParser(description="Download external CSV files.")
     parser.add_argument("--url", default=DEFAULT_DATASET_URL, help="CSV URL to download")
     parser.add_argument("--output", default=str(config.INPUT_DIR / "external_dataset.csv"), help="Output file path")
+    parser.add_argument(
+        "--manifest",
+        help="JSON manifest of URL -> destination pairs to download concurrently (replaces --url/--output)",
+    )
+    parser.add_argument("--workers", type=int, default=config.DOWNLOAD_WORKERS, help="Concurrent downloads")
+    parser.add_argument("--per-host", type=int, default=config.DOWNLOAD_PER_HOST, help="Concurrent downloads per host")
+    parser.add_argument("--timeout", type=float, default=config.DOWNLOAD_TIMEOUT, help="Socket timeout in seconds")
+    parser.add_argument(
+        "--max-bytes", type=int, default=config.DOWNLOAD_MAX_BYTES, help="Abort downloads larger than this (0 = no limit)"
+    )
+    parser.add_argument("--retries", type=int, default=config.DOWNLOAD_RETRIES, help="Retries per URL")
+    parser.add_argument(
+        "--force", action="store_true", help="Download in full even if the cached ETag/Last-Modified say unchanged"
+    )
     args = parser.parse_args()
 
     logging.basicConfig(level=logging.INFO)
 
+    if args.manifest:
+        try:
+            pairs = load_manifest(args.manifest)
+        except (FileNotFoundError, ValueError) as exc:
+            logger.error("%s", exc)
+            return 1
+        started = time.perf_counter()
+        results = download_many(
+            pairs,
+            workers=args.workers,
+            per_host=args.per_host,
+            timeout=args.timeout,
+            max_bytes=args.max_bytes,
+            retries=args.retries,
+            force=args.force,
+        )
+        _print_report(results, time.perf_counter() - started)
+        return 0 if all(result["status"] != "failed" for result in results) else 1
+
     try:
-        download_csv(url=args.url, output_file=args.output)
+        download_csv(
+            url=args.url,
+            output_file=args.output,
+            timeout=args.timeout,
+            max_bytes=args.max_bytes,
+            force=args.force,
+        )
         return 0
     except Exception:
         logger.exception("Failed to download CSV dataset")
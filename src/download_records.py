@@ -0,0 +1,105 @@
+"""
+Records of downloaded files, kept next to them in config.DOWNLOAD_RECORDS_NAME.
+
+Each download stores the URL, the SHA-256 computed while the file was streamed
+to disk, the response's ETag and Last-Modified validators, and the file's size
+and modification time. While size and mtime still match, the pipeline uses the
+recorded checksum instead of reading the file again, and the next download of
+the same URL is sent as a conditional request.
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+
+from . import config
+from .generate_checksum import _file_checksum
+
+logger = logging.getLogger(__name__)
+
+# Concurrent downloads into one directory share its records file
+_lock = threading.Lock()
+
+
+def _records_path(file_path: Path) -> Path:
+    return file_path.parent / config.DOWNLOAD_RECORDS_NAME
+
+
+def _load(records_path: Path) -> dict:
+    try:
+        records = json.loads(records_path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as exc:
+        logger.warning("Ignoring unreadable download records %s: %s", records_path, exc)
+        return {}
+    return records if isinstance(records, dict) else {}
+
+
+def record_download(
+    file_path: Path,
+    url: str,
+    sha256: str,
+    etag: str | None = None,
+    last_modified: str | None = None,
+) -> None:
+    """Record a completed download of `url` to `file_path` with its checksum and validators."""
+    stat = file_path.stat()
+    records_path = _records_path(file_path)
+    with _lock:
+        records = _load(records_path)
+        records[file_path.name] = {
+            "url": url,
+            "sha256": sha256,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "etag": etag,
+            "last_modified": last_modified,
+        }
+        temp_path = records_path.with_name(records_path.name + ".tmp")
+        temp_path.write_text(json.dumps(records, indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(temp_path, records_path)
+
+
+def downloaded_checksum(file_path: Path) -> str | None:
+    """
+    SHA-256 recorded when `file_path` was downloaded (normalized as by
+    generate_checksum), or None if it was not downloaded or has changed since.
+    """
+    entry = _load(_records_path(file_path)).get(file_path.name)
+    if not isinstance(entry, dict):
+        return None
+    try:
+        stat = file_path.stat()
+    except FileNotFoundError:
+        return None
+    if stat.st_size != entry.get("size") or stat.st_mtime_ns != entry.get("mtime_ns"):
+        return None
+    return entry.get("sha256")
+
+
+def current_record(file_path: Path, url: str) -> dict | None:
+    """
+    The record of `url` downloaded to `file_path`, or None unless the file still
+    holds exactly that download.
+
+    Size and mtime are compared first. If only the mtime differs (e.g. after a
+    git checkout), the file is hashed and compared with the recorded checksum,
+    and on a match the record is refreshed so the next check is cheap again.
+    """
+    entry = _load(_records_path(file_path)).get(file_path.name)
+    if not isinstance(entry, dict) or entry.get("url") != url or not entry.get("sha256"):
+        return None
+    try:
+        stat = file_path.stat()
+    except FileNotFoundError:
+        return None
+    if stat.st_size != entry.get("size"):
+        return None
+    if stat.st_mtime_ns != entry.get("mtime_ns"):
+        if _file_checksum(file_path) != entry["sha256"]:
+            return None
+        record_download(file_path, url, entry["sha256"], entry.get("etag"), entry.get("last_modified"))
+    return entry
@@ -1,36 +1,40 @@
 
-"""Encrypt CSV file output using Fernet symmetric encryption."""
+"""Encrypt CSV file output in the chunked, framed format (see encrypted_format)."""
 
 import io
 from pathlib import Path
 
-from cryptography.fernet import Fernet, InvalidToken
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-import base64
-
 from . import config
+from .csv_artifact import CsvArtifact
+from .encrypted_format import write_encrypted
+from .key_ring import configured_key_ring
 
 
-def encrypt_csv_output(csv_file: str | Path, output_dir: Path | None = None) -> Path:
+def encrypt_csv_output(csv_file: str | Path | CsvArtifact, output_dir: Path | None = None) -> Path:
 
     """
     Encrypt a CSV file and save the encrypted output.
 
+    The file is streamed through in config.ENCRYPTION_CHUNK_SIZE chunks, each
+    encrypted and authenticated independently, so memory use does not grow with
+    the file size. The chunks are encrypted with a random per-file data key,
+    stored in the header wrapped by the current master key (see key_ring).
+
     Args:
-        csv_file: Path to the CSV file to encrypt.
+        csv_file: Path to the CSV file to encrypt, or a CsvArtifact already read into memory.
         output_dir: Optional directory for encrypted file (defaults to config.OUTPUT_DIR).
 
     Returns:
         Path to the encrypted output file.
 
     Raises:
-        ValueError: If encryption key is not configured.
+        ValueError: If encryption key is not configured or the key ring is malformed.
         FileNotFoundError: If the CSV file does not exist.
     """
 
-    csv_path = Path(csv_file)
-    if not csv_path.exists():
+    artifact = csv_file if isinstance(csv_file, CsvArtifact) else None
+    csv_path = artifact.path if artifact else Path(csv_file)
+    if artifact is None and not csv_path.exists():
         raise FileNotFoundError(f"CSV file not found: {csv_path}")
 
     if config.DEFAULT_KEY is None:
@@ -42,20 +46,11 @@ def encrypt_csv_output(csv_file: str | Path, output_dir: Path | None = None) ->
     output_path = target_dir / f"{csv_path.stem}_encrypted.bin"
     target_dir.mkdir(parents=True, exist_ok=True)
 
-    key = config.DEFAULT_KEY
-    fernet = Fernet(key.encode() if isinstance(key, str) else key)
-
-    with open(csv_path, "rb") as f:
-        data = f.read()
-
-    encrypted_data = fernet.encrypt(data)
-
-    with open(output_path, "wb") as f:
-        f.write(encrypted_data)
+    source = io.BytesIO(artifact.raw) if artifact is not None else open(csv_path, "rb")
+    try:
+        with open(output_path, "wb") as out:
+            write_encrypted(source, out, configured_key_ring(), config.ENCRYPTION_CHUNK_SIZE)
+    finally:
+        source.close()
 
     return output_path
-
-
-
-
-
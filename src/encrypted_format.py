@@ -0,0 +1,332 @@
+"""
+Chunked, framed format for encrypted .bin files, with envelope encryption.
+
+Layout (all integers big-endian):
+
+    header    = MAGIC (8 bytes) | version (u8) | chunk size (u32) | nonce prefix (8 bytes)
+    key block = key ID length (u8) | key ID (32 bytes, NUL padded) | wrapped data key (60 bytes)
+    frame*    = chunk index (u32) | flags (u8) | ciphertext length (u32) | ciphertext
+
+Every file is encrypted with its own random AES-256 data key. The key block
+holds that data key encrypted ("wrapped") with AES-256-GCM under the master key
+named by the key ID, with the header and key ID as associated data. Rotating the
+master key therefore only rewrites the fixed-size key block (see rewrap); the
+frames are untouched.
+
+Each frame is one plaintext chunk of `chunk size` bytes (the last may be shorter)
+encrypted independently with the data key. The nonce is the file's random prefix
+plus the chunk index, and the header and frame index/flags are authenticated as
+associated data, so frames cannot be reordered, moved between files or dropped
+(the last frame carries FLAG_FINAL). The key block is not part of the frames'
+associated data; a key block that does not belong to the file unwraps to a data
+key that fails every frame. Files are written and read with memory bounded by
+the chunk size.
+
+Every frame but the last holds exactly `chunk size` plaintext bytes, so the frame
+holding any plaintext offset is found with a seek; byte ranges are decrypted
+without touching the frames before them.
+
+Master keys are Fernet keys; the key-wrapping key is derived from one with HKDF.
+Version 1 files (no key block, frames encrypted with a key derived directly from
+a master key) are still read with any key in the ring, and are upgraded to
+version 2 by rotate_keys.
+"""
+
+import base64
+import io
+import os
+import struct
+from typing import BinaryIO, Iterator
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+from .key_ring import KEY_ID_MAX_LENGTH, KeyRing, check_key_id
+
+MAGIC = b"CSVPENC\x00"
+VERSION = 2
+LEGACY_VERSION = 1
+HEADER = struct.Struct(">8sBI8s")
+FRAME_HEADER = struct.Struct(">IBI")
+FRAME_AAD = struct.Struct(">IB")
+FLAG_FINAL = 0x01
+TAG_SIZE = 16
+WRAP_NONCE_SIZE = 12
+WRAPPED_KEY_SIZE = WRAP_NONCE_SIZE + 32 + TAG_SIZE
+KEY_BLOCK = struct.Struct(f">B{KEY_ID_MAX_LENGTH}s{WRAPPED_KEY_SIZE}s")
+ENVELOPE_HEADER_SIZE = HEADER.size + KEY_BLOCK.size
+
+
+def is_framed(prefix: bytes) -> bool:
+    """True if `prefix` (the first bytes of a file) starts a framed encrypted file."""
+    return prefix[: len(MAGIC)] == MAGIC
+
+
+def _hkdf(key: str | bytes, info: bytes) -> bytes:
+    key_bytes = key.encode() if isinstance(key, str) else key
+    try:
+        raw = base64.urlsafe_b64decode(key_bytes)
+    except ValueError as exc:
+        raise ValueError("Fernet key must be 32 url-safe base64-encoded bytes.") from exc
+    if len(raw) != 32:
+        raise ValueError("Fernet key must be 32 url-safe base64-encoded bytes.")
+    return HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=info).derive(raw)
+
+
+def derive_key(key: str | bytes) -> bytes:
+    """AES-256 frame key of version 1 files, derived from a Fernet key."""
+    return _hkdf(key, b"csv-pipeline framed encryption v1")
+
+
+def _wrapping_key(master_key: str | bytes) -> AESGCM:
+    return AESGCM(_hkdf(master_key, b"csv-pipeline key wrapping v2"))
+
+
+def _key_block(header: bytes, key_id: str, master_key: str | bytes, data_key: bytes) -> bytes:
+    """Key block holding `data_key` wrapped by `master_key`, bound to the file header and key ID."""
+    key_id_bytes = check_key_id(key_id).encode("ascii")
+    nonce = os.urandom(WRAP_NONCE_SIZE)
+    wrapped = nonce + _wrapping_key(master_key).encrypt(nonce, data_key, header + key_id_bytes)
+    return KEY_BLOCK.pack(len(key_id_bytes), key_id_bytes, wrapped)
+
+
+def _parse_key_block(block: bytes) -> tuple[str, bytes]:
+    length, key_id, wrapped = KEY_BLOCK.unpack(block)
+    if not 0 < length <= KEY_ID_MAX_LENGTH:
+        raise ValueError("Encrypted file is truncated or corrupt.")
+    return key_id[:length].decode("ascii", errors="replace"), wrapped
+
+
+def _unwrap(header: bytes, key_id: str, wrapped: bytes, master_key: str | bytes) -> bytes:
+    try:
+        return _wrapping_key(master_key).decrypt(
+            wrapped[:WRAP_NONCE_SIZE], wrapped[WRAP_NONCE_SIZE:], header + key_id.encode("ascii")
+        )
+    except InvalidTag:
+        raise ValueError("Decryption failed. Invalid or wrong encryption key.")
+
+
+def _key_ring(key: "str | bytes | KeyRing") -> KeyRing:
+    return key if isinstance(key, KeyRing) else KeyRing.single(key)
+
+
+def _nonce(prefix: bytes, index: int) -> bytes:
+    return prefix + struct.pack(">I", index)
+
+
+def write_encrypted(source: BinaryIO, out: BinaryIO, key: "str | bytes | KeyRing", chunk_size: int) -> None:
+    """
+    Encrypt `source` into `out` frame by frame, reading one chunk ahead to mark the last one.
+
+    `key` is a master key or a KeyRing; a fresh data key is wrapped by its current key.
+    """
+    ring = _key_ring(key)
+    data_key = AESGCM.generate_key(bit_length=256)
+    aead = AESGCM(data_key)
+    nonce_prefix = os.urandom(8)
+    header = HEADER.pack(MAGIC, VERSION, chunk_size, nonce_prefix)
+    out.write(header)
+    out.write(_key_block(header, ring.current_id, ring.current, data_key))
+
+    index = 0
+    chunk = source.read(chunk_size)
+    while True:
+        next_chunk = source.read(chunk_size)
+        flags = 0 if next_chunk else FLAG_FINAL
+        aad = header + FRAME_AAD.pack(index, flags)
+        ciphertext = aead.encrypt(_nonce(nonce_prefix, index), chunk, aad)
+        out.write(FRAME_HEADER.pack(index, flags, len(ciphertext)))
+        out.write(ciphertext)
+        if flags & FLAG_FINAL:
+            return
+        chunk = next_chunk
+        index += 1
+
+
+def _read_exact(f: BinaryIO, size: int) -> bytes:
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError("Encrypted file is truncated or corrupt.")
+    return data
+
+
+def _read_frame(f: BinaryIO, chunk_size: int) -> tuple[int, int, bytes]:
+    """
+    Index, flags and ciphertext of the next frame.
+
+    The length field is not authenticated, so it is bounded by the chunk size
+    before anything is read: a corrupt length cannot trigger a huge read.
+    """
+    index, flags, length = FRAME_HEADER.unpack(_read_exact(f, FRAME_HEADER.size))
+    if not TAG_SIZE <= length <= chunk_size + TAG_SIZE:
+        raise ValueError("Encrypted file is truncated or corrupt.")
+    return index, flags, _read_exact(f, length)
+
+
+def _legacy_cipher(f: BinaryIO, header: bytes, chunk_size: int, nonce_prefix: bytes, ring: KeyRing) -> AESGCM:
+    """
+    Frame cipher of a version 1 file, positioned at its first frame.
+
+    Version 1 files do not name their master key, so each key in the ring (the
+    current one first) is tried on the first frame; `f` is left where it was.
+    """
+    if not ring.keys:
+        raise ValueError("Decryption key not configured. Set ENCRYPTION_KEY environment variable.")
+    keys = [key for _, key in sorted(ring.keys.items(), key=lambda item: item[0] != ring.current_id)]
+    position = f.tell()
+    index, flags, ciphertext = _read_frame(f, chunk_size)
+    f.seek(position)
+    for key in keys:
+        aead = AESGCM(derive_key(key))
+        try:
+            aead.decrypt(_nonce(nonce_prefix, index), ciphertext, header + FRAME_AAD.pack(index, flags))
+        except InvalidTag:
+            continue
+        return aead
+    raise ValueError("Decryption failed. Invalid or wrong encryption key.")
+
+
+def _read_header(f: BinaryIO, ring: KeyRing) -> tuple[bytes, int, int, bytes, AESGCM]:
+    """Header, total header size, chunk size, nonce prefix and frame cipher of a file opened at its start."""
+    header = _read_exact(f, HEADER.size)
+    magic, version, chunk_size, nonce_prefix = HEADER.unpack(header)
+    if magic != MAGIC or version not in (VERSION, LEGACY_VERSION) or chunk_size == 0:
+        raise ValueError("Unsupported encrypted file format.")
+    if version == LEGACY_VERSION:
+        return header, HEADER.size, chunk_size, nonce_prefix, _legacy_cipher(f, header, chunk_size, nonce_prefix, ring)
+    key_id, wrapped = _parse_key_block(_read_exact(f, KEY_BLOCK.size))
+    data_key = _unwrap(header, key_id, wrapped, ring.get(key_id))
+    return header, ENVELOPE_HEADER_SIZE, chunk_size, nonce_prefix, AESGCM(data_key)
+
+
+def iter_decrypted(f: BinaryIO, key: "str | bytes | KeyRing", start: int = 0, end: int | None = None) -> Iterator[bytes]:
+    """
+    Yield plaintext chunks of a framed file opened at its start.
+
+    `key` is a master key or a KeyRing; the master key is chosen by the file's key
+    ID (version 1 files use whichever key in the ring decrypts them).
+
+    With `start`/`end`, only plaintext bytes [start, end) are yielded: the reader
+    seeks to the frame holding `start` (so `f` must be seekable) and stops after
+    the frame holding `end`. Ranges past the end of the data yield nothing.
+
+    Raises ValueError if any frame that is read fails authentication, frames are
+    out of order, or the file ends before the final frame.
+    """
+    header, header_size, chunk_size, nonce_prefix, aead = _read_header(f, _key_ring(key))
+
+    expected = 0
+    if start > 0:
+        frame_size = FRAME_HEADER.size + chunk_size + TAG_SIZE
+        file_size = f.seek(0, io.SEEK_END)
+        # Clamp to the last frame so out-of-range starts still check the final flag
+        last = max(file_size - header_size - 1, 0) // frame_size
+        expected = min(start // chunk_size, last)
+        f.seek(header_size + expected * frame_size)
+
+    offset = expected * chunk_size
+    while end is None or offset < end:
+        index, flags, ciphertext = _read_frame(f, chunk_size)
+        if index != expected:
+            raise ValueError("Encrypted file is truncated or corrupt.")
+        aad = header + FRAME_AAD.pack(index, flags)
+        try:
+            plaintext = aead.decrypt(_nonce(nonce_prefix, index), ciphertext, aad)
+        except InvalidTag:
+            raise ValueError("Decryption failed. Invalid or wrong encryption key.")
+        lo = max(start - offset, 0)
+        hi = len(plaintext) if end is None else min(end - offset, len(plaintext))
+        if lo < hi:
+            yield plaintext if (lo, hi) == (0, len(plaintext)) else plaintext[lo:hi]
+        if flags & FLAG_FINAL:
+            return
+        offset += len(plaintext)
+        expected += 1
+
+
+class _ChunkReader(io.RawIOBase):
+    """Read-only stream over an iterator of byte chunks; closes `owned` when closed."""
+
+    def __init__(self, chunks: Iterator[bytes], owned: BinaryIO):
+        self._chunks = chunks
+        self._owned = owned
+        self._pending = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._pending = memoryview(chunk)
+        n = min(len(buffer), len(self._pending))
+        buffer[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            self._owned.close()
+        super().close()
+
+
+def open_decrypted(path, key: "str | bytes | KeyRing", start: int = 0, end: int | None = None) -> BinaryIO:
+    """
+    Open a framed file as a binary stream of its plaintext (optionally bytes [start, end)).
+
+    Frames are decrypted lazily as the stream is read, so memory stays bounded by
+    the chunk size. Close the stream (or use it as a context manager) to release the file.
+    """
+    f = open(path, "rb")
+    try:
+        return io.BufferedReader(_ChunkReader(iter_decrypted(f, key, start, end), f))
+    except BaseException:
+        f.close()
+        raise
+
+
+def read_key_id(path) -> str | None:
+    """Master key ID of a framed file, or None for version 1 files (which have none)."""
+    with open(path, "rb") as f:
+        header = _read_exact(f, HEADER.size)
+        magic, version, _, _ = HEADER.unpack(header)
+        if magic != MAGIC or version not in (VERSION, LEGACY_VERSION):
+            raise ValueError("Unsupported encrypted file format.")
+        if version == LEGACY_VERSION:
+            return None
+        return _parse_key_block(_read_exact(f, KEY_BLOCK.size))[0]
+
+
+def rewrap(path, ring: KeyRing) -> bool:
+    """
+    Re-wrap a file's data key under the ring's current master key, in place.
+
+    Only the fixed-size key block is rewritten (and fsynced); the frames are not
+    read or changed.
+
+    Returns:
+        True if the key block was rewritten, False if the file already uses the current key.
+
+    Raises:
+        ValueError: If the file is not a version 2 file, its master key is not in
+            the ring, or unwrapping fails.
+    """
+    with open(path, "r+b") as f:
+        header = _read_exact(f, HEADER.size)
+        magic, version, _, _ = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Only envelope-encrypted (version 2) files can be re-wrapped; re-encrypt older files.")
+        key_id, wrapped = _parse_key_block(_read_exact(f, KEY_BLOCK.size))
+        if key_id == ring.current_id:
+            return False
+        data_key = _unwrap(header, key_id, wrapped, ring.get(key_id))
+        block = _key_block(header, ring.current_id, ring.current, data_key)
+        f.seek(HEADER.size)
+        f.write(block)
+        f.flush()
+        os.fsync(f.fileno())
+    return True
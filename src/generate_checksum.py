@@ -1,9 +1,11 @@
 """Generate checksum for CSV files."""
 
+import codecs
 import hashlib
 from pathlib import Path
 
 from . import config
+from .csv_artifact import CsvArtifact
 
 
 def _normalize_for_hash(data: bytes) -> bytes:
@@ -19,36 +21,171 @@ def _normalize_for_hash(data: bytes) -> bytes:
         return data  # Binary file, hash as-is
 
 
-def generate_checksum(csv_file: str | Path, output_dir: Path | None = None) -> tuple[Path, str]:
+_BLOCK_SIZE = 1024 * 1024
+
+
+class _LineEndingNormalizer:
+    """
+    Byte-level CRLF/CR -> LF conversion for a stream fed in blocks.
+
+    A CR ending one block is held back until the next block shows whether it
+    starts a CRLF. CR and LF never occur inside multi-byte UTF-8 sequences, so
+    for UTF-8 text this matches normalizing the decoded string.
+    """
+
+    def __init__(self):
+        self._pending_cr = False
+
+    def feed(self, block: bytes) -> bytes:
+        if not self._pending_cr and b"\r" not in block:
+            return block
+        if self._pending_cr:
+            block = b"\r" + block
+        self._pending_cr = block.endswith(b"\r")
+        if self._pending_cr:
+            block = block[:-1]
+        return block.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+    def flush(self) -> bytes:
+        pending, self._pending_cr = self._pending_cr, False
+        return b"\n" if pending else b""
+
+
+class _StreamingChecksum:
+    """
+    Incremental equivalent of hashing `_normalize_for_hash(data)`, fed block by block.
+
+    Whether the whole input is valid UTF-8 is only known at the end, so until
+    then both the raw and the normalized streams are hashed. They are the same
+    stream until the first CR, so the raw hasher is only forked off there (and
+    the normalized one dropped on invalid UTF-8).
+    """
+
+    def __init__(self):
+        self._normalized = hashlib.sha256()
+        self._raw = None
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._text = True
+        self._normalizer = _LineEndingNormalizer()
+
+    def update(self, block: bytes) -> None:
+        if self._text:
+            try:
+                self._decoder.decode(block)
+            except UnicodeDecodeError:
+                self._to_binary()
+        if not self._text:
+            self._raw.update(block)
+            return
+        if self._raw is None:
+            if b"\r" not in block:
+                self._normalized.update(block)
+                return
+            self._raw = self._normalized.copy()
+        self._raw.update(block)
+        self._normalized.update(self._normalizer.feed(block))
+
+    def hexdigest(self) -> str:
+        if self._text:
+            try:
+                self._decoder.decode(b"", final=True)
+            except UnicodeDecodeError:
+                self._to_binary()
+        if not self._text:
+            return self._raw.hexdigest()
+        self._normalized.update(self._normalizer.flush())
+        return self._normalized.hexdigest()
+
+    def _to_binary(self) -> None:
+        self._text = False
+        if self._raw is None:
+            self._raw = self._normalized
+        self._normalized = None
+
+
+def _bytes_checksum(data: bytes) -> str:
+    """Return the SHA-256 hex digest of normalized content."""
+    hasher = _StreamingChecksum()
+    for start in range(0, len(data), _BLOCK_SIZE):
+        hasher.update(data[start : start + _BLOCK_SIZE])
+    return hasher.hexdigest()
+
+
+def _file_checksum(file_path: Path) -> str:
+    """Return the SHA-256 hex digest of a file's normalized content, reading it in blocks."""
+    hasher = _StreamingChecksum()
+    with open(file_path, "rb") as f:
+        while block := f.read(_BLOCK_SIZE):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def checksum_path_for(file_path: Path, output_dir: Path) -> Path:
+    """
+    Checksum file for `file_path` in `output_dir`: same stem, .checksum extension.
+
+    Parquet files keep their suffix (`x_masked.parquet.checksum`) so they do not
+    share a checksum file with the CSV of the same stem.
+    """
+    name = file_path.name if file_path.suffix == ".parquet" else file_path.stem
+    return output_dir / f"{name}{config.CHECKSUM_EXT}"
+
+
+def generate_checksum(
+    csv_file: str | Path | CsvArtifact,
+    output_dir: Path | None = None,
+    known_checksum: str | None = None,
+) -> tuple[Path, str]:
     """
     Generate SHA-256 checksum for a file and save it.
 
     Text/CSV files are normalized (line endings) for cross-platform consistency.
+    With config.CHECKSUM_FORMAT = "merkle" the checksum file holds per-block
+    digests (see merkle_checksum) and the returned checksum is their root.
 
     Args:
-        csv_file: Path to the file to checksum.
+        csv_file: Path to the file to checksum, or a CsvArtifact whose bytes are hashed
+            without reading the file again.
         output_dir: Optional directory for checksum file (defaults to config.OUTPUT_DIR).
+        known_checksum: SHA-256 of the normalized content if the caller already has it
+            (e.g. computed while downloading the file); with the "sha256" format the
+            file is then not read.
 
     Returns:
         Tuple of (path to checksum file, the checksum string).
 
     Raises:
         FileNotFoundError: If the file does not exist.
+        ValueError: If config.CHECKSUM_FORMAT is not a known format.
     """
-    file_path = Path(csv_file)
-    if not file_path.exists():
-        raise FileNotFoundError(f"File not found: {file_path}")
+    if isinstance(csv_file, CsvArtifact):
+        file_path = csv_file.path
+        source = csv_file.raw
+    else:
+        file_path = Path(csv_file)
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        source = file_path
+
+    if config.CHECKSUM_FORMAT not in ("sha256", "merkle"):
+        raise ValueError(f"Unknown CHECKSUM_FORMAT: {config.CHECKSUM_FORMAT!r} (use 'sha256' or 'merkle')")
+    if config.CHECKSUM_FORMAT == "merkle":
+        from .merkle_checksum import compute_merkle_checksum, dumps_merkle_checksum
 
-    data = file_path.read_bytes()
-    normalized = _normalize_for_hash(data)
-    checksum = hashlib.sha256(normalized).hexdigest()
+        document = compute_merkle_checksum(source)
+        checksum, contents = document["root"], dumps_merkle_checksum(document)
+    else:
+        if known_checksum:
+            checksum = known_checksum
+        else:
+            checksum = _bytes_checksum(source) if isinstance(source, bytes) else _file_checksum(source)
+        contents = checksum
 
-    # Save checksum alongside the file (same stem, .checksum extension)
     target_dir = output_dir or config.OUTPUT_DIR
-    output_path = target_dir / f"{file_path.stem}{config.CHECKSUM_EXT}"
+    output_path = checksum_path_for(file_path, target_dir)
     target_dir.mkdir(parents=True, exist_ok=True)
 
     with open(output_path, "w") as f:
-        f.write(checksum)
+        f.write(contents)
 
     return output_path, checksum
@@ -0,0 +1,98 @@
+"""
+Master keys for envelope encryption, selected by key ID.
+
+The current key (config.DEFAULT_KEY, from ENCRYPTION_KEY) wraps the data key of
+every new .bin file under config.ENCRYPTION_KEY_ID, or under a fingerprint of
+the key when no ID is set. Retired keys stay available for decryption and
+rotation through config.ENCRYPTION_KEYRING, a comma-separated list of
+`id:key` pairs.
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+
+from . import config
+
+KEY_ID_MAX_LENGTH = 32
+_KEY_ID = re.compile(r"[A-Za-z0-9._-]{1,%d}" % KEY_ID_MAX_LENGTH)
+
+
+def check_key_id(key_id: str) -> str:
+    """Validate a key ID (1-32 characters of A-Z, a-z, 0-9, '.', '_', '-'), raising ValueError."""
+    if not _KEY_ID.fullmatch(key_id):
+        raise ValueError(
+            f"Invalid key ID {key_id!r}: use 1-{KEY_ID_MAX_LENGTH} characters of letters, digits, '.', '_' or '-'."
+        )
+    return key_id
+
+
+def default_key_id(key: str | bytes) -> str:
+    """Key ID used when none is configured: a short, non-reversible fingerprint of the key."""
+    key_bytes = key.encode() if isinstance(key, str) else key
+    return hashlib.sha256(key_bytes).hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class KeyRing:
+    """Master keys by ID, and the ID of the one that wraps new data keys (None if there is none)."""
+
+    keys: dict[str, str] = field(default_factory=dict)
+    current_id: str | None = None
+
+    @classmethod
+    def single(cls, key: str | bytes, key_id: str | None = None) -> "KeyRing":
+        key = key.decode() if isinstance(key, bytes) else key
+        key_id = check_key_id(key_id) if key_id else default_key_id(key)
+        return cls({key_id: key}, key_id)
+
+    @property
+    def current(self) -> str:
+        if self.current_id is None:
+            raise ValueError("Encryption key not configured. Set ENCRYPTION_KEY environment variable.")
+        return self.keys[self.current_id]
+
+    def get(self, key_id: str) -> str:
+        """Master key for `key_id`, raising ValueError if the ring does not hold it."""
+        try:
+            return self.keys[key_id]
+        except KeyError:
+            raise ValueError(
+                f"Decryption failed. The file's master key {key_id!r} is not configured "
+                "(add it to ENCRYPTION_KEYRING as id:key)."
+            ) from None
+
+
+def parse_key_ring(text: str | None) -> dict[str, str]:
+    """Parse `id:key,id:key` pairs, raising ValueError on malformed entries or repeated IDs."""
+    keys = {}
+    for entry in (text or "").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        key_id, sep, key = entry.partition(":")
+        if not sep or not key.strip():
+            raise ValueError(f"ENCRYPTION_KEYRING entries must be id:key, got {key_id.strip()!r}")
+        key_id = check_key_id(key_id.strip())
+        if key_id in keys:
+            raise ValueError(f"ENCRYPTION_KEYRING lists key ID {key_id!r} more than once")
+        keys[key_id] = key.strip()
+    return keys
+
+
+def configured_key_ring() -> KeyRing:
+    """
+    The key ring from config: ENCRYPTION_KEYRING plus the current ENCRYPTION_KEY.
+
+    Raises:
+        ValueError: If the ring is malformed, or ENCRYPTION_KEY_ID names a key in
+            ENCRYPTION_KEYRING with a different value.
+    """
+    keys = parse_key_ring(config.ENCRYPTION_KEYRING)
+    if config.DEFAULT_KEY is None:
+        return KeyRing(keys, None)
+    current = KeyRing.single(config.DEFAULT_KEY, config.ENCRYPTION_KEY_ID)
+    current_id = current.current_id
+    if keys.get(current_id, current.current) != current.current:
+        raise ValueError(f"Key ID {current_id!r} is used for two different keys (ENCRYPTION_KEY and ENCRYPTION_KEYRING).")
+    return KeyRing({**keys, current_id: current.current}, current_id)
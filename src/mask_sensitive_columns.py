@@ -4,29 +4,57 @@
 Mask sensitive columns in CSV files
 """
 
+import codecs
+import contextlib
+import io
 import re
+from dataclasses import dataclass, field
 from pathlib import Path
+import numpy as np
 import pandas as pd
 from . import config
+from .arrow_csv import read_csv_arrow
+from .column_plan import ColumnPlan, column_plan, extend_plan
+from .content_detection import ContentSampler, detect_column_kinds
+from .parquet_output import ParquetChunkWriter, check_masked_output_format, write_parquet
+from .csv_artifact import CsvArtifact
 
 
-def _sensitive_kind(column_name: str) -> str | None:
-    col_lower = column_name.lower().replace(" ", "_").replace("-", "_")
-    if "email" in col_lower:
-        return "email"
-    if "ssn" in col_lower or "social_security" in col_lower:
-        return "ssn"
-    if "credit_card" in col_lower or "cc_number" in col_lower or "card_number" in col_lower:
-        return "card"
-    if "phone" in col_lower:
-        return "phone"
-    if "identifier" in col_lower or "id_number" in col_lower or "student_id" in col_lower or "studentid" in col_lower:
-        return "identifier"
-    return "generic" if any(pattern in col_lower for pattern in config.SENSITIVE_COLUMN_PATTERNS) else None
+@dataclass
+class MaskStats:
+    """
+    Counts from one masking pass, per sensitive kind ("email", "ssn", "card", "phone", "identifier", "generic").
+
+    `detected` counts non-null values in columns of that kind, `masked` the ones
+    masking actually changed and `nulls` the missing values; `rows` is the number
+    of rows masked. Chunked masking adds every chunk into the same object.
+    """
 
+    rows: int = 0
+    columns: dict[str, list[str]] = field(default_factory=dict)
+    detected: dict[str, int] = field(default_factory=dict)
+    masked: dict[str, int] = field(default_factory=dict)
+    nulls: dict[str, int] = field(default_factory=dict)
 
-def _is_sensitive_column(column_name: str) -> bool:
-    return _sensitive_kind(column_name) is not None
+    def add(self, kind: str, column: str, detected: int, masked: int, nulls: int) -> None:
+        columns = self.columns.setdefault(kind, [])
+        if column not in columns:
+            columns.append(column)
+        self.detected[kind] = self.detected.get(kind, 0) + detected
+        self.masked[kind] = self.masked.get(kind, 0) + masked
+        self.nulls[kind] = self.nulls.get(kind, 0) + nulls
+
+    def to_dict(self) -> dict[str, dict]:
+        """JSON-ready {kind: {"columns", "detected", "masked", "nulls"}}."""
+        return {
+            kind: {
+                "columns": list(columns),
+                "detected": self.detected[kind],
+                "masked": self.masked[kind],
+                "nulls": self.nulls[kind],
+            }
+            for kind, columns in self.columns.items()
+        }
 
 
 def _mask_value(value: str, mask_char: str = "*") -> str:
@@ -97,95 +125,640 @@ def _mask_phone(value: str) -> str:
     return "*" * (len(digits) - 3) + digits[-3:]
 
 
-def _read_csv_flexible(csv_path: Path) -> pd.DataFrame:
+def _csv_source(source: Path | bytes):
+    """Path as-is, or a fresh in-memory buffer so raw bytes can be parsed repeatedly."""
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+
+def _read_text_sample(source: Path | bytes, encoding: str, size: int = 2048) -> str:
+    if isinstance(source, bytes):
+        return source[: size * 4].decode(encoding)[:size]
+    with open(source, "r", encoding=encoding) as f:
+        return f.read(size)
+
+
+_SNIFF_BYTES = 64 * 1024
+_SNIFF_ROWS = 200
+_DELIMITERS = [",", ";", "\t", "|"]
+
+
+def _read_head(source: Path | bytes, size: int = _SNIFF_BYTES) -> bytes:
+    if isinstance(source, bytes):
+        return source[:size]
+    with open(source, "rb") as f:
+        return f.read(size)
+
+
+def _detect_encoding(head: bytes) -> tuple[str, str]:
+    """BOM check, then a UTF-8 validity probe; returns (encoding, decoded sample)."""
+    if head.startswith(codecs.BOM_UTF8):
+        encoding = "utf-8-sig"
+    else:
+        encoding = "utf-8"
+    try:
+        # final=False tolerates a multi-byte character cut off at the end of the sample
+        text = codecs.getincrementaldecoder(encoding)().decode(head, final=False)
+    except UnicodeDecodeError:
+        encoding, text = "latin-1", head.decode("latin-1")
+    return encoding, text
+
+
+def _sniff_delimiter(text: str, truncated: bool) -> str | None:
+    """
+    Pick the delimiter that splits the sample rows into the most consistent number
+    of fields (more than one). Ties keep the order of _DELIMITERS, so comma wins.
+    """
+    import csv
+    lines = text.splitlines(keepends=True)
+    if truncated and len(lines) > 1:
+        lines = lines[:-1]  # last line may be cut off by the sample size
+    lines = [line for line in lines[:_SNIFF_ROWS] if line.strip()]
+    best, best_score = None, (0.0, 0)
+    for delimiter in _DELIMITERS:
+        try:
+            counts = [len(row) for row in csv.reader(lines, delimiter=delimiter)]
+        except csv.Error:
+            continue
+        if not counts:
+            continue
+        mode = max(set(counts), key=counts.count)
+        if mode < 2:
+            continue
+        score = (counts.count(mode) / len(counts), mode)
+        if score > best_score:
+            best, best_score = delimiter, score
+    return best
+
+
+def _parses(head: bytes, dialect: dict) -> bool:
+    try:
+        df = pd.read_csv(io.BytesIO(head), nrows=_SNIFF_ROWS, **_read_options(dialect))
+    except Exception:
+        return False
+    return len(df.columns) > 1
+
+
+def _detect_dialect(source: Path | bytes, hint: dict | None = None) -> dict | None:
     """
-    Try to read a CSV with various encodings and delimiters. Handles mixed delimiters and scientific notation.
+    Detect encoding and delimiter from the first few KB of a CSV, without parsing it.
+
+    A `hint` (e.g. the dialect recorded by a previous run) is used as-is when it
+    still parses the sample. Returns None if no delimiter could be identified.
     """
+    head = _read_head(source)
+    if hint and _parses(head, hint):
+        return dict(hint)
+    encoding, text = _detect_encoding(head)
+    delimiter = _sniff_delimiter(text, truncated=len(head) == _SNIFF_BYTES)
+    if delimiter is None:
+        return None
+    return {"encoding": encoding, "delimiter": delimiter}
+
+
+def _read_csv_detected(source: Path | bytes, hint: dict | None = None) -> tuple[pd.DataFrame, dict] | None:
+    """Parse once with the sampled dialect; None if that does not give a usable frame."""
+    dialect = _detect_dialect(source, hint)
+    if dialect is None:
+        return None
+    try:
+        df = _parse_csv(source, dialect)
+    except UnicodeDecodeError:
+        # Invalid UTF-8 beyond the sample
+        dialect = {**dialect, "encoding": "latin-1"}
+        df = pd.read_csv(_csv_source(source), **_read_options(dialect))
+    except Exception:
+        return None
+    if len(df.columns) > 1 and not df.empty:
+        return df, dialect
+    return None
+
+
+def _parse_csv(source: Path | bytes, dialect: dict) -> pd.DataFrame:
+    """Parse a whole CSV with the configured engine (config.CSV_ENGINE); Arrow falls back to pandas' parser."""
+    if config.CSV_ENGINE not in ("c", "pyarrow"):
+        raise ValueError(f"Unknown CSV_ENGINE: {config.CSV_ENGINE!r} (use 'c' or 'pyarrow')")
+    if config.CSV_ENGINE == "pyarrow":
+        df = read_csv_arrow(source, dialect)
+        if df is not None:
+            return df
+    return pd.read_csv(_csv_source(source), **_read_options(dialect))
+
+
+def _read_csv_with_dialect(source: Path | bytes, hint: dict | None = None) -> tuple[pd.DataFrame, dict]:
+    """
+    Read a CSV, detecting its encoding and delimiter. Handles mixed delimiters and scientific notation.
+
+    `source` is a file path or the file's raw bytes. The dialect is detected from
+    a sample and the file parsed once; only if that fails are the encoding and
+    delimiter combinations tried one by one. Returns the frame and the dialect
+    ({"encoding", "delimiter"}) that parsed it.
+    """
+    detected = _read_csv_detected(source, hint)
+    if detected is not None:
+        return detected
+    return _read_csv_trial(source)
+
+
+def _read_csv_trial(source: Path | bytes) -> tuple[pd.DataFrame, dict]:
+    """Fallback: try encodings and delimiters until one parses (full parse per attempt)."""
     import csv
     last_error = None
     encodings = ["utf-8-sig", "utf-8", "latin-1"]
-    delimiters = [",", ";", "\t", "|"]
 
     # Try pandas default first
     for encoding in encodings:
         try:
-            df = pd.read_csv(csv_path, encoding=encoding, on_bad_lines="skip")
+            df = pd.read_csv(_csv_source(source), encoding=encoding, on_bad_lines="skip")
             if len(df.columns) > 1 and not df.empty:
-                return df
+                return df, {"encoding": encoding, "delimiter": ","}
         except Exception as exc:
             last_error = exc
 
     # Try with explicit delimiters
     for encoding in encodings:
-        for delimiter in delimiters:
+        for delimiter in _DELIMITERS:
             try:
-                df = pd.read_csv(csv_path, encoding=encoding, sep=delimiter, on_bad_lines="skip")
+                df = pd.read_csv(_csv_source(source), encoding=encoding, sep=delimiter, on_bad_lines="skip")
                 if len(df.columns) > 1 and not df.empty:
-                    return df
+                    return df, {"encoding": encoding, "delimiter": delimiter}
             except Exception as exc:
                 last_error = exc
 
     # Try csv.Sniffer to auto-detect delimiter
     for encoding in encodings:
         try:
-            with open(csv_path, "r", encoding=encoding) as f:
-                sample = f.read(2048)
-                sniffer = csv.Sniffer()
-                dialect = sniffer.sniff(sample)
-                df = pd.read_csv(csv_path, encoding=encoding, sep=dialect.delimiter, on_bad_lines="skip")
-                if len(df.columns) > 1 and not df.empty:
-                    return df
+            sample = _read_text_sample(source, encoding)
+            sniffer = csv.Sniffer()
+            dialect = sniffer.sniff(sample)
+            df = pd.read_csv(_csv_source(source), encoding=encoding, sep=dialect.delimiter, on_bad_lines="skip")
+            if len(df.columns) > 1 and not df.empty:
+                return df, {"encoding": encoding, "delimiter": dialect.delimiter}
         except Exception as exc:
             last_error = exc
 
+    name = "<in-memory CSV>" if isinstance(source, bytes) else source
     if last_error is not None:
-        raise ValueError(f"Unable to parse CSV file: {csv_path}") from last_error
-    raise ValueError(f"Unable to parse CSV file: {csv_path}")
-
-
-def mask_dataframe(df: pd.DataFrame) -> pd.DataFrame:
-    df_masked = df.copy()
-    for col in df_masked.columns:
-        kind = _sensitive_kind(col)
-        if kind == "email":
-            df_masked[col] = df_masked[col].apply(_mask_email)
-        elif kind == "ssn":
-            df_masked[col] = df_masked[col].apply(_mask_ssn)
-        elif kind == "card":
-            df_masked[col] = df_masked[col].apply(_mask_credit_card)
-        elif kind == "phone":
-            df_masked[col] = df_masked[col].apply(_mask_phone)
-        elif kind == "identifier":
-            # Mask identifier columns, preserving scientific notation as string
-            def mask_identifier(val):
-                if pd.isna(val):
-                    return val
-                val_str = str(val)
-                # If scientific notation, keep as string and mask all but last 3 digits
-                if "e" in val_str.lower():
-                    digits = re.sub(r"\D", "", val_str)
-                    if len(digits) > 3:
-                        return "*" * (len(digits) - 3) + digits[-3:]
-                    return "*" * len(digits)
-                # Otherwise, mask as normal
-                return _mask_value(val_str)
-            df_masked[col] = df_masked[col].apply(mask_identifier)
-        elif kind == "generic":
-            df_masked[col] = df_masked[col].apply(_mask_value)
+        raise ValueError(f"Unable to parse CSV file: {name}") from last_error
+    raise ValueError(f"Unable to parse CSV file: {name}")
+
+
+def _read_csv_flexible(csv_path: Path | bytes) -> pd.DataFrame:
+    """Read a CSV (path or raw bytes) with encoding/delimiter detection."""
+    return _read_csv_with_dialect(csv_path)[0]
+
+
+def _streaming_dialect(source: Path | bytes, hint: dict | None = None) -> dict:
+    """Dialect for chunked reading; falls back to trial-parsing the sample if sniffing fails."""
+    dialect = _detect_dialect(source, hint)
+    if dialect is not None:
+        return dialect
+    head = _read_head(source)
+    if len(head) == _SNIFF_BYTES and b"\n" in head:
+        head = head[: head.rindex(b"\n") + 1]
+    return _read_csv_trial(head)[1]
+
+
+def _read_options(dialect: dict) -> dict:
+    return {"encoding": dialect["encoding"], "sep": dialect["delimiter"], "on_bad_lines": "skip"}
+
+
+def _reconcile_dtypes(seen: dict[str, set]) -> dict[str, object]:
+    """
+    Pick one dtype per column from the dtypes inferred for each chunk, matching what
+    a single whole-file parse would infer (ints promoted to float if any chunk had
+    floats or missing values, anything else mixed falls back to object).
+    """
+    dtypes = {}
+    for col, kinds in seen.items():
+        if len(kinds) == 1:
+            dtypes[col] = next(iter(kinds))
+        elif all(pd.api.types.is_integer_dtype(k) or pd.api.types.is_float_dtype(k) for k in kinds):
+            dtypes[col] = "float64"
+        else:
+            dtypes[col] = object
+    return dtypes
+
+
+def _chunk_dtypes(open_source, read_options: dict, chunksize: int) -> tuple[dict, ColumnPlan]:
+    """First pass of _mask_csv_chunked: column dtypes reconciled over all chunks, and the column plan."""
+    seen: dict[str, set] = {}
+    plan = sampler = None
+    with _opened(open_source()) as source:
+        for chunk in pd.read_csv(source, chunksize=chunksize, **read_options):
+            if plan is None:
+                plan = column_plan(chunk.columns)
+                sampler = _content_sampler(plan, chunk.columns)
+            if sampler is not None:
+                sampler.add(chunk)
+            for col, dtype in chunk.dtypes.items():
+                seen.setdefault(col, set()).add(dtype)
+    if sampler is not None:
+        plan = extend_plan(plan, seen, detect_column_kinds(sampler.sample))
+    return _reconcile_dtypes(seen), plan
+
+
+def _mask_csv_chunked(
+    open_source,
+    output_path: Path | None,
+    read_options: dict,
+    chunksize: int,
+    stats: MaskStats | None = None,
+    parquet_path: Path | None = None,
+) -> dict:
+    """
+    Mask a CSV in fixed-size row chunks, appending to `output_path` with the header written once.
+
+    `open_source` returns a fresh path or binary stream for each pass (streams are
+    closed after the pass, e.g. a decrypting reader over a .bin). The first pass
+    only infers column dtypes, so the second pass parses every chunk exactly as a
+    whole-file read would and the output matches the non-streaming result byte for byte.
+    Memory stays bounded by the chunk size. With `parquet_path` the masked chunks
+    are also (or, if `output_path` is None, only) appended to a Parquet file.
+
+    Returns the read options used: the encoding falls back to latin-1 when the
+    file holds invalid UTF-8 beyond the sample its dialect was detected from.
+    """
+    try:
+        dtypes, plan = _chunk_dtypes(open_source, read_options, chunksize)
+    except UnicodeDecodeError:
+        # The first pass decodes every byte, so the second one cannot hit this
+        read_options = {**read_options, "encoding": "latin-1"}
+        dtypes, plan = _chunk_dtypes(open_source, read_options, chunksize)
+
+    with contextlib.ExitStack() as stack:
+        source = stack.enter_context(_opened(open_source()))
+        out = stack.enter_context(open(output_path, "w", encoding="utf-8", newline="")) if output_path else None
+        parquet = stack.enter_context(contextlib.closing(ParquetChunkWriter(parquet_path))) if parquet_path else None
+        reader = pd.read_csv(source, chunksize=chunksize, dtype=dtypes, **read_options)
+        for index, chunk in enumerate(reader):
+            masked = mask_dataframe(chunk, inplace=True, stats=stats, plan=plan)
+            if out is not None:
+                masked.to_csv(out, header=index == 0, index=False)
+            if parquet is not None:
+                parquet.write(masked)
+    return read_options
+
+
+def _content_sampler(plan: ColumnPlan, columns) -> ContentSampler | None:
+    """Sampler over the columns `plan` leaves unclassified, if content detection is enabled."""
+    if not config.CONTENT_DETECTION:
+        return None
+    named = {column for column, _ in plan.columns}
+    return ContentSampler(
+        [column for column in columns if column not in named],
+        config.CONTENT_SAMPLE_ROWS,
+        config.CONTENT_SAMPLE_SEED,
+    )
+
+
+def _frame_plan(df: pd.DataFrame) -> ColumnPlan:
+    """Column plan of a frame, extended by content detection on a sample of its rows if enabled."""
+    plan = column_plan(df.columns)
+    sampler = _content_sampler(plan, df.columns)
+    if sampler is None:
+        return plan
+    sampler.add(df)
+    return extend_plan(plan, df.columns, detect_column_kinds(sampler.sample))
+
+
+def _opened(source):
+    """Context manager closing `source` afterwards if it is a stream (paths are left to pandas)."""
+    return contextlib.nullcontext(source) if isinstance(source, (str, Path)) else contextlib.closing(source)
+
+
+def _mask_identifier(value: str) -> str:
+    if pd.isna(value):
+        return value
+    value_str = str(value)
+    # If scientific notation, keep as string and mask all but last 3 digits
+    if "e" in value_str.lower():
+        digits = re.sub(r"\D", "", value_str)
+        if len(digits) > 3:
+            return "*" * (len(digits) - 3) + digits[-3:]
+        return "*" * len(digits)
+    # Otherwise, mask as normal
+    return _mask_value(value_str)
+
+
+# ── Vectorized masking kernels ────────────────────────────────────────
+# Values are laid out as an (n, width) matrix of character codes, so each rule
+# above becomes a handful of whole-array NumPy operations. Only ASCII values
+# without NUL take this path (Python's str.strip and \D are Unicode-aware);
+# anything else falls back to the scalar function so results are always identical.
+
+_STAR = np.uint8(ord("*"))
+_IS_ASCII_WHITESPACE = np.isin(np.arange(128), [9, 10, 11, 12, 13, 28, 29, 30, 31, 32])
+_NON_DIGITS = bytes(c for c in range(1, 256) if not ord("0") <= c <= ord("9"))
+_MAX_VECTOR_WIDTH = 256
+
+
+def _char_matrix(values: np.ndarray, width: int) -> np.ndarray:
+    return values.astype(f"S{width}").view(np.uint8).reshape(len(values), width)
+
+
+def _from_char_matrix(chars: np.ndarray) -> list[str]:
+    # Unused trailing positions are 0, which NumPy drops when reading the strings back
+    chars = np.ascontiguousarray(chars, dtype=np.uint8)
+    return [b.decode("ascii") for b in chars.view(f"S{chars.shape[1]}").ravel().tolist()]
+
+
+def _positions(chars: np.ndarray) -> np.ndarray:
+    return np.arange(chars.shape[1], dtype=np.int16)[None, :]
+
+
+def _last_true(flags: np.ndarray) -> np.ndarray:
+    """Index of the last True in each row (-1 if none)."""
+    last = flags.shape[1] - 1 - np.argmax(np.ascontiguousarray(flags[:, ::-1]), axis=1)
+    return np.where(flags.any(axis=1), last, -1)
+
+
+def _strip(chars: np.ndarray, lengths: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Left-align each value without surrounding whitespace; returns (chars, lengths)."""
+    whitespace = _IS_ASCII_WHITESPACE[chars]
+    if not whitespace.any():
+        return chars, lengths
+    pos = _positions(chars)
+    solid = (pos < lengths[:, None]) & ~whitespace
+    first = np.argmax(solid, axis=1)
+    stripped_len = np.maximum(_last_true(solid) - first + 1, 0)
+    if first.any():
+        chars = np.take_along_axis(chars, np.minimum(first[:, None] + pos, chars.shape[1] - 1), axis=1)
+    return np.where(pos < stripped_len[:, None], chars, 0), stripped_len
+
+
+def _digits(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Digits of each value, left-aligned; returns (chars, digit counts)."""
+    # One C-level pass over the whole column: join on NUL, drop non-digits, split
+    pieces = "\x00".join(values).encode("ascii").translate(None, _NON_DIGITS).split(b"\x00")
+    counts = np.fromiter(map(len, pieces), dtype=np.int16, count=len(pieces))
+    width = max(1, int(counts.max()))
+    return np.array(pieces, dtype=f"S{width}").view(np.uint8).reshape(len(pieces), width), counts
+
+
+def _apply_keep(chars: np.ndarray, lengths: np.ndarray, keep: np.ndarray) -> np.ndarray:
+    """Replace every character not in `keep` with '*' (positions past the end stay empty)."""
+    valid = _positions(chars) < lengths[:, None]
+    return np.where(valid, np.where(keep, chars, _STAR), 0)
+
+
+def _generic_keep(chars: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    pos, n = _positions(chars), lengths[:, None]
+    return np.where(
+        n <= 2,
+        False,
+        np.where(n <= 4, pos == 0, (pos < 2) | (pos >= n - 2)),
+    )
+
+
+def _mask_value_kernel(values: np.ndarray, chars: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    chars, lengths = _strip(chars, lengths)
+    return _apply_keep(chars, lengths, _generic_keep(chars, lengths))
+
+
+def _mask_email_kernel(values: np.ndarray, chars: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    chars, lengths = _strip(chars, lengths)
+    pos = _positions(chars)
+    at_sign = chars == ord("@")
+    has_at = at_sign.any(axis=1)[:, None]
+    at = np.argmax(at_sign, axis=1)[:, None]
+    # Last "." of the domain part
+    dots = (chars == ord(".")) & (pos > at)
+    last_dot = _last_true(dots)[:, None]
+    # Local part and domain name keep their first character; "@", the last "."
+    # and the extension are kept as-is
+    keep = ((pos == 0) & (at > 0)) | (pos == at) | (pos == at + 1) | ((last_dot >= 0) & (pos >= last_dot))
+    if not has_at.all():
+        keep = np.where(has_at, keep, _generic_keep(chars, lengths))
+    return _apply_keep(chars, lengths, keep)
+
+
+def _mask_ssn_kernel(values: np.ndarray, chars: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    digits, count = _digits(values)
+    digits = np.pad(digits, ((0, 0), (0, max(0, 4 - digits.shape[1]))))
+    last4 = np.take_along_axis(digits, np.maximum(count[:, None] - 4, 0) + np.arange(4)[None, :], axis=1)
+    prefix = np.broadcast_to(np.frombuffer(b"***-**-", dtype=np.uint8), (len(digits), 7))
+    full = np.concatenate([prefix, last4], axis=1)
+    short = np.where(np.arange(11)[None, :] < count[:, None], _STAR, 0)
+    return np.where((count >= 4)[:, None], full, short)
+
+
+def _mask_trailing_digits(digits: np.ndarray, count: np.ndarray, keep: int) -> np.ndarray:
+    pos, n = _positions(digits), count[:, None]
+    return _apply_keep(digits, count, (n > keep) & (pos >= n - keep))
+
+
+def _mask_phone_kernel(values: np.ndarray, chars: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    return _mask_trailing_digits(*_digits(values), keep=3)
+
+
+def _mask_credit_card_kernel(values: np.ndarray, chars: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    digits, count = _digits(values)
+    masked = _apply_keep(digits, count, _positions(digits) >= count[:, None] - 4)
+    # Group in fours: character i moves to i + i // 4, leaving a space between groups
+    width = digits.shape[1]
+    out_len = np.where(count > 0, count + (count - 1) // 4, 0)
+    grouped = np.zeros((len(digits), width + (width - 1) // 4), dtype=np.uint8)
+    grouped[_positions(grouped) < out_len[:, None]] = ord(" ")
+    cols = np.arange(width)
+    grouped[:, cols + cols // 4] = np.where(masked > 0, masked, grouped[:, cols + cols // 4])
+    return grouped
+
+
+def _mask_identifier_kernel(values: np.ndarray, chars: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    # Scientific notation (e.g. 1.23E+11 from a spreadsheet export): keep last 3 digits
+    scientific = ((chars == ord("e")) | (chars == ord("E"))).any(axis=1)[:, None]
+    plain = _mask_value_kernel(values, chars, lengths)
+    if not scientific.any():
+        return plain
+    sci = _mask_trailing_digits(*_digits(values), keep=3)
+    width = max(sci.shape[1], plain.shape[1])
+    sci = np.pad(sci, ((0, 0), (0, width - sci.shape[1])))
+    plain = np.pad(plain, ((0, 0), (0, width - plain.shape[1])))
+    return np.where(scientific, sci, plain)
+
+
+_MASKERS = {
+    "email": (_mask_email_kernel, _mask_email),
+    "ssn": (_mask_ssn_kernel, _mask_ssn),
+    "card": (_mask_credit_card_kernel, _mask_credit_card),
+    "phone": (_mask_phone_kernel, _mask_phone),
+    "identifier": (_mask_identifier_kernel, _mask_identifier),
+    "generic": (_mask_value_kernel, _mask_value),
+}
+
+
+def _mask_strings(values: np.ndarray, kind: str) -> np.ndarray:
+    """Mask an object array of str with the kernel for `kind` (scalar fallback where needed)."""
+    kernel, scalar = _MASKERS[kind]
+    masked = np.empty(len(values), dtype=object)
+    lengths = np.fromiter(map(len, values), dtype=np.int64, count=len(values))
+    fast = (lengths <= _MAX_VECTOR_WIDTH) & np.fromiter(map(str.isascii, values), dtype=bool, count=len(values))
+    if fast.any():
+        fast_values = values[fast]
+        chars = _char_matrix(fast_values, max(1, int(lengths[fast].max())))
+        # An embedded NUL cannot be represented in a NumPy byte string
+        exact = np.count_nonzero(chars, axis=1) == lengths[fast]
+        if not exact.all():
+            fast[np.flatnonzero(fast)[~exact]] = False
+            fast_values, chars = fast_values[exact], chars[exact]
+        if len(fast_values):
+            masked[fast] = _from_char_matrix(kernel(fast_values, chars, lengths[fast].astype(np.int16)))
+    if not fast.all():
+        masked[~fast] = [scalar(value) for value in values[~fast]]
+    return masked
+
+
+# Columns are factorized unless a strided sample of this many values shows fewer
+# than _MIN_REPEATED of them repeating (mostly distinct columns gain nothing)
+_DISTINCT_SAMPLE = 10_000
+_MIN_REPEATED = 0.1
+
+
+def _factorize_strings(values: pd.Series) -> tuple[np.ndarray | None, np.ndarray]:
+    """
+    Codes and distinct str forms of non-null `values`, so each distinct value is
+    converted and masked once (str(distinct[codes]) == str(values)). Codes are
+    None when the column is not factorized (its str forms are returned as they are).
+    """
+    if values.dtype == object or values.dtype.kind == "f":
+        # Equal as Python objects is not equal as text (1 == True, 0.0 == -0.0), so compare the text
+        values = values.astype(str)
+    if len(values) > _DISTINCT_SAMPLE:
+        sample = values.iloc[:: len(values) // _DISTINCT_SAMPLE]
+        if sample.nunique() > (1 - _MIN_REPEATED) * len(sample):
+            return None, values.astype(str).to_numpy(dtype=object)
+    codes, distinct = pd.factorize(values)
+    return codes, pd.Series(distinct).astype(str).to_numpy(dtype=object)
+
+
+def _mask_series(series: pd.Series, kind: str, stats: MaskStats | None = None) -> pd.Series:
+    """
+    Mask one column with the vectorized kernel for its kind; nulls are left as they are.
+
+    Columns with repeated values are factorized first, so the masking work grows
+    with the number of distinct values rather than rows.
+    """
+    present = series.notna().to_numpy()
+    masked = series.astype(object)
+    changed = 0
+    if present.any():
+        codes, distinct = _factorize_strings(series[present])
+        masked_distinct = _mask_strings(distinct, kind)
+        masked[present] = masked_distinct if codes is None else masked_distinct[codes]
+        if stats is not None:
+            changed_distinct = masked_distinct != distinct
+            changed = int(np.count_nonzero(changed_distinct if codes is None else changed_distinct[codes]))
+    if stats is not None:
+        detected = int(np.count_nonzero(present))
+        stats.add(kind, str(series.name), detected, changed, len(series) - detected)
+    return masked
+
+
+def mask_dataframe(
+    df: pd.DataFrame,
+    inplace: bool = False,
+    stats: MaskStats | None = None,
+    plan: ColumnPlan | None = None,
+) -> pd.DataFrame:
+    """
+    Mask every sensitive column of a DataFrame.
+
+    With `inplace=True` the columns of `df` are replaced directly and `df` is
+    returned, skipping the defensive copy (for frames the caller owns, such as
+    freshly parsed chunks). Counts are added to `stats` when given.
+    `plan` is the frame's ColumnPlan if the caller already has it; otherwise it
+    is looked up from the header (and content detection run on a sample of `df`
+    when config.CONTENT_DETECTION is set).
+    """
+    df_masked = df if inplace else df.copy()
+    for col, kind in (plan or _frame_plan(df_masked)).columns:
+        df_masked[col] = _mask_series(df_masked[col], kind, stats)
+    if stats is not None:
+        stats.rows += len(df_masked)
     return df_masked
 
 
-def mask_sensitive_columns(csv_file: str | Path, output_dir: Path | None = None) -> Path:
-    csv_path = Path(csv_file)
-    if not csv_path.exists():
+def mask_sensitive_columns(
+    csv_file: str | Path | CsvArtifact,
+    output_dir: Path | None = None,
+    chunksize: int | None = None,
+    dialect: dict | None = None,
+    stats: MaskStats | None = None,
+    output_format: str | None = None,
+) -> Path:
+    """
+    Mask sensitive columns of a CSV and write `<stem>_masked.csv` and/or `<stem>_masked.parquet`.
+
+    When given a CsvArtifact, the raw bytes already in memory are parsed (or the
+    already-parsed frame reused) and the artifact's frame, dialect, masked frame
+    and masked output bytes are filled in for later stages.
+
+    With `chunksize`, the file is streamed in chunks of that many rows instead of
+    being loaded whole, for inputs larger than memory. The output is identical.
+
+    `dialect` ({"encoding", "delimiter"}, e.g. from a previous run) is tried before
+    detecting the dialect again; it is ignored if it no longer fits the file.
+
+    Pass a MaskStats as `stats` to collect per-kind counts of what was masked.
+
+    `output_format` ("csv", "parquet" or "both"; defaults to
+    config.MASKED_OUTPUT_FORMAT) selects the files written. The returned path is
+    the CSV, or the Parquet file when only that is written; with "both" the
+    Parquet file sits next to the CSV (see masked_output_paths).
+
+    Raises:
+        FileNotFoundError: If the CSV file does not exist.
+        ValueError: If the output format is unknown or the CSV cannot be parsed.
+        ImportError: If Parquet output is requested and pyarrow is not installed.
+    """
+    artifact = csv_file if isinstance(csv_file, CsvArtifact) else None
+    csv_path = artifact.path if artifact else Path(csv_file)
+    if artifact is None and not csv_path.exists():
         raise FileNotFoundError(f"CSV file not found: {csv_path}")
 
+    output_format = check_masked_output_format(output_format or config.MASKED_OUTPUT_FORMAT)
     target_dir = output_dir or config.OUTPUT_DIR
-    output_path = target_dir / f"{csv_path.stem}_masked.csv"
+    output_paths = masked_output_paths(csv_path, target_dir, output_format)
+    csv_output = next((path for path in output_paths if path.suffix == ".csv"), None)
+    parquet_output = next((path for path in output_paths if path.suffix == ".parquet"), None)
     target_dir.mkdir(parents=True, exist_ok=True)
 
-    df = _read_csv_flexible(csv_path)
-    df_masked = mask_dataframe(df)
+    if chunksize:
+        source = artifact.raw if artifact else csv_path
+        dialect = _streaming_dialect(source, dialect or (artifact.dialect if artifact else None))
+        read_options = _mask_csv_chunked(
+            lambda: _csv_source(source), csv_output, _read_options(dialect), chunksize, stats, parquet_output
+        )
+        if artifact is not None:
+            artifact.dialect = {**dialect, "encoding": read_options["encoding"]}
+        return output_paths[0]
+
+    if artifact is None:
+        df, _ = _read_csv_with_dialect(csv_path, dialect)
+        df_masked = mask_dataframe(df, inplace=True, stats=stats)
+        if csv_output is not None:
+            df_masked.to_csv(csv_output, index=False)
+        if parquet_output is not None:
+            write_parquet(df_masked, parquet_output)
+        return output_paths[0]
+
+    if artifact.frame is None:
+        artifact.frame, artifact.dialect = _read_csv_with_dialect(artifact.raw, dialect or artifact.dialect)
+    artifact.masked = mask_dataframe(artifact.frame, stats=stats)
+    if parquet_output is not None:
+        buffer = io.BytesIO()
+        write_parquet(artifact.masked, buffer)
+        parquet_output.write_bytes(buffer.getvalue())
+        artifact.masked_path, artifact.masked_raw = parquet_output, buffer.getvalue()
+    if csv_output is not None:
+        artifact.masked_raw = artifact.masked.to_csv(index=False).encode("utf-8")
+        artifact.masked_path = csv_output
+        csv_output.write_bytes(artifact.masked_raw)
+    return output_paths[0]
+
 
-    df_masked.to_csv(output_path, index=False)
-    return output_path
+def masked_output_paths(csv_path: Path, output_dir: Path, output_format: str | None = None) -> list[Path]:
+    """Masked files written for `csv_path` in `output_format` (default config.MASKED_OUTPUT_FORMAT), primary first."""
+    output_format = output_format or config.MASKED_OUTPUT_FORMAT
+    suffixes = {"csv": [".csv"], "parquet": [".parquet"], "both": [".csv", ".parquet"]}[output_format]
+    return [output_dir / f"{csv_path.stem}_masked{suffix}" for suffix in suffixes]
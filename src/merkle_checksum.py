@@ -0,0 +1,208 @@
+"""
+Block-level (Merkle-style) checksums.
+
+The content (line-ending-normalized if it is valid UTF-8, raw bytes otherwise,
+as for sha256 checksums) is cut into fixed-size blocks, each block is
+hashed separately (on a thread pool - hashlib releases the GIL) and the root is
+the SHA-256 of the concatenated block digests. Comparing block digests tells
+which parts of a file changed, not just that it did.
+
+Checksum file layout (JSON):
+
+    {"format": "merkle-sha256", "version": 1, "block_size": 1048576,
+     "size": <normalized bytes>, "root": "<hex>", "blocks": ["<hex>", ...]}
+
+Byte offsets refer to the normalized content (the file itself for LF and binary files).
+An edit that changes the content length shifts every block after it, so all of
+those are reported as changed.
+"""
+
+import codecs
+import hashlib
+import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator
+
+from . import config
+from .generate_checksum import _LineEndingNormalizer
+
+MERKLE_FORMAT = "merkle-sha256"
+MERKLE_VERSION = 1
+
+
+def is_merkle_checksum(text: str) -> bool:
+    """True if checksum file contents are in the Merkle format (legacy files hold a bare hex digest)."""
+    return text.lstrip().startswith("{")
+
+
+class _NotText(Exception):
+    """Invalid UTF-8 found after line endings were already normalized."""
+
+
+def _normalized_blocks(source: Path | bytes, block_size: int, normalize: bool = True) -> Iterator[bytes]:
+    """
+    Yield the normalized content in blocks of exactly `block_size` bytes (the last may be shorter).
+
+    As for sha256 checksums, only valid UTF-8 is normalized. Content found to be
+    binary before any CR is simply cut as-is from there; if a CR was normalized
+    already, _NotText is raised and the caller starts again with `normalize=False`.
+    """
+    normalizer = _LineEndingNormalizer()
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    seen_cr = False
+    buffer = bytearray()
+
+    def raw_blocks():
+        if isinstance(source, bytes):
+            for start in range(0, len(source), block_size):
+                yield source[start : start + block_size]
+            return
+        with open(source, "rb") as f:
+            while block := f.read(block_size):
+                yield block
+
+    def to_binary():
+        nonlocal normalize
+        if seen_cr:
+            raise _NotText
+        normalize = False  # nothing was changed so far, so the blocks yielded are the raw content
+
+    for raw in raw_blocks():
+        if normalize:
+            try:
+                decoder.decode(raw)
+            except UnicodeDecodeError:
+                to_binary()
+        if normalize:
+            seen_cr = seen_cr or b"\r" in raw
+            normalized = normalizer.feed(raw)
+        else:
+            normalized = raw
+        if not buffer and len(normalized) == block_size:
+            yield normalized  # common case (no CRs): no copy through the buffer
+            continue
+        buffer += normalized
+        while len(buffer) >= block_size:
+            yield bytes(buffer[:block_size])
+            del buffer[:block_size]
+    if normalize:
+        try:
+            decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            to_binary()
+        if normalize:
+            buffer += normalizer.flush()
+    if buffer:
+        yield bytes(buffer)
+
+
+def _hash_block(block: bytes) -> tuple[str, int, bool]:
+    return hashlib.sha256(block).hexdigest(), block.count(b"\n"), block.endswith(b"\n")
+
+
+def _hash_blocks(source: Path | bytes, block_size: int, threads: int) -> tuple[list[tuple[str, int, bool]], int]:
+    """Hash blocks in order with at most 2 * `threads` blocks in memory; returns (per-block results, size)."""
+    with ThreadPoolExecutor(max_workers=max(threads, 1)) as pool:
+        try:
+            return _hash_block_stream(pool, _normalized_blocks(source, block_size), threads)
+        except _NotText:
+            # Binary content with CRs: hash the raw bytes instead
+            return _hash_block_stream(pool, _normalized_blocks(source, block_size, normalize=False), threads)
+
+
+def _hash_block_stream(pool: ThreadPoolExecutor, blocks: Iterator[bytes], threads: int) -> tuple[list, int]:
+    results = []
+    size = 0
+    pending = deque()
+    for block in blocks:
+        size += len(block)
+        pending.append(pool.submit(_hash_block, block))
+        if len(pending) >= 2 * max(threads, 1):
+            results.append(pending.popleft().result())
+    results.extend(future.result() for future in pending)
+    return results, size
+
+
+def compute_merkle_checksum(
+    source: Path | bytes,
+    block_size: int | None = None,
+    threads: int | None = None,
+) -> dict:
+    """
+    Merkle checksum of a file path or raw bytes.
+
+    Args:
+        source: Path to the file, or its raw bytes.
+        block_size: Normalized bytes per block (defaults to config.MERKLE_BLOCK_SIZE).
+        threads: Hashing threads (defaults to config.CHECKSUM_THREADS).
+
+    Returns:
+        The checksum document (see module docstring).
+    """
+    block_size = block_size or config.MERKLE_BLOCK_SIZE
+    blocks, size = _hash_blocks(source, block_size, threads or config.CHECKSUM_THREADS)
+    digests = [digest for digest, _, _ in blocks]
+    return {
+        "format": MERKLE_FORMAT,
+        "version": MERKLE_VERSION,
+        "block_size": block_size,
+        "size": size,
+        "root": _root(digests),
+        "blocks": digests,
+    }
+
+
+def _root(digests: list[str]) -> str:
+    return hashlib.sha256(b"".join(bytes.fromhex(d) for d in digests)).hexdigest()
+
+
+def dumps_merkle_checksum(document: dict) -> str:
+    return json.dumps(document, indent=2)
+
+
+def loads_merkle_checksum(text: str) -> dict:
+    """Parse a Merkle checksum file, raising ValueError if it is not one this version understands."""
+    document = json.loads(text)
+    if document.get("format") != MERKLE_FORMAT or document.get("version") != MERKLE_VERSION:
+        raise ValueError("Unsupported checksum file format.")
+    return document
+
+
+def find_changed_ranges(expected: dict, source: Path | bytes, threads: int | None = None) -> list[dict]:
+    """
+    Compare a file against a stored Merkle checksum.
+
+    Returns one entry per run of consecutive changed blocks, e.g.
+    {"bytes": [start, end], "rows": [first, last]}: the byte range [start, end)
+    of the current normalized content and the first/last line numbers it covers
+    (1-based, counting the header line). Blocks that exist only in the stored
+    checksum (the file got shorter) are reported from the end of the current file.
+    An empty list means the file matches.
+    """
+    block_size = expected["block_size"]
+    stored = expected["blocks"]
+    current, size = _hash_blocks(source, block_size, threads or config.CHECKSUM_THREADS)
+
+    changed = []
+    line = 1
+    for index in range(max(len(stored), len(current))):
+        if index < len(current):
+            digest, newlines, ends_with_newline = current[index]
+            first_line = line
+            line += newlines
+            if index < len(stored) and stored[index] == digest:
+                continue
+            start = index * block_size
+            span = {"bytes": [start, min(start + block_size, size)], "rows": [first_line, line - ends_with_newline]}
+        else:
+            last_line = line - 1 if current and current[-1][2] else line
+            span = {"bytes": [size, size], "rows": [last_line, last_line]}
+
+        if changed and changed[-1]["bytes"][1] == span["bytes"][0]:
+            changed[-1]["bytes"][1] = span["bytes"][1]
+            changed[-1]["rows"][1] = max(changed[-1]["rows"][1], span["rows"][1])
+        else:
+            changed.append(span)
+    return changed
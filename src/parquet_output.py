@@ -0,0 +1,84 @@
+"""
+Parquet output for masked data (optional; needs pyarrow).
+
+Masked frames are written with config.PARQUET_COMPRESSION and row groups of
+config.PARQUET_ROW_GROUP_ROWS rows. Streamed (chunked) masking appends each
+chunk to one file, so the output is a single Parquet file either way.
+"""
+
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
+
+from . import config
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+MASKED_OUTPUT_FORMATS = ("csv", "parquet", "both")
+
+
+def check_masked_output_format(output_format: str) -> str:
+    """Validate a masked output format, raising ValueError (or ImportError if Parquet needs pyarrow)."""
+    if output_format not in MASKED_OUTPUT_FORMATS:
+        raise ValueError(
+            f"Unknown MASKED_OUTPUT_FORMAT: {output_format!r} (use one of {', '.join(MASKED_OUTPUT_FORMATS)})"
+        )
+    if output_format != "csv":
+        _pyarrow()
+    return output_format
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as exc:
+        raise ImportError(
+            "Parquet output requires pyarrow. Install it with `pip install pyarrow` "
+            "or set MASKED_OUTPUT_FORMAT=csv."
+        ) from exc
+    return pyarrow
+
+
+def write_parquet(df: "pd.DataFrame", target: Path | BinaryIO) -> None:
+    """Write a whole masked frame as Parquet."""
+    _pyarrow()
+    df.to_parquet(
+        target,
+        engine="pyarrow",
+        compression=config.PARQUET_COMPRESSION,
+        row_group_size=config.PARQUET_ROW_GROUP_ROWS,
+        index=False,
+    )
+
+
+class ParquetChunkWriter:
+    """
+    Appends masked chunks to one Parquet file.
+
+    The schema comes from the first chunk; columns that are entirely null there
+    are typed as strings, so later chunks with values still fit.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._pa = _pyarrow()
+        self._writer = None
+        self._schema = None
+
+    def write(self, chunk: "pd.DataFrame") -> None:
+        pa = self._pa
+        if self._writer is None:
+            schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+            for i, field in enumerate(schema):
+                if pa.types.is_null(field.type):
+                    schema = schema.set(i, field.with_type(pa.string()))
+            self._schema = schema
+            self._writer = pa.parquet.ParquetWriter(self.path, schema, compression=config.PARQUET_COMPRESSION)
+        table = pa.Table.from_pandas(chunk, schema=self._schema, preserve_index=False)
+        self._writer.write_table(table, row_group_size=config.PARQUET_ROW_GROUP_ROWS)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
@@ -1,16 +1,24 @@
 """Main orchestrator - processes all CSV files from input folder to output folder."""
 
+import argparse
+import contextlib
 import logging
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 from . import config
-from .mask_sensitive_columns import mask_sensitive_columns
-from .generate_checksum import generate_checksum
-from .verify_file_integrity import verify_file_integrity
+from .generate_checksum import generate_checksum, _bytes_checksum
+from .verify_file_integrity import check_file_integrity
 from .encrypt_csv import encrypt_csv_output
 from .decrypt_csv import decrypt_csv_output
-from .reporting import write_pipeline_summary
+from .csv_artifact import load_csv_artifact
+from .download_records import downloaded_checksum
+from . import run_manifest
+from .parquet_output import check_masked_output_format
+from .render_queue import REPORT_MODES, RenderJob, RenderQueue, render
+from .stage_metrics import timed_stage
 
 logger = logging.getLogger(__name__)
 
@@ -50,27 +58,72 @@ def _configure_pipeline_logging() -> None:
     logger.addHandler(error_file_handler)
 
 
-def _process_csv_file(csv_path: Path, skip_encryption: bool) -> dict:
-    """Process a single CSV: verify → encrypt → mask → checksum."""
+def _unchanged_result(file_path: Path, fingerprint: dict, manifest_entry: dict | None, force: bool) -> dict | None:
+    """Result for a file whose manifest entry still matches, or None if it must be processed."""
+    if force or not run_manifest.is_unchanged(manifest_entry, fingerprint, _file_output_dir(file_path)):
+        return None
+    result = {"file": str(file_path.name), "status": "unchanged", "outputs": list(manifest_entry["outputs"])}
+    if manifest_entry.get("dialect"):
+        result["dialect"] = manifest_entry["dialect"]
+    return result
+
+
+def _process_csv_file(
+    csv_path: Path,
+    skip_encryption: bool,
+    manifest_entry: dict | None = None,
+    force: bool = False,
+    reports: str = "inline",
+) -> dict:
+    """
+    Process a single CSV: verify → encrypt → mask → checksum.
+
+    The file is read from disk once; every stage works on the in-memory artifact.
+    Files larger than config.STREAMING_THRESHOLD_BYTES are not loaded whole: each
+    stage works from the path and masking streams in chunks.
+    If `manifest_entry` matches the file's fingerprint (and not `force`), nothing
+    runs and the result is reported as unchanged; otherwise its recorded dialect
+    is tried first when parsing.
+    Summary images are handled according to `reports` (see _add_report).
+    Wall/CPU time and bytes/rows in and out of each stage go to result["stages"].
+    Files fetched by src.download_csv reuse the checksum computed while they were
+    downloaded, as long as they have not changed since.
+    """
     result = {"file": str(csv_path.name), "status": "ok", "outputs": []}
     file_output_dir = config.OUTPUT_DIR / csv_path.stem
     file_output_dir.mkdir(parents=True, exist_ok=True)
-    from .reporting import generate_file_security_summary, generate_failed_file_summary
+    from .mask_sensitive_columns import MaskStats, mask_sensitive_columns, masked_output_paths, _streaming_dialect
     try:
-        integrity_verified = verify_file_integrity(csv_path, output_dir=file_output_dir)
+        size = csv_path.stat().st_size
+        streaming = size > config.STREAMING_THRESHOLD_BYTES
+        with timed_stage(result, "read", bytes_in=size):
+            known_checksum = downloaded_checksum(csv_path)
+            artifact = None if streaming else load_csv_artifact(csv_path)
+            source = csv_path if streaming else artifact
+            fingerprint = run_manifest.file_fingerprint(
+                csv_path,
+                skip_encryption,
+                content_sha256=known_checksum or (None if streaming else _bytes_checksum(artifact.raw)),
+                reports=reports,
+            )
+        unchanged = _unchanged_result(csv_path, fingerprint, manifest_entry, force)
+        if unchanged is not None:
+            unchanged["stages"] = result["stages"]
+            return unchanged
+        result["fingerprint"] = fingerprint
+        dialect_hint = (manifest_entry or {}).get("dialect")
+
+        with timed_stage(result, "verify", bytes_in=size):
+            integrity = check_file_integrity(source, output_dir=file_output_dir, known_checksum=known_checksum)
+        integrity_verified = integrity["verified"]
         if not integrity_verified:
             result["status"] = "integrity_failed"
             result["outputs"].append("integrity_verification_failed")
-            try:
-                fail_img = generate_failed_file_summary(
-                    file_path=csv_path,
-                    error_message="File integrity verification failed.",
-                    status="integrity_failed",
-                    output_dir=file_output_dir,
-                )
-                result["outputs"].append(str(fail_img.name))
-            except Exception:
-                logger.warning("Could not generate failed report for %s", csv_path.name)
+            if integrity.get("changed"):
+                result["changed_ranges"] = integrity["changed"]
+            _add_failed_report(
+                result, reports, csv_path, _integrity_failure_message(integrity), "integrity_failed", file_output_dir
+            )
             return result
 
         result["outputs"].append("integrity_verified")
@@ -79,65 +132,156 @@ def _process_csv_file(csv_path: Path, skip_encryption: bool) -> dict:
         enc_path = None
         if not skip_encryption:
             try:
-                enc_path = encrypt_csv_output(csv_path, output_dir=file_output_dir)
+                with timed_stage(result, "encrypt", bytes_in=size) as metrics:
+                    enc_path = encrypt_csv_output(source, output_dir=file_output_dir)
+                    metrics["bytes_out"] = enc_path.stat().st_size
                 result["outputs"].append(str(enc_path.name))
             except ValueError as e:
                 if "Encryption key not configured" in str(e):
                     logger.warning("Skipping encryption: %s", e)
+                    del result["stages"]["encrypt"]
                 else:
                     raise
 
         # Mask the original CSV for security
-        masked_path = mask_sensitive_columns(csv_path, output_dir=file_output_dir)
-        result["outputs"].append(str(masked_path.name))
-
-        checksum_path, _ = generate_checksum(masked_path, output_dir=file_output_dir)
-        result["outputs"].append(str(checksum_path.name))
-
-        # Generate per-file security summary image
-        summary_img_path = generate_file_security_summary(
-            file_path=csv_path,
-            masked_path=masked_path,
-            encrypted_path=enc_path if enc_path else Path(),
-            checksum_path=checksum_path,
-            integrity_verified=integrity_verified,
-            status=result["status"],
-            output_dir=file_output_dir,
-        )
-        result["outputs"].append(str(summary_img_path.name))
+        mask_stats = MaskStats()
+        with timed_stage(result, "mask", bytes_in=size) as metrics:
+            if streaming:
+                dialect = _streaming_dialect(csv_path, dialect_hint)
+                mask_sensitive_columns(
+                    csv_path,
+                    output_dir=file_output_dir,
+                    chunksize=config.MASK_CHUNK_ROWS,
+                    dialect=dialect,
+                    stats=mask_stats,
+                )
+            else:
+                mask_sensitive_columns(
+                    artifact, output_dir=file_output_dir, dialect=dialect_hint, stats=mask_stats
+                )
+                dialect = artifact.dialect
+            masked_paths = masked_output_paths(csv_path, file_output_dir)
+            metrics["rows_in"] = metrics["rows_out"] = mask_stats.rows
+            metrics["bytes_out"] = sum(path.stat().st_size for path in masked_paths)
+        result["outputs"].extend(path.name for path in masked_paths)
+        result["dialect"] = dialect
+        result["mask_stats"] = mask_stats.to_dict()
+
+        # One checksum per masked file written (CSV and/or Parquet)
+        with timed_stage(result, "checksum", bytes_in=result["stages"]["mask"]["bytes_out"]) as metrics:
+            checksum_paths = []
+            for path in masked_paths:
+                in_memory = not streaming and artifact.masked_path == path
+                checksum_path, _ = generate_checksum(
+                    artifact.masked_artifact() if in_memory else path,
+                    output_dir=file_output_dir,
+                )
+                checksum_paths.append(checksum_path)
+            metrics["bytes_out"] = sum(path.stat().st_size for path in checksum_paths)
+        result["outputs"].extend(path.name for path in checksum_paths)
+
+        # Per-file security summary image, drawn from the masking stats per `reports`
+        if reports != "none":
+            job = RenderJob(
+                kind="file_summary",
+                output_path=file_output_dir / f"{csv_path.stem}_security_summary.png",
+                kwargs={
+                    "file_path": csv_path,
+                    "mask_stats": result["mask_stats"],
+                    "integrity_verified": integrity_verified,
+                    "status": result["status"],
+                    "output_dir": file_output_dir,
+                },
+            )
+            if reports == "inline":
+                # Deferred images are drawn in the render queue, outside this file's stages
+                with timed_stage(result, "report") as metrics:
+                    _add_report(result, reports, job)
+                    metrics["bytes_out"] = job.output_path.stat().st_size
+            else:
+                _add_report(result, reports, job)
 
     except Exception as e:
         logger.exception("Error processing %s", csv_path.name)
         result["status"] = "error"
         result["error"] = str(e)
-        try:
-            fail_img = generate_failed_file_summary(
-                file_path=csv_path,
-                error_message=str(e),
-                status="error",
-                output_dir=file_output_dir,
-            )
-            result["outputs"].append(str(fail_img.name))
-        except Exception:
-            logger.warning("Could not generate failed report for %s", csv_path.name)
+        _add_failed_report(result, reports, csv_path, str(e), "error", file_output_dir)
 
     return result
 
 
-def _process_encrypted_file(bin_path: Path, skip_encryption: bool) -> dict:
-    """Process a single .bin file: decrypt (separate process)."""
+def _add_report(result: dict, reports: str, job: RenderJob) -> None:
+    """
+    Handle one summary image for a file result according to the reports mode.
+
+    inline: drawn now, in this (worker) process. deferred: listed in
+    result["render_jobs"] for the parent's RenderQueue. none: skipped. The image
+    name is added to the outputs up front in deferred mode.
+    """
+    if reports == "none":
+        return
+    if reports == "deferred":
+        result.setdefault("render_jobs", []).append(job)
+        result["outputs"].append(job.output_path.name)
+        return
+    result["outputs"].append(render(job).name)
+
+
+def _add_failed_report(
+    result: dict, reports: str, file_path: Path, error_message: str, status: str, output_dir: Path
+) -> None:
+    job = RenderJob(
+        kind="failed_summary",
+        output_path=output_dir / f"{file_path.stem}_security_summary.png",
+        kwargs={"file_path": file_path, "error_message": error_message, "status": status, "output_dir": output_dir},
+    )
+    try:
+        _add_report(result, reports, job)
+    except Exception:
+        logger.warning("Could not generate failed report for %s", file_path.name)
+
+
+def _integrity_failure_message(integrity: dict) -> str:
+    """Failure text for the summary image, naming the changed ranges when they are known."""
+    changed = integrity.get("changed")
+    if not changed:
+        return "File integrity verification failed."
+    ranges = ", ".join(
+        f"bytes {span['bytes'][0]}-{span['bytes'][1]} (rows {span['rows'][0]}-{span['rows'][1]})"
+        for span in changed[:5]
+    )
+    more = f" and {len(changed) - 5} more" if len(changed) > 5 else ""
+    return f"File integrity verification failed. Changed: {ranges}{more}."
+
+
+def _process_encrypted_file(
+    bin_path: Path,
+    skip_encryption: bool,
+    manifest_entry: dict | None = None,
+    force: bool = False,
+    reports: str = "inline",
+) -> dict:
+    """Process a single .bin file: decrypt (separate process). No images are drawn, whatever `reports` is."""
     result = {"file": str(bin_path.name), "status": "ok", "outputs": []}
     stem = bin_path.stem.replace('_encrypted', '')
     file_output_dir = config.OUTPUT_DIR / stem
     file_output_dir.mkdir(parents=True, exist_ok=True)
     try:
+        fingerprint = run_manifest.file_fingerprint(bin_path, skip_encryption)
+        unchanged = _unchanged_result(bin_path, fingerprint, manifest_entry, force)
+        if unchanged is not None:
+            return unchanged
+        result["fingerprint"] = fingerprint
+
         if skip_encryption:
             result["status"] = "skipped"
             result["outputs"].append("decryption_skipped_no_key")
             return result
 
         # Decrypt unmasked version
-        dec_path_unmasked = decrypt_csv_output(bin_path, mask=False, output_dir=file_output_dir)
+        with timed_stage(result, "decrypt", bytes_in=bin_path.stat().st_size) as metrics:
+            dec_path_unmasked = decrypt_csv_output(bin_path, mask=False, output_dir=file_output_dir)
+            metrics["bytes_out"] = dec_path_unmasked.stat().st_size
         result["outputs"].append(str(dec_path_unmasked.name))
 
     except ValueError as e:
@@ -153,7 +297,129 @@ def _process_encrypted_file(bin_path: Path, skip_encryption: bool) -> dict:
     return result
 
 
-def process_all_csv_files(skip_encryption: bool = True) -> list[dict]:
+# Runtime config a worker reads, including everything in a file's fingerprint and key ring
+_WORKER_CONFIG = (
+    "INPUT_DIR", "OUTPUT_DIR", "LOG_DIR",
+    "DEFAULT_KEY", "ENCRYPTION_KEY_ID", "ENCRYPTION_KEYRING", "ENCRYPTION_CHUNK_SIZE",
+    "SENSITIVE_COLUMN_PATTERNS", "CONTENT_DETECTION", "CONTENT_SAMPLE_ROWS", "CONTENT_HIT_RATIO",
+    "CONTENT_SAMPLE_SEED", "CSV_ENGINE", "STREAMING_THRESHOLD_BYTES", "MASK_CHUNK_ROWS",
+    "MASKED_OUTPUT_FORMAT", "CHECKSUM_FORMAT", "MERKLE_BLOCK_SIZE",
+)
+
+
+def _worker_config() -> dict:
+    return {name: getattr(config, name) for name in _WORKER_CONFIG}
+
+
+def _init_worker(settings: dict) -> None:
+    """Mirror the parent's runtime config (see _worker_config) in a pool worker (needed for spawn-based pools)."""
+    for name, value in settings.items():
+        setattr(config, name, value)
+
+
+def _run_file_jobs(
+    jobs: list[tuple],
+    workers: int,
+    on_result=None,
+    pool: ProcessPoolExecutor | None = None,
+) -> list[dict]:
+    """
+    Run (handler, path, skip_encryption, manifest_entry, force, reports) jobs, in a process pool when workers > 1.
+
+    Results are returned in job order regardless of completion order. `on_result`,
+    if given, is called with each result as soon as it is collected. A long-lived
+    `pool` (see watch mode) is used instead of starting one, and left running.
+
+    Raises:
+        BrokenProcessPool: If `pool` was broken by a worker that died earlier.
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        results = []
+        for handler, *args in jobs:
+            results.append(handler(*args))
+            if on_result is not None:
+                on_result(results[-1])
+        return results
+
+    with contextlib.ExitStack() as stack:
+        if pool is None:
+            pool = stack.enter_context(
+                ProcessPoolExecutor(
+                    max_workers=min(workers, len(jobs)),
+                    initializer=_init_worker,
+                    initargs=(_worker_config(),),
+                )
+            )
+        futures = [pool.submit(handler, *args) for handler, *args in jobs]
+        results = []
+        for (_, path, *_), future in zip(jobs, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                # Worker died or the result could not be returned (e.g. BrokenProcessPool)
+                logger.error("Worker failed while processing %s: %s", path.name, e)
+                results.append({"file": str(path.name), "status": "error", "outputs": [], "error": str(e)})
+            if on_result is not None:
+                on_result(results[-1])
+    return results
+
+
+def _file_output_dir(file_path: Path) -> Path:
+    return config.OUTPUT_DIR / file_path.stem.replace("_encrypted", "")
+
+
+def _run_incremental(
+    jobs: list[tuple],
+    workers: int,
+    force: bool,
+    reports: str = "inline",
+    render_queue: RenderQueue | None = None,
+    pool: ProcessPoolExecutor | None = None,
+) -> list[dict]:
+    """
+    Run (handler, path, skip_encryption) jobs against the run manifest (in `pool`, if given).
+
+    Each job receives its manifest entry and decides in the worker, from the bytes
+    it reads anyway, whether the file is unchanged. Successful results are recorded
+    in the manifest (with the detected CSV dialect, reused as a hint next time);
+    failed files are retried next run. In deferred reports mode the render jobs a
+    result carries are handed to `render_queue` as soon as it arrives.
+    """
+    entries = run_manifest.load_manifest()
+    keys = [run_manifest.manifest_key(path) for _, path, _ in jobs]
+
+    def queue_renders(result: dict) -> None:
+        for job in result.pop("render_jobs", []):
+            render_queue.submit(job)
+
+    results = _run_file_jobs(
+        [(handler, path, skip, entries.get(key), force, reports) for (handler, path, skip), key in zip(jobs, keys)],
+        workers,
+        on_result=queue_renders if render_queue is not None else None,
+        pool=pool,
+    )
+
+    changed = False
+    for key, result in zip(keys, results):
+        fingerprint = result.pop("fingerprint", None)
+        if result["status"] == "ok" and fingerprint is not None:
+            entries[key] = {"fingerprint": fingerprint, "outputs": result["outputs"]}
+            if result.get("dialect"):
+                entries[key]["dialect"] = result["dialect"]
+            changed = True
+
+    if changed:
+        run_manifest.save_manifest(entries)
+    return results
+
+
+def process_all_csv_files(
+    skip_encryption: bool = True,
+    workers: int = 1,
+    force: bool = False,
+    reports: str = "inline",
+    render_queue: RenderQueue | None = None,
+) -> list[dict]:
     """
     Process all files in the input and output directories (dual-mode pipeline).
 
@@ -163,6 +429,13 @@ def process_all_csv_files(skip_encryption: bool = True) -> list[dict]:
 
     Args:
         skip_encryption: If True, skip encrypt/decrypt when key not set (default for CI).
+        workers: Number of worker processes; files are processed independently and
+            results keep the serial order (input CSVs, input .bin, output .bin).
+        force: If True, reprocess files even when the run manifest says they are unchanged.
+        reports: Per-file summary images: "inline" (drawn by the file's worker),
+            "deferred" (submitted to `render_queue`, drawn in the background) or "none".
+        render_queue: Queue for deferred images; one is created and drained before
+            returning if not given.
 
     Returns:
         List of results per file with status and output paths.
@@ -170,20 +443,16 @@ def process_all_csv_files(skip_encryption: bool = True) -> list[dict]:
     config.INPUT_DIR.mkdir(parents=True, exist_ok=True)
     config.OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-    results = []
-    csv_files = [f for f in config.INPUT_DIR.iterdir() if f.suffix.lower() == ".csv"]
-    bin_in_input = [f for f in config.INPUT_DIR.iterdir() if f.suffix.lower() == ".bin"]
-    bin_in_output = [f for f in config.OUTPUT_DIR.iterdir() if f.suffix.lower() == ".bin"]
+    csv_files = sorted(f for f in config.INPUT_DIR.iterdir() if f.suffix.lower() == ".csv")
+    bin_in_input = sorted(f for f in config.INPUT_DIR.iterdir() if f.suffix.lower() == ".bin")
+    bin_in_output = sorted(f for f in config.OUTPUT_DIR.iterdir() if f.suffix.lower() == ".bin")
 
     if not csv_files and not bin_in_input and not bin_in_output:
         logger.info("No CSV or .bin files found in input or output directory.")
-        return results
+        return []
 
-    for csv_path in csv_files:
-        results.append(_process_csv_file(csv_path, skip_encryption))
-
-    for bin_path in bin_in_input:
-        results.append(_process_encrypted_file(bin_path, skip_encryption))
+    jobs = [(_process_csv_file, csv_path, skip_encryption) for csv_path in csv_files]
+    jobs += [(_process_encrypted_file, bin_path, skip_encryption) for bin_path in bin_in_input]
 
     # Decrypt .bin files in output/ (e.g. from previous commits or same run)
     for bin_path in bin_in_output:
@@ -193,15 +462,54 @@ def process_all_csv_files(skip_encryption: bool = True) -> list[dict]:
         dec_path = file_output_dir / dec_name
         if dec_path.exists():
             continue  # Already decrypted
-        results.append(_process_encrypted_file(bin_path, skip_encryption))
-
-    return results
+        jobs.append((_process_encrypted_file, bin_path, skip_encryption))
+
+    if reports not in REPORT_MODES:
+        raise ValueError(f"Unknown reports mode: {reports!r} (use one of {', '.join(REPORT_MODES)})")
+    check_masked_output_format(config.MASKED_OUTPUT_FORMAT)
+    if reports != "deferred" or render_queue is not None:
+        return _run_incremental(jobs, workers, force, reports, render_queue)
+    with RenderQueue(workers) as queue:
+        return _run_incremental(jobs, workers, force, reports, queue)
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Process CSV and .bin files from input/ into output/.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes (default: available CPUs; 1 = serial)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Reprocess every file, ignoring the run manifest",
+    )
+    parser.add_argument(
+        "--reports",
+        choices=REPORT_MODES,
+        default=None,
+        help="Summary images: drawn per file (inline), in the background after the "
+        "JSON summary is written (deferred), or not at all (none). "
+        "Default: inline, or deferred with --watch",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and process files as they are added to or changed in input/ (Ctrl+C to stop)",
+    )
+    args = parser.parse_args(argv)
+    if args.reports is None:
+        args.reports = "deferred" if args.watch else "inline"
+    return args
 
 
-def run() -> int:
+def run(argv: list[str] | None = None) -> int:
     """
     Entry point for the pipeline. Returns exit code (0 = success).
     """
+    args = _parse_args(argv)
     _configure_pipeline_logging()
 
     skip_encryption = config.DEFAULT_KEY is None
@@ -215,18 +523,54 @@ def run() -> int:
             )
             return 1
 
-    results = process_all_csv_files(skip_encryption=skip_encryption)
-    has_errors = any(r["status"] in ("integrity_failed", "error") for r in results)
+    workers = max(1, args.workers)
+    if args.watch:
+        from .watch import watch
 
-    for r in results:
-        logger.info("%s: %s -> %s", r["file"], r["status"], r.get("outputs", []))
+        return watch(skip_encryption, workers=workers, reports=args.reports)
 
-    try:
-        summary_json_path, summary_png_path = write_pipeline_summary(results)
-        logger.info("Summary JSON generated: %s", summary_json_path)
-        logger.info("Summary chart generated: %s", summary_png_path)
-    except Exception:
-        logger.exception("Failed to generate pipeline summary artifacts")
-        has_errors = True
+    with RenderQueue(workers) as render_queue:
+        started = time.perf_counter()
+        results = process_all_csv_files(
+            skip_encryption=skip_encryption,
+            workers=workers,
+            force=args.force,
+            reports=args.reports,
+            render_queue=render_queue if args.reports == "deferred" else None,
+        )
+        wall_s = time.perf_counter() - started
+        has_errors = any(r["status"] in ("integrity_failed", "error") for r in results)
+
+        for r in results:
+            logger.info("%s: %s -> %s", r["file"], r["status"], r.get("outputs", []))
+
+        try:
+            from .reporting import _count_statuses, write_pipeline_summary
+            from .stage_metrics import stage_totals
+
+            # The JSON never waits for images; the run chart follows the reports mode too
+            summary_json_path, summary_png_path = write_pipeline_summary(
+                results, chart=args.reports == "inline", wall_s=wall_s
+            )
+            logger.info("Summary JSON generated: %s", summary_json_path)
+            if args.reports == "deferred":
+                summary_png_path = config.OUTPUT_DIR / config.SUMMARY_PNG_NAME
+                render_queue.submit(RenderJob(
+                    kind="status_chart",
+                    output_path=summary_png_path,
+                    kwargs={
+                        "status_counts": _count_statuses(results),
+                        "output_path": summary_png_path,
+                        "stage_totals": stage_totals(results),
+                    },
+                ))
+            if summary_png_path is not None:
+                logger.info("Summary chart generated: %s", summary_png_path)
+        except Exception:
+            logger.exception("Failed to generate pipeline summary artifacts")
+            has_errors = True
+
+        if render_queue.drain():
+            has_errors = True
 
     return 1 if has_errors else 0
@@ -0,0 +1,95 @@
+"""
+Report rendering decoupled from the data stages.
+
+Per-file stages describe the images they want as RenderJobs. Depending on the
+`--reports` mode a job is rendered right away (inline), queued on a background
+process pool that renders while the remaining files are processed (deferred),
+or dropped (none).
+"""
+
+import logging
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+REPORT_MODES = ("inline", "deferred", "none")
+
+# RenderJob.kind -> reporting function that draws it
+_RENDERERS = {
+    "file_summary": "render_file_security_summary",
+    "failed_summary": "generate_failed_file_summary",
+    "status_chart": "write_status_chart",
+}
+
+
+@dataclass(frozen=True)
+class RenderJob:
+    """One image to draw: the reporting function (by kind), its arguments and the file it writes."""
+
+    kind: str
+    output_path: Path
+    kwargs: dict = field(default_factory=dict)
+
+
+def render(job: RenderJob) -> Path:
+    """Draw one job in the current process."""
+    from . import reporting
+
+    return getattr(reporting, _RENDERERS[job.kind])(**job.kwargs)
+
+
+class RenderQueue:
+    """
+    Renders submitted jobs on a background process pool.
+
+    The pool is only started by the first submit, so runs without images never
+    pay for it. Call `drain()` (or leave the `with` block) to wait for the images.
+    """
+
+    def __init__(self, workers: int = 1):
+        self.workers = max(1, workers)
+        self._pool: ProcessPoolExecutor | None = None
+        self._pending: list[tuple[RenderJob, Future]] = []
+
+    def submit(self, job: RenderJob) -> None:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        self._pending.append((job, self._pool.submit(render, job)))
+
+    def drain(self) -> list[RenderJob]:
+        """Wait for every queued job; failures are logged and the failed jobs returned."""
+        failed = []
+        for job, future in self._pending:
+            try:
+                future.result()
+            except Exception:
+                logger.exception("Failed to render %s", job.output_path.name)
+                failed.append(job)
+        self._pending.clear()
+        return failed
+
+    def reap(self) -> list[RenderJob]:
+        """Forget finished jobs without waiting for the rest; failures are logged and returned."""
+        failed, pending = [], []
+        for job, future in self._pending:
+            if not future.done():
+                pending.append((job, future))
+            elif future.exception() is not None:
+                logger.error("Failed to render %s: %s", job.output_path.name, future.exception())
+                failed.append(job)
+        self._pending = pending
+        return failed
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self) -> "RenderQueue":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.drain()
+        self.close()
@@ -1,34 +1,52 @@
 import json
 import logging
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import matplotlib.gridspec as gridspec
-import matplotlib.patches as mpatches
-import matplotlib.pyplot as plt
-import numpy as np
-import pandas as pd
+from . import config
+from .column_plan import KIND_LABELS
+
+# matplotlib, numpy and pandas are imported by the functions that draw, so importing
+# this module (and the processor) stays cheap for runs that produce no images
+if TYPE_CHECKING:
+    import pandas as pd
 
 # Restore write_pipeline_summary function
 def _count_statuses(results: list[dict]) -> dict[str, int]:
-    counts = {"ok": 0, "skipped": 0, "integrity_failed": 0, "error": 0}
+    counts = {"ok": 0, "unchanged": 0, "skipped": 0, "integrity_failed": 0, "error": 0}
     for result in results:
         status = result.get("status", "error")
         counts[status] = counts.get(status, 0) + 1
     return counts
 
-def _write_status_chart(status_counts: dict[str, int], output_path: Path) -> None:
-    labels = ["ok", "skipped", "integrity_failed", "error"]
+def write_status_chart(
+    status_counts: dict[str, int],
+    output_path: Path,
+    stage_totals: dict[str, dict] | None = None,
+) -> Path:
+    """
+    Draw the per-status file count bar chart for a run.
+
+    With `stage_totals` (see stage_metrics.stage_totals) a second panel next to
+    it breaks the run down by stage: wall and CPU seconds summed over all files.
+    """
+    import matplotlib.pyplot as plt
+
+    labels = ["ok", "unchanged", "skipped", "integrity_failed", "error"]
     values = [status_counts.get(label, 0) for label in labels]
-    colors = ["#2ca02c", "#1f77b4", "#ff7f0e", "#d62728"]
+    colors = ["#2ca02c", "#98df8a", "#1f77b4", "#ff7f0e", "#d62728"]
 
-    plt.figure(figsize=(8, 4.5))
-    bars = plt.bar(labels, values, color=colors)
-    plt.title("CSV Pipeline Run Summary")
-    plt.xlabel("Status")
-    plt.ylabel("File Count")
+    if stage_totals:
+        fig, (ax, ax_stages) = plt.subplots(1, 2, figsize=(14, 4.5))
+    else:
+        fig, ax = plt.subplots(figsize=(8, 4.5))
+    bars = ax.bar(labels, values, color=colors)
+    ax.set_title("CSV Pipeline Run Summary")
+    ax.set_xlabel("Status")
+    ax.set_ylabel("File Count")
 
     for bar, value in zip(bars, values):
-        plt.text(
+        ax.text(
             bar.get_x() + (bar.get_width() / 2),
             value + 0.02,
             str(value),
@@ -36,34 +54,66 @@ def _write_status_chart(status_counts: dict[str, int], output_path: Path) -> Non
             va="bottom",
         )
 
-    plt.tight_layout()
-    plt.savefig(output_path)
-    plt.close()
+    if stage_totals:
+        stages = list(stage_totals)
+        positions = range(len(stages))
+        width = 0.4
+        ax_stages.bar([p - width / 2 for p in positions], [stage_totals[s]["wall_s"] for s in stages],
+                      width, label="wall", color="#1f77b4")
+        ax_stages.bar([p + width / 2 for p in positions], [stage_totals[s]["cpu_s"] for s in stages],
+                      width, label="CPU", color="#aec7e8")
+        ax_stages.set_xticks(list(positions), stages)
+        ax_stages.set_title("Time per Stage (all files)")
+        ax_stages.set_xlabel("Stage")
+        ax_stages.set_ylabel("Seconds")
+        ax_stages.legend()
+
+    fig.tight_layout()
+    fig.savefig(output_path)
+    plt.close(fig)
+    return output_path
 
-def write_pipeline_summary(results: list[dict]) -> tuple[Path, Path]:
-    """Write summary JSON and chart image for one pipeline run."""
-    output_dir = Path("output")
+def write_pipeline_summary(
+    results: list[dict],
+    chart: bool = True,
+    wall_s: float | None = None,
+) -> tuple[Path, Path | None]:
+    """
+    Write summary JSON and chart image for one pipeline run.
+
+    The JSON is written first. With `chart=False` no image is drawn (the caller
+    renders it later, or not at all) and None is returned for its path. Per-stage
+    totals are always included; run throughput only when the run's `wall_s` is given.
+    """
+    from .stage_metrics import run_throughput, stage_totals
+
+    output_dir = config.OUTPUT_DIR
     output_dir.mkdir(parents=True, exist_ok=True)
 
     status_counts = _count_statuses(results)
     total_files = len(results)
+    totals = stage_totals(results)
 
     summary_payload = {
         "total_files": total_files,
         "status_counts": status_counts,
-        "results": results,
+        "stages": totals,
     }
+    if wall_s is not None:
+        summary_payload["throughput"] = run_throughput(results, wall_s)
+    summary_payload["results"] = results
 
-    summary_json_path = output_dir / "pipeline_summary.json"
+    summary_json_path = output_dir / config.SUMMARY_JSON_NAME
     summary_json_path.write_text(
         json.dumps(summary_payload, indent=2),
         encoding="utf-8",
     )
+    logging.getLogger(__name__).info("Wrote summary report: %s", summary_json_path)
 
-    summary_png_path = output_dir / "pipeline_summary.png"
-    _write_status_chart(status_counts, summary_png_path)
+    if not chart:
+        return summary_json_path, None
 
-    logging.getLogger(__name__).info("Wrote summary report: %s", summary_json_path)
+    summary_png_path = write_status_chart(status_counts, output_dir / config.SUMMARY_PNG_NAME, totals)
     logging.getLogger(__name__).info("Wrote summary chart: %s", summary_png_path)
 
     return summary_json_path, summary_png_path
@@ -79,6 +129,8 @@ def generate_failed_file_summary(
     Generate a security summary image for a file that failed processing.
     Shows the file name, failure status, and error details.
     """
+    import matplotlib.gridspec as gridspec
+    import matplotlib.pyplot as plt
     from matplotlib.patches import FancyBboxPatch
     from textwrap import fill as textwrap_fill
 
@@ -165,23 +217,6 @@ def generate_failed_file_summary(
     return img_path
 
 
-def _detect_sensitive_types(df: pd.DataFrame) -> list[str]:
-    """Return list of detected sensitive types in the DataFrame columns."""
-    types = []
-    for col in df.columns:
-        col_lower = col.lower().replace(" ", "_").replace("-", "_")
-        if "email" in col_lower:
-            types.append("Email")
-        elif "ssn" in col_lower or "social_security" in col_lower:
-            types.append("SSN")
-        elif "credit_card" in col_lower or "cc_number" in col_lower or "card_number" in col_lower:
-            types.append("Credit Card")
-        elif "phone" in col_lower:
-            types.append("Phone")
-        elif "identifier" in col_lower or "id_number" in col_lower or "student_id" in col_lower or "studentid" in col_lower:
-            types.append("Identifier")
-    return list(set(types))
-
 def generate_file_security_summary(
     file_path: Path,
     masked_path: Path,
@@ -190,38 +225,54 @@ def generate_file_security_summary(
     integrity_verified: bool,
     status: str,
     output_dir: Path,
+    stats=None,
 ) -> Path:
     """
     Generate a polished security summary image for a single file.
     Layout: title banner, table, pie chart (left), conclusion box (right).
+
+    `stats` is the MaskStats collected while the file was masked. Without it the
+    original CSV is parsed and masked again (in memory) to collect them.
+    """
+    if stats is None:
+        from .mask_sensitive_columns import MaskStats, _read_csv_flexible, mask_dataframe
+
+        stats = MaskStats()
+        mask_dataframe(_read_csv_flexible(file_path), inplace=True, stats=stats)
+    return render_file_security_summary(
+        file_path=file_path,
+        mask_stats=stats.to_dict(),
+        integrity_verified=integrity_verified,
+        status=status,
+        output_dir=output_dir,
+    )
+
+
+def render_file_security_summary(
+    file_path: Path,
+    mask_stats: dict[str, dict],
+    integrity_verified: bool,
+    status: str,
+    output_dir: Path,
+) -> Path:
     """
+    Draw the security summary image from masking statistics (MaskStats.to_dict()).
+
+    Reads no files and takes only small, picklable arguments, so it can run in a
+    separate render process.
+    """
+    import matplotlib.gridspec as gridspec
+    import matplotlib.patches as mpatches
+    import matplotlib.pyplot as plt
+    import numpy as np
     from matplotlib.patches import FancyBboxPatch
     from textwrap import fill as textwrap_fill
 
-    # ── Load data ──────────────────────────────────────────────────────
-    try:
-        df = pd.read_csv(file_path)
-        df_masked = pd.read_csv(masked_path)
-    except Exception:
-        df = df_masked = pd.read_csv(masked_path)
-
-    # ── Detect sensitive columns per type ──────────────────────────────
-    all_types = ["SSN", "Email", "Credit Card", "Phone", "Identifier"]
-    type_to_col = {
-        "SSN": [c for c in df.columns if "ssn" in c.lower() or "social_security" in c.lower()],
-        "Email": [c for c in df.columns if "email" in c.lower()],
-        "Credit Card": [c for c in df.columns if any(k in c.lower() for k in ("credit_card", "cc_number", "card_number"))],
-        "Phone": [c for c in df.columns if "phone" in c.lower()],
-        "Identifier": [c for c in df.columns if any(k in c.lower() for k in ("identifier", "id_number", "student_id", "studentid"))],
-    }
-
     table_data = []
-    for t in all_types:
-        cols = type_to_col[t]
-        detected_count = masked_count = 0
-        if cols:
-            detected_count = int(df[cols].notna().sum().sum())
-            masked_count = int(df_masked[cols].notna().sum().sum())
+    for t, kind in KIND_LABELS.items():
+        kind_stats = mask_stats.get(kind, {})
+        detected_count = kind_stats.get("detected", 0)
+        masked_count = kind_stats.get("masked", 0)
         if detected_count > 0:
             pct = int(round(masked_count / detected_count * 100))
             row = [
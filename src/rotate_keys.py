@@ -0,0 +1,123 @@
+"""Re-wrap encrypted .bin files under the current master key (key rotation)."""
+
+import argparse
+import logging
+import os
+from pathlib import Path
+
+from . import config
+from .decrypt_csv import _open_plaintext
+from .encrypted_format import MAGIC, is_framed, read_key_id, rewrap, write_encrypted
+from .key_ring import KeyRing, configured_key_ring
+
+logger = logging.getLogger(__name__)
+
+
+def _encrypted_files() -> list[Path]:
+    """Every .bin file under input/ and output/."""
+    files = set()
+    for directory in (config.INPUT_DIR, config.OUTPUT_DIR):
+        if directory.exists():
+            files.update(path for path in directory.rglob("*.bin") if path.is_file())
+    return sorted(files)
+
+
+def _upgrade(path: Path, ring: KeyRing) -> None:
+    """
+    Re-encrypt a file written before envelope encryption (Fernet token or version 1
+    framed file) as an envelope file under the current key, replacing it atomically.
+    """
+    temp_path = path.with_name(path.name + ".tmp")
+    try:
+        with _open_plaintext(path) as plaintext, open(temp_path, "wb") as out:
+            write_encrypted(plaintext, out, ring, config.ENCRYPTION_CHUNK_SIZE)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
+def rotate_keys(paths: list[str | Path] | None = None, dry_run: bool = False) -> list[dict]:
+    """
+    Re-wrap the data key of each envelope-encrypted file under the current master key.
+
+    Only the fixed-size key block in each file's header is rewritten, so rotation
+    costs the same for a 1 KB and a 1 TB file. The old master key must still be in
+    the key ring (ENCRYPTION_KEYRING) and the new one set as ENCRYPTION_KEY.
+    Files written before envelope encryption have no key block; they are decrypted
+    with whichever configured key opens them and re-encrypted as envelope files.
+
+    Args:
+        paths: Files to rotate (defaults to every .bin under config.INPUT_DIR and config.OUTPUT_DIR).
+        dry_run: Only report what would be rotated.
+
+    Returns:
+        One {"file", "status", "key_id"} per file. status is "rotated" (or
+        "would_rotate" with `dry_run`), "upgraded" (older format re-encrypted;
+        "would_upgrade" with `dry_run`), "current" (already under the current
+        key) or "failed" (with "error").
+
+    Raises:
+        ValueError: If no current key is configured or the key ring is malformed.
+    """
+    ring = configured_key_ring()
+    if ring.current_id is None:
+        raise ValueError("Encryption key not configured. Set ENCRYPTION_KEY to the new master key.")
+
+    results = []
+    for path in [Path(p) for p in paths] if paths else _encrypted_files():
+        result = {"file": str(path), "status": "failed", "key_id": None}
+        try:
+            with open(path, "rb") as f:
+                framed = is_framed(f.read(len(MAGIC)))
+            key_id = read_key_id(path) if framed else None
+            result["key_id"] = key_id
+            if key_id is None and dry_run:
+                result["status"] = "would_upgrade"
+            elif key_id is None:
+                _upgrade(path, ring)
+                result["status"], result["key_id"] = "upgraded", ring.current_id
+            elif key_id == ring.current_id:
+                result["status"] = "current"
+            elif dry_run:
+                ring.get(key_id)
+                result["status"] = "would_rotate"
+            else:
+                rewrap(path, ring)
+                result["status"] = "rotated"
+        except (OSError, ValueError) as exc:
+            result["error"] = str(exc)
+            logger.error("Could not rotate %s: %s", path, exc)
+        results.append(result)
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Re-wrap encrypted .bin files under the current master key (ENCRYPTION_KEY)."
+    )
+    parser.add_argument("paths", nargs="*", help="Files to rotate (default: every .bin under input/ and output/)")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be rotated")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    try:
+        results = rotate_keys(args.paths or None, dry_run=args.dry_run)
+    except ValueError as exc:
+        logger.error("%s", exc)
+        return 1
+
+    counts: dict[str, int] = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+        if result["status"] != "current":
+            print(f"{result['status']:<13} {result['key_id'] or '-':<20} {result['file']}")
+    print(", ".join(f"{count} {status}" for status, count in sorted(counts.items())) or "No encrypted files found")
+    return 1 if counts.get("failed") else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,123 @@
+"""Persistent run manifest used to skip files that have not changed since the last run."""
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+
+from . import config
+from .generate_checksum import _file_checksum
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+_code_version: str | None = None
+
+
+def code_version() -> str:
+    """Hash of the pipeline source files, so any code change invalidates the manifest."""
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha256()
+        for source in sorted(Path(__file__).resolve().parent.glob("*.py")):
+            digest.update(source.name.encode("utf-8"))
+            digest.update(source.read_bytes())
+        _code_version = digest.hexdigest()[:16]
+    return _code_version
+
+
+def file_fingerprint(
+    file_path: Path,
+    skip_encryption: bool,
+    content_sha256: str | None = None,
+    reports: str = "inline",
+) -> dict:
+    """
+    Everything that determines a file's pipeline outputs.
+
+    Pass `content_sha256` when the caller already hashed the file's bytes. Only
+    whether summary images are drawn matters for `reports`, not when. The master
+    key is not part of it: a .bin output stays valid when the key is rotated, as
+    long as its key ID is still configured (see is_unchanged).
+    """
+    patterns = json.dumps(list(config.SENSITIVE_COLUMN_PATTERNS))
+    return {
+        "content_sha256": content_sha256 or _file_checksum(file_path),
+        "patterns": hashlib.sha256(patterns.encode("utf-8")).hexdigest()[:16],
+        "encrypted": not skip_encryption,
+        "checksum_format": config.CHECKSUM_FORMAT,
+        "masked_format": config.MASKED_OUTPUT_FORMAT,
+        "content_detection": (
+            [config.CONTENT_SAMPLE_ROWS, config.CONTENT_HIT_RATIO, config.CONTENT_SAMPLE_SEED]
+            if config.CONTENT_DETECTION
+            else None
+        ),
+        "images": reports != "none",
+        "code_version": code_version(),
+    }
+
+
+def manifest_key(file_path: Path) -> str:
+    """Manifest entry name; .bin files in output/ are kept apart from input files."""
+    if file_path.parent == config.OUTPUT_DIR:
+        return f"output/{file_path.name}"
+    return file_path.name
+
+
+def load_manifest() -> dict:
+    """Load manifest entries from output/, returning an empty mapping if missing or unreadable."""
+    manifest_path = config.OUTPUT_DIR / config.RUN_MANIFEST_NAME
+    if not manifest_path.exists():
+        return {}
+    try:
+        payload = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        logger.warning("Ignoring unreadable run manifest: %s", manifest_path)
+        return {}
+    if payload.get("version") != MANIFEST_VERSION:
+        return {}
+    return payload.get("files", {})
+
+
+def save_manifest(entries: dict) -> Path:
+    """Atomically write manifest entries to output/."""
+    config.OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    manifest_path = config.OUTPUT_DIR / config.RUN_MANIFEST_NAME
+    tmp_path = manifest_path.with_suffix(".tmp")
+    tmp_path.write_text(
+        json.dumps({"version": MANIFEST_VERSION, "files": entries}, indent=2, sort_keys=True),
+        encoding="utf-8",
+    )
+    tmp_path.replace(manifest_path)
+    return manifest_path
+
+
+def _key_configured(enc_path: Path) -> bool:
+    """True if the master key of an encrypted output is in the configured key ring."""
+    from .encrypted_format import MAGIC, is_framed, read_key_id
+    from .key_ring import configured_key_ring
+
+    try:
+        with open(enc_path, "rb") as f:
+            if not is_framed(f.read(len(MAGIC))):
+                return True  # legacy Fernet token, tried with every configured key
+        key_id = read_key_id(enc_path)
+        ring = configured_key_ring()
+    except (OSError, ValueError):
+        return False
+    return bool(ring.keys) if key_id is None else key_id in ring.keys
+
+
+def is_unchanged(entry: dict | None, fingerprint: dict, output_dir: Path) -> bool:
+    """
+    True if the entry matches the fingerprint, its recorded output files still
+    exist, and the master key of each encrypted output is still configured.
+    """
+    if not entry or entry.get("fingerprint") != fingerprint:
+        return False
+    # Markers such as "integrity_verified" have no suffix; only file outputs are checked
+    outputs = [output_dir / name for name in entry.get("outputs", []) if Path(name).suffix]
+    if not all(path.exists() for path in outputs):
+        return False
+    return all(_key_configured(path) for path in outputs if path.suffix == ".bin")
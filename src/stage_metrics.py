@@ -0,0 +1,72 @@
+"""Per-stage timing and volume counters recorded in pipeline results."""
+
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+STAGES = ("read", "verify", "encrypt", "mask", "checksum", "report", "decrypt")
+
+
+@contextmanager
+def timed_stage(result: dict, name: str, bytes_in: int | None = None, rows_in: int | None = None) -> Iterator[dict]:
+    """
+    Time one stage of a file's processing into result["stages"][name].
+
+    Records wall and CPU seconds (CPU of this process, including helper threads)
+    plus bytes and rows in and out; the caller fills in the "*_out" fields (and
+    "rows_in" when only known afterwards) on the yielded dict. The entry is
+    recorded even if the stage raises.
+    """
+    metrics = {"bytes_in": bytes_in, "bytes_out": None, "rows_in": rows_in, "rows_out": None}
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        yield metrics
+    finally:
+        metrics["wall_s"] = round(time.perf_counter() - wall_start, 6)
+        metrics["cpu_s"] = round(time.process_time() - cpu_start, 6)
+        result.setdefault("stages", {})[name] = metrics
+
+
+def stage_totals(results: list[dict]) -> dict[str, dict]:
+    """Sum each stage's counters over all file results: {stage: {files, wall_s, cpu_s, bytes_*, rows_*}}."""
+    totals = {}
+    for result in results:
+        for name, metrics in result.get("stages", {}).items():
+            total = totals.setdefault(
+                name,
+                {"files": 0, "wall_s": 0.0, "cpu_s": 0.0, "bytes_in": 0, "bytes_out": 0, "rows_in": 0, "rows_out": 0},
+            )
+            total["files"] += 1
+            for key in ("wall_s", "cpu_s", "bytes_in", "bytes_out", "rows_in", "rows_out"):
+                total[key] += metrics.get(key) or 0
+    for total in totals.values():
+        total["wall_s"] = round(total["wall_s"], 6)
+        total["cpu_s"] = round(total["cpu_s"], 6)
+    return {name: totals[name] for name in sorted(totals, key=_stage_order)}
+
+
+def run_throughput(results: list[dict], wall_s: float) -> dict:
+    """
+    Run-level totals: input bytes and rows processed and their rate over the run's wall time.
+
+    Input bytes are the size of every file read (the first stage's bytes_in, so
+    unchanged files count too); rows are the rows masked.
+    """
+    bytes_in = rows = 0
+    for result in results:
+        stages = result.get("stages", {})
+        if stages:
+            bytes_in += stages[min(stages, key=_stage_order)].get("bytes_in") or 0
+        rows += (stages.get("mask") or {}).get("rows_out") or 0
+    return {
+        "wall_s": round(wall_s, 6),
+        "files_read": sum(1 for result in results if result.get("stages")),
+        "bytes_in": bytes_in,
+        "rows": rows,
+        "bytes_per_s": round(bytes_in / wall_s, 1) if wall_s > 0 else None,
+        "rows_per_s": round(rows / wall_s, 1) if wall_s > 0 else None,
+    }
+
+
+def _stage_order(name: str) -> int:
+    return STAGES.index(name) if name in STAGES else len(STAGES)
@@ -1,13 +1,14 @@
 """Verify file integrity using stored checksum."""
 
-import hashlib
 from pathlib import Path
 
 from . import config
-from .generate_checksum import generate_checksum, _normalize_for_hash
+from .csv_artifact import CsvArtifact
+from .generate_checksum import checksum_path_for, generate_checksum, _bytes_checksum, _file_checksum
+from .merkle_checksum import find_changed_ranges, is_merkle_checksum, loads_merkle_checksum
 
 
-def verify_file_integrity(csv_file: str | Path, output_dir: Path | None = None) -> bool:
+def verify_file_integrity(csv_file: str | Path | CsvArtifact, output_dir: Path | None = None) -> bool:
     """
     Verify a file's integrity by comparing against its stored checksum.
 
@@ -15,7 +16,7 @@ def verify_file_integrity(csv_file: str | Path, output_dir: Path | None = None)
     Text files use normalized line endings for cross-platform consistency.
 
     Args:
-        csv_file: Path to the file to verify.
+        csv_file: Path to the file to verify, or a CsvArtifact already read into memory.
         output_dir: Optional directory to look for/store checksum (defaults to config.OUTPUT_DIR).
 
     Returns:
@@ -25,24 +26,70 @@ def verify_file_integrity(csv_file: str | Path, output_dir: Path | None = None)
     Raises:
         FileNotFoundError: If the file does not exist.
     """
-    file_path = Path(csv_file)
-    if not file_path.exists():
-        raise FileNotFoundError(f"File not found: {file_path}")
+    return check_file_integrity(csv_file, output_dir=output_dir)["verified"]
+
+
+def check_file_integrity(
+    csv_file: str | Path | CsvArtifact,
+    output_dir: Path | None = None,
+    known_checksum: str | None = None,
+) -> dict:
+    """
+    Verify a file against its stored checksum and report what changed.
+
+    Works like verify_file_integrity but returns details. For Merkle checksum
+    files (config.CHECKSUM_FORMAT = "merkle"), blocks are re-hashed in parallel
+    and a mismatch lists the changed ranges; single-digest checksum files can
+    only say that the file changed.
+
+    Args:
+        csv_file: Path to the file to verify, or a CsvArtifact already read into memory.
+        output_dir: Optional directory to look for/store checksum (defaults to config.OUTPUT_DIR).
+        known_checksum: SHA-256 of the file's normalized content if the caller already
+            has it (e.g. from download_records); single-digest checks then do not
+            read the file.
+
+    Returns:
+        Dict with "verified" (bool), "format" ("sha256" or "merkle") and, on a
+        Merkle mismatch, "changed": a list of {"bytes": [start, end], "rows": [first, last]}
+        (byte offsets into the line-ending-normalized content, 1-based line numbers).
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    if isinstance(csv_file, CsvArtifact):
+        file_path = csv_file.path
+        source = csv_file.raw
+    else:
+        file_path = Path(csv_file)
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        source = file_path
 
     target_dir = output_dir or config.OUTPUT_DIR
-    # Look for checksum in output dir (same stem as file)
-    checksum_path = target_dir / f"{file_path.stem}{config.CHECKSUM_EXT}"
+    checksum_path = checksum_path_for(file_path, target_dir)
 
     if not checksum_path.exists():
         # Generate checksum for the first time
-        generate_checksum(file_path, output_dir=target_dir)
-        return True
+        generate_checksum(
+            csv_file if isinstance(csv_file, CsvArtifact) else file_path,
+            output_dir=target_dir,
+            known_checksum=known_checksum,
+        )
+        return {"verified": True, "format": config.CHECKSUM_FORMAT}
 
     with open(checksum_path, "r") as f:
-        expected_checksum = f.read().strip()
+        stored = f.read()
 
-    data = file_path.read_bytes()
-    normalized = _normalize_for_hash(data)
-    actual_checksum = hashlib.sha256(normalized).hexdigest()
+    if is_merkle_checksum(stored):
+        changed = find_changed_ranges(loads_merkle_checksum(stored), source)
+        report = {"verified": not changed, "format": "merkle"}
+        if changed:
+            report["changed"] = changed
+        return report
 
-    return actual_checksum == expected_checksum
+    if known_checksum:
+        actual_checksum = known_checksum
+    else:
+        actual_checksum = _bytes_checksum(source) if isinstance(source, bytes) else _file_checksum(source)
+    return {"verified": actual_checksum == stored.strip(), "format": "sha256"}
@@ -0,0 +1,213 @@
+"""
+Watch mode: keep one warm process and handle files as they land.
+
+input/ (CSV and .bin) and the top level of output/ (.bin) are polled every
+config.WATCH_POLL_SECONDS. A file is handled once its size and modification
+time have stayed the same for config.WATCH_SETTLE_SECONDS, so files still being
+written are not picked up half-way. Each batch of settled files goes through the
+same per-file handlers and run manifest as a batch run, and pipeline_summary.json
+is rewritten with the latest result of every file seen.
+"""
+
+import logging
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+
+from . import config
+from .processor import _init_worker, _process_csv_file, _process_encrypted_file, _run_incremental, _worker_config
+from .render_queue import RenderQueue
+
+logger = logging.getLogger(__name__)
+
+# Names of files still being written by us or other tools
+_PARTIAL_SUFFIXES = (".part", ".tmp", ".crdownload", ".partial")
+
+
+@dataclass
+class _Tracked:
+    signature: tuple[int, int]
+    stable_since: float
+    handled: tuple[int, int] | None = None
+
+
+def _is_candidate(path: Path, suffixes: tuple[str, ...]) -> bool:
+    name = path.name
+    return (
+        path.suffix.lower() in suffixes
+        and not name.startswith(".")
+        and not name.lower().endswith(_PARTIAL_SUFFIXES)
+    )
+
+
+def _scan() -> dict[Path, tuple[int, int]]:
+    """(size, mtime_ns) of every file watch mode handles."""
+    found = {}
+    for directory, suffixes in ((config.INPUT_DIR, (".csv", ".bin")), (config.OUTPUT_DIR, (".bin",))):
+        try:
+            entries = list(directory.iterdir())
+        except FileNotFoundError:
+            continue
+        for path in entries:
+            if not _is_candidate(path, suffixes):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # removed between listing and stat
+            if path.is_file():
+                found[path] = (stat.st_size, stat.st_mtime_ns)
+    return found
+
+
+class FileWatcher:
+    """Polling change detector with per-file debounce."""
+
+    def __init__(self, settle_seconds: float):
+        self.settle_seconds = settle_seconds
+        self._tracked: dict[Path, _Tracked] = {}
+
+    def poll(self, now: float | None = None) -> list[Path]:
+        """Files that are new or changed and have been stable for the settle time."""
+        now = time.monotonic() if now is None else now
+        current = _scan()
+        for path in list(self._tracked):
+            if path not in current:
+                del self._tracked[path]
+
+        ready = []
+        for path, signature in current.items():
+            tracked = self._tracked.get(path)
+            if tracked is None:
+                self._tracked[path] = _Tracked(signature, now)
+                continue
+            if tracked.signature != signature:
+                tracked.signature, tracked.stable_since = signature, now
+                continue
+            if tracked.handled != signature and now - tracked.stable_since >= self.settle_seconds:
+                ready.append(path)
+        return sorted(ready)
+
+    def mark_handled(self, path: Path) -> None:
+        """Do not report `path` again until it changes."""
+        tracked = self._tracked.get(path)
+        if tracked is not None:
+            tracked.handled = tracked.signature
+
+
+def _job(path: Path, skip_encryption: bool) -> tuple | None:
+    if path.suffix.lower() == ".csv":
+        return (_process_csv_file, path, skip_encryption)
+    if path.parent == config.OUTPUT_DIR:
+        # Same rule as batch runs: output/ .bin files are decrypted once
+        stem = path.stem.replace("_encrypted", "")
+        if (config.OUTPUT_DIR / stem / f"{stem}_decrypted.csv").exists():
+            return None
+    return (_process_encrypted_file, path, skip_encryption)
+
+
+def _warm_up() -> None:
+    """Import the masking stack now, so the first file does not pay for it."""
+    from . import mask_sensitive_columns  # noqa: F401
+
+
+def _init_warm_worker(settings: dict) -> None:
+    _init_worker(settings)
+    _warm_up()
+
+
+def _start_pool(workers: int) -> ProcessPoolExecutor | None:
+    """Worker pool kept for the whole watch loop, its workers warmed up as they start."""
+    if workers <= 1:
+        return None
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_warm_worker, initargs=(_worker_config(),))
+
+
+def watch(
+    skip_encryption: bool,
+    workers: int = 1,
+    reports: str = "deferred",
+    poll_seconds: float | None = None,
+    settle_seconds: float | None = None,
+    stop: threading.Event | None = None,
+) -> int:
+    """
+    Process files as they appear or change until interrupted (or `stop` is set).
+
+    Args:
+        skip_encryption: As for process_all_csv_files.
+        workers: Worker processes for batches of several files. One pool of warmed-up
+            workers is kept for the whole loop.
+        reports: Per-file summary images, as for process_all_csv_files. Deferred
+            images are drawn in the background so they do not delay the next file.
+        poll_seconds: Poll interval (defaults to config.WATCH_POLL_SECONDS).
+        settle_seconds: How long a file must stay unchanged before it is processed
+            (defaults to config.WATCH_SETTLE_SECONDS).
+        stop: Event that ends the loop when set; Ctrl+C and SIGTERM do too.
+
+    Returns:
+        Exit code: 0 (watch mode does not fail because of one bad file).
+    """
+    from .reporting import write_pipeline_summary
+
+    poll_seconds = config.WATCH_POLL_SECONDS if poll_seconds is None else poll_seconds
+    watcher = FileWatcher(config.WATCH_SETTLE_SECONDS if settle_seconds is None else settle_seconds)
+    stop = stop or threading.Event()
+    latest: dict[str, dict] = {}
+
+    if threading.current_thread() is threading.main_thread():
+        # Stop cleanly (finishing queued images) when run as a service
+        signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+
+    _warm_up()
+    config.INPUT_DIR.mkdir(parents=True, exist_ok=True)
+    config.OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    logger.info("Watching %s and %s (Ctrl+C to stop)", config.INPUT_DIR, config.OUTPUT_DIR)
+
+    def run(jobs, pool):
+        return _run_incremental(
+            jobs,
+            workers,
+            force=False,
+            reports=reports,
+            render_queue=render_queue if reports == "deferred" else None,
+            pool=pool,
+        )
+
+    pool = _start_pool(workers)
+    with RenderQueue(workers) as render_queue:
+        try:
+            while not stop.is_set():
+                ready = watcher.poll()
+                jobs = []
+                for path in ready:
+                    watcher.mark_handled(path)
+                    job = _job(path, skip_encryption)
+                    if job is not None:
+                        jobs.append(job)
+                if jobs:
+                    started = time.perf_counter()
+                    try:
+                        results = run(jobs, pool)
+                    except BrokenProcessPool:
+                        # A worker died in an earlier batch: replace the pool and retry
+                        pool.shutdown(wait=False)
+                        pool = _start_pool(workers)
+                        results = run(jobs, pool)
+                    for result in results:
+                        logger.info("%s: %s -> %s", result["file"], result["status"], result.get("outputs", []))
+                        latest[result["file"]] = result
+                    write_pipeline_summary(list(latest.values()), chart=False)
+                    logger.info("Processed %d file(s) in %.2fs", len(results), time.perf_counter() - started)
+                render_queue.reap()  # keep the pending list short in a long-lived process
+                stop.wait(poll_seconds)
+        except KeyboardInterrupt:
+            logger.info("Stopping watch mode")
+        finally:
+            if pool is not None:
+                pool.shutdown()
+    return 0
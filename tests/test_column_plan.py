@@ -0,0 +1,40 @@
+"""Tests for column classification plans."""
+
+import pytest
+
+from src.column_plan import classify_column, column_plan
+
+
+@pytest.mark.parametrize(
+    "column, kind",
+    [
+        ("Email Address", "email"),
+        ("customer-ssn", "ssn"),
+        ("Credit Card", "card"),
+        ("work_phone", "phone"),
+        ("Student ID", "identifier"),
+        ("api_key", "generic"),
+        ("amount", None),
+    ],
+)
+def test_classify_column(column, kind):
+    """Columns get the first matching kind, or generic for other configured patterns."""
+    assert classify_column(column) == kind
+
+
+def test_column_plan_cached_per_header():
+    """Headers with the same columns share one plan; the plan lists sensitive columns in order."""
+    plan = column_plan(["name", "email", "ssn", "amount"])
+
+    assert plan.columns == (("email", "email"), ("ssn", "ssn"))
+    assert column_plan(("name", "email", "ssn", "amount")) is plan
+    assert column_plan(["email", "name", "ssn", "amount"]) is not plan
+
+
+def test_column_plan_follows_configured_patterns(monkeypatch):
+    """Changing config.SENSITIVE_COLUMN_PATTERNS drops cached plans."""
+    import src.config as config
+
+    assert column_plan(["name", "amount"]).columns == ()
+    monkeypatch.setattr(config, "SENSITIVE_COLUMN_PATTERNS", config.SENSITIVE_COLUMN_PATTERNS + ["amount"])
+    assert column_plan(["name", "amount"]).columns == (("amount", "generic"),)
@@ -0,0 +1,61 @@
+"""Tests for sample-based content PII detection."""
+
+import pandas as pd
+import pytest
+
+from src.content_detection import ContentSampler, detect_column_kinds
+
+
+def test_detect_column_kinds():
+    """Columns are classified by their values once the hit ratio is reached."""
+    sample = pd.DataFrame(
+        {
+            "a": ["x@example.com", "y@example.org", None, "not an email"],
+            "b": ["123-45-6789", "987-65-4321", "555-12-3456", "000-00-0000"],
+            "c": ["4111111111111111", "4012-8888-8888-1881", "5500 0000 0000 0004", "4111111111111112"],
+            "d": ["+1 (555) 123-4567", "555-987-6543", "+44 20 7946 0958", "n/a"],
+            "e": ["1234567890", "2345678901", "3456789012", "4567890123"],
+            "f": ["Springfield", "Riverside", "Salem", "Fairview"],
+            "epoch": [1697500000.123, 1697500001.5, 1697500002.25, 1697500003.75],
+            "epoch_text": ["1697500000.123", "1697500001.500", "1697500002.250", "1697500003.750"],
+            "ip": ["192.168.100.200", "10.0.0.1", "172.16.254.1", "255.255.255.255"],
+            "dotted_phone": ["555.123.4567", "555.987.6543", "555.000.1111", "555.222.3333"],
+        }
+    )
+
+    assert detect_column_kinds(sample, hit_ratio=0.6) == {
+        "a": "email", "b": "ssn", "c": "card", "d": "phone", "dotted_phone": "phone"
+    }
+    assert detect_column_kinds(sample, hit_ratio=0.9) == {"b": "ssn", "dotted_phone": "phone"}
+
+
+@pytest.mark.parametrize("storage", ["python", "pyarrow"])
+def test_non_ascii_digits_are_not_matched(storage):
+    """Digits of other scripts (Arabic-Indic, full-width) match no kind and do not break the Luhn check."""
+    if storage == "pyarrow":
+        pytest.importorskip("pyarrow")
+    sample = pd.DataFrame(
+        {
+            "arabic": ["\u0664" + "\u0661" * 15] * 5,
+            "fullwidth": ["\uff14\uff11\uff11\uff11-\uff15\uff15\uff15-\uff11\uff12\uff13\uff14"] * 5,
+        },
+        dtype=object,
+    )
+
+    with pd.option_context("mode.string_storage", storage):
+        assert detect_column_kinds(sample) == {}
+
+
+def test_sampler_size_is_bounded_and_uniform_over_chunks():
+    """The sample never exceeds its size and does not depend on how rows were chunked."""
+    frame = pd.DataFrame({"value": [str(i) for i in range(1000)], "other": range(1000)})
+
+    whole = ContentSampler(["value"], 50, seed=1)
+    whole.add(frame)
+    chunked = ContentSampler(["value"], 50, seed=1)
+    for start in range(0, 1000, 70):
+        chunked.add(frame.iloc[start : start + 70])
+
+    assert len(whole.sample) == 50
+    assert list(chunked.sample.columns) == ["value"]
+    assert sorted(whole.sample["value"]) == sorted(chunked.sample["value"])
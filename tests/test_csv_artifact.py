@@ -0,0 +1,36 @@
+"""Tests for the shared in-memory CSV artifact."""
+
+import pytest
+
+from src.csv_artifact import load_csv_artifact
+from src.generate_checksum import generate_checksum
+from src.mask_sensitive_columns import mask_sensitive_columns
+from src.verify_file_integrity import verify_file_integrity
+
+
+def test_stages_use_artifact_bytes_without_rereading(sample_csv, input_output_dirs):
+    """Once loaded, verify/mask/checksum must work even if the source file is gone."""
+    input_dir, output_dir = input_output_dirs
+    csv_path = input_dir / "sample.csv"
+    csv_path.write_text(sample_csv.read_text())
+
+    artifact = load_csv_artifact(csv_path)
+    csv_path.unlink()
+
+    assert verify_file_integrity(artifact) is True
+    assert verify_file_integrity(artifact) is True
+
+    masked_path = mask_sensitive_columns(artifact)
+    assert artifact.frame is not None and artifact.masked is not None
+    assert artifact.dialect == {"encoding": "utf-8", "delimiter": ","}
+    assert masked_path.read_bytes() == artifact.masked_raw
+    assert "alice@example.com" not in artifact.masked_raw.decode()
+
+    _, from_memory = generate_checksum(artifact.masked_artifact())
+    _, from_disk = generate_checksum(masked_path)
+    assert from_memory == from_disk
+
+
+def test_load_csv_artifact_file_not_found():
+    with pytest.raises(FileNotFoundError, match="not found"):
+        load_csv_artifact("/nonexistent/file.csv")
@@ -0,0 +1,252 @@
+"""Tests for download_csv against a local HTTP server."""
+
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src import config
+from src.download_csv import download_csv, download_many, load_manifest
+from src.download_records import downloaded_checksum
+from src.generate_checksum import _file_checksum
+
+CSV_BODY = b"name,email\nAlice,alice@example.com\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(self.path)
+            server.headers.append(dict(self.headers))
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+            failures = server.failures.get(self.path, 0)
+            if failures:
+                server.failures[self.path] = failures - 1
+        try:
+            if self.path.startswith("/slow"):
+                time.sleep(0.2)
+            if failures or self.path == "/error":
+                self.send_error(503)
+            elif self.path == "/missing":
+                self.send_error(404)
+            elif self.path == "/feed.csv":
+                self._send_feed(server)
+            elif self.path == "/big.csv":
+                body = CSV_BODY * 1000
+                self.send_response(200)
+                self.end_headers()  # no Content-Length: the size is only known while streaming
+                self.wfile.write(body)
+            else:
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(CSV_BODY)))
+                self.end_headers()
+                self.wfile.write(CSV_BODY)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def _send_feed(self, server):
+        """Upstream feed with validators (when server.validators is set)."""
+        if server.validators and self.headers.get("If-None-Match") == server.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(server.feed)))
+        if server.validators:
+            self.send_header("ETag", server.etag)
+            self.send_header("Last-Modified", "Tue, 01 Sep 2026 00:00:00 GMT")
+        self.end_headers()
+        self.wfile.write(server.feed)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def http_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.lock = threading.Lock()
+    server.requests, server.headers, server.failures = [], [], {}
+    server.feed, server.etag, server.validators = CSV_BODY, '"v1"', True
+    server.active = server.max_active = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_download_csv_writes_file(http_server, input_output_dirs):
+    _, base = http_server
+    input_dir, _ = input_output_dirs
+
+    path = download_csv(f"{base}/tips.csv")
+
+    assert path == input_dir / "external_dataset.csv"
+    assert path.read_bytes() == CSV_BODY
+
+
+def test_download_streams_and_records_checksum(http_server, tmp_path):
+    _, base = http_server
+    destination = tmp_path / "big.csv"
+
+    [result] = download_many([(f"{base}/big.csv", destination)], retries=0)
+
+    assert result["status"] == "ok" and result["bytes"] == len(CSV_BODY) * 1000
+    assert result["sha256"] == _file_checksum(destination)
+    assert downloaded_checksum(destination) == result["sha256"]
+    assert not (tmp_path / "big.csv.part").exists()
+
+    destination.write_bytes(CSV_BODY)  # changed since the download
+    assert downloaded_checksum(destination) is None
+
+
+def test_download_max_bytes(http_server, tmp_path):
+    _, base = http_server
+    destination = tmp_path / "big.csv"
+    destination.write_bytes(CSV_BODY)
+
+    with pytest.raises(ValueError, match="byte limit"):
+        download_csv(f"{base}/big.csv", destination, max_bytes=1000)
+    with pytest.raises(ValueError, match="byte limit"):
+        download_csv(f"{base}/tips.csv", destination, max_bytes=10)  # from Content-Length
+
+    assert destination.read_bytes() == CSV_BODY  # previous file left in place
+    assert list(tmp_path.iterdir()) == [destination]
+
+
+def test_pipeline_reuses_download_checksum(http_server, input_output_dirs, monkeypatch):
+    from src import run_manifest, verify_file_integrity
+    from src.processor import _process_csv_file
+
+    _, base = http_server
+    path = download_csv(f"{base}/big.csv")
+    monkeypatch.setattr(config, "STREAMING_THRESHOLD_BYTES", 0)
+
+    def no_rehash(_):
+        raise AssertionError("downloaded file was hashed again")
+
+    monkeypatch.setattr(run_manifest, "_file_checksum", no_rehash)
+    monkeypatch.setattr(verify_file_integrity, "_file_checksum", no_rehash)
+    for _ in range(2):  # creates the integrity checksum, then verifies against it
+        result = _process_csv_file(path, skip_encryption=True, reports="none")
+        assert result["status"] == "ok"
+        assert result["fingerprint"]["content_sha256"] == downloaded_checksum(path)
+
+
+def test_unchanged_feed_is_revalidated_not_rewritten(http_server, tmp_path):
+    server, base = http_server
+    destination = tmp_path / "feed.csv"
+    download_csv(f"{base}/feed.csv", destination)
+    mtime = destination.stat().st_mtime_ns
+
+    [result] = download_many([(f"{base}/feed.csv", destination)])
+
+    assert result["status"] == "unchanged" and result["bytes"] == 0
+    assert server.headers[-1]["If-None-Match"] == '"v1"'
+    assert server.headers[-1]["If-Modified-Since"] == "Tue, 01 Sep 2026 00:00:00 GMT"
+    assert destination.stat().st_mtime_ns == mtime
+    assert result["sha256"] == downloaded_checksum(destination)
+
+    # Upstream changed: downloaded again
+    server.feed, server.etag = CSV_BODY + b"Bob,bob@example.com\n", '"v2"'
+    [result] = download_many([(f"{base}/feed.csv", destination)])
+    assert result["status"] == "ok" and destination.read_bytes() == server.feed
+
+
+def test_revalidation_after_checkout_and_local_edits(http_server, tmp_path):
+    server, base = http_server
+    destination = tmp_path / "feed.csv"
+    download_csv(f"{base}/feed.csv", destination)
+
+    # A fresh checkout gives the same content a new mtime: still revalidated
+    os.utime(destination, ns=(1, 1))
+    download_csv(f"{base}/feed.csv", destination)
+    assert "If-None-Match" in server.headers[-1]
+    assert destination.stat().st_mtime_ns == 1
+    assert downloaded_checksum(destination) is not None  # record refreshed
+
+    # Local edits are not trusted: full download
+    destination.write_bytes(b"name\nedited\n")
+    download_csv(f"{base}/feed.csv", destination)
+    assert "If-None-Match" not in server.headers[-1]
+    assert destination.read_bytes() == CSV_BODY
+
+    download_csv(f"{base}/feed.csv", destination, force=True)
+    assert "If-None-Match" not in server.headers[-1]
+
+
+def test_identical_body_without_validators_keeps_file(http_server, tmp_path):
+    server, base = http_server
+    server.validators = False
+    destination = tmp_path / "feed.csv"
+    download_csv(f"{base}/feed.csv", destination)
+    os.utime(destination, ns=(1, 1))
+
+    [result] = download_many([(f"{base}/feed.csv", destination)])
+
+    assert result["status"] == "unchanged" and result["bytes"] == len(CSV_BODY)
+    assert destination.stat().st_mtime_ns == 1
+    assert not (tmp_path / "feed.csv.part").exists()
+
+
+def test_download_many_concurrent_with_per_host_limit(http_server, tmp_path):
+    server, base = http_server
+    pairs = [(f"{base}/slow{i}.csv", tmp_path / f"feed{i}.csv") for i in range(6)]
+
+    started = time.perf_counter()
+    results = download_many(pairs, workers=6, per_host=2, retries=0)
+    elapsed = time.perf_counter() - started
+
+    assert [r["status"] for r in results] == ["ok"] * 6
+    assert [r["url"] for r in results] == [url for url, _ in pairs]
+    assert all(r["bytes"] == len(CSV_BODY) and r["seconds"] > 0 for r in results)
+    assert server.max_active == 2
+    assert elapsed < 6 * 0.2  # faster than one at a time
+    assert all(dest.read_bytes() == CSV_BODY for _, dest in pairs)
+
+
+def test_download_many_retries_server_errors(http_server, tmp_path):
+    server, base = http_server
+    server.failures["/flaky.csv"] = 2
+
+    results = download_many(
+        [(f"{base}/flaky.csv", tmp_path / "flaky.csv"), (f"{base}/error", tmp_path / "error.csv")],
+        retries=2,
+        backoff=0.01,
+    )
+
+    assert results[0]["status"] == "ok" and results[0]["attempts"] == 3
+    assert results[1]["status"] == "failed" and results[1]["attempts"] == 3
+    assert "503" in results[1]["error"]
+    assert not (tmp_path / "error.csv").exists()
+
+
+def test_download_many_does_not_retry_client_errors(http_server, tmp_path):
+    server, base = http_server
+
+    [result] = download_many([(f"{base}/missing", tmp_path / "missing.csv")], retries=3, backoff=0.01)
+
+    assert result["status"] == "failed" and result["attempts"] == 1
+    assert server.requests == ["/missing"]
+
+
+def test_load_manifest(input_output_dirs, tmp_path):
+    input_dir, _ = input_output_dirs
+    manifest = tmp_path / "feeds.json"
+    manifest.write_text(json.dumps({"http://a/x.csv": "x.csv", "http://b/y.csv": str(tmp_path / "y.csv")}))
+
+    assert load_manifest(manifest) == [("http://a/x.csv", input_dir / "x.csv"), ("http://b/y.csv", tmp_path / "y.csv")]
+
+    manifest.write_text(json.dumps([{"url": "http://a/x.csv", "output": "x.csv"}, {"url": "http://b/x.csv", "output": "x.csv"}]))
+    with pytest.raises(ValueError, match="more than once"):
+        load_manifest(manifest)
+
+    with pytest.raises(FileNotFoundError):
+        load_manifest(tmp_path / "absent.json")
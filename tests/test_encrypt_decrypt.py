@@ -6,7 +6,7 @@ import pytest
 from cryptography.fernet import Fernet
 
 from src.encrypt_csv import encrypt_csv_output
-from src.decrypt_csv import decrypt_csv_output
+from src.decrypt_csv import decrypt_byte_range, decrypt_csv_output, decrypt_rows
 
 
 @pytest.fixture
@@ -67,3 +67,209 @@ def test_decrypt_wrong_key(sample_csv, input_output_dirs):
     with pytest.raises(ValueError, match="Decryption failed"):
         decrypt_csv_output(enc_path)
 
+
+
+def test_encrypt_writes_framed_chunks(sample_csv, input_output_dirs, encryption_key, monkeypatch):
+    """Small chunk size should produce several frames that decrypt back in order."""
+    import src.config as config
+    from src.encrypted_format import ENVELOPE_HEADER_SIZE, FRAME_HEADER, TAG_SIZE, is_framed
+
+    monkeypatch.setattr(config, "ENCRYPTION_CHUNK_SIZE", 16)
+    input_dir, output_dir = input_output_dirs
+    csv_path = input_dir / "sample.csv"
+    csv_path.write_text(sample_csv.read_text())
+    original = csv_path.read_bytes()
+
+    enc_path = encrypt_csv_output(csv_path)
+    data = enc_path.read_bytes()
+
+    assert is_framed(data)
+    frames = -(-len(original) // 16)
+    assert len(data) == ENVELOPE_HEADER_SIZE + frames * (FRAME_HEADER.size + TAG_SIZE) + len(original)
+    assert decrypt_csv_output(enc_path).read_bytes() == original
+
+
+def test_decrypt_legacy_fernet_token(sample_csv, input_output_dirs, encryption_key):
+    """Files written as a single Fernet token must still decrypt."""
+    input_dir, output_dir = input_output_dirs
+    enc_path = output_dir / "sample_encrypted.bin"
+    enc_path.write_bytes(Fernet(encryption_key.encode()).encrypt(sample_csv.read_bytes()))
+
+    assert decrypt_csv_output(enc_path).read_bytes() == sample_csv.read_bytes()
+
+
+@pytest.mark.parametrize("damage", ["flip", "truncate", "drop_final", "swap"])
+def test_decrypt_rejects_damaged_frames(sample_csv, input_output_dirs, encryption_key, monkeypatch, damage):
+    """Tampered, truncated or reordered frames must fail without leaving plaintext behind."""
+    import src.config as config
+    from src.encrypted_format import ENVELOPE_HEADER_SIZE, FRAME_HEADER, TAG_SIZE
+
+    monkeypatch.setattr(config, "ENCRYPTION_CHUNK_SIZE", 16)
+    input_dir, output_dir = input_output_dirs
+    csv_path = input_dir / "sample.csv"
+    csv_path.write_text(sample_csv.read_text())
+    enc_path = encrypt_csv_output(csv_path)
+    data = bytearray(enc_path.read_bytes())
+    frame = FRAME_HEADER.size + 16 + TAG_SIZE
+    body = ENVELOPE_HEADER_SIZE
+
+    if damage == "flip":
+        data[body + FRAME_HEADER.size + 3] ^= 0x01
+    elif damage == "truncate":
+        data = data[:-5]
+    elif damage == "drop_final":
+        data = data[: body + frame]
+    else:
+        first, second = data[body : body + frame], data[body + frame : body + 2 * frame]
+        data[body : body + 2 * frame] = second + first
+    enc_path.write_bytes(bytes(data))
+
+    with pytest.raises(ValueError):
+        decrypt_csv_output(enc_path)
+    assert not (output_dir / "sample_decrypted.csv").exists()
+
+
+@pytest.mark.parametrize("length", [0xFFFFFFFF, 16 + 16 + 1, 15])
+def test_decrypt_rejects_bad_frame_length_before_reading(sample_csv, encryption_key, length):
+    """A frame length outside [tag, chunk + tag] is rejected without reading that many bytes."""
+    import io
+
+    from src.encrypted_format import ENVELOPE_HEADER_SIZE, FRAME_HEADER, iter_decrypted, write_encrypted
+
+    encrypted = io.BytesIO()
+    write_encrypted(io.BytesIO(sample_csv.read_bytes()), encrypted, encryption_key, 16)
+    data = bytearray(encrypted.getvalue())
+    index, flags, _ = FRAME_HEADER.unpack_from(data, ENVELOPE_HEADER_SIZE)
+    FRAME_HEADER.pack_into(data, ENVELOPE_HEADER_SIZE, index, flags, length)
+
+    reads = []
+
+    class RecordingReader(io.BytesIO):
+        def read(self, size=-1):
+            reads.append(size)
+            return super().read(size)
+
+    with pytest.raises(ValueError, match="truncated or corrupt"):
+        list(iter_decrypted(RecordingReader(bytes(data)), encryption_key))
+    assert max(reads) < 1024
+
+
+@pytest.fixture
+def framed_sample(sample_csv, input_output_dirs, encryption_key, monkeypatch):
+    """Sample CSV encrypted with 16-byte frames; returns (original bytes, .bin path)."""
+    import src.config as config
+
+    monkeypatch.setattr(config, "ENCRYPTION_CHUNK_SIZE", 16)
+    input_dir, _ = input_output_dirs
+    csv_path = input_dir / "sample.csv"
+    extra = "".join(f"User{i},user{i}@example.com,555-01-{i:04d},{i}\n" for i in range(20))
+    csv_path.write_text(sample_csv.read_text() + extra)
+    return csv_path.read_bytes(), encrypt_csv_output(csv_path)
+
+
+@pytest.mark.parametrize("start,end", [(0, 5), (10, 40), (16, 32), (33, None), (0, None), (500, 600), (5000, 6000)])
+def test_decrypt_byte_range(framed_sample, start, end):
+    """Byte ranges inside, across and past frame boundaries match the plaintext slice."""
+    original, enc_path = framed_sample
+    assert decrypt_byte_range(enc_path, start, end) == original[start:end]
+
+
+def test_decrypt_byte_range_reads_only_needed_frames(framed_sample):
+    """Damage after the requested range is not read, damage inside it is detected."""
+    from src.encrypted_format import ENVELOPE_HEADER_SIZE, FRAME_HEADER, TAG_SIZE
+
+    original, enc_path = framed_sample
+    data = bytearray(enc_path.read_bytes())
+    data[ENVELOPE_HEADER_SIZE + 2 * (FRAME_HEADER.size + 16 + TAG_SIZE) + FRAME_HEADER.size] ^= 0x01
+    enc_path.write_bytes(bytes(data))
+
+    assert decrypt_byte_range(enc_path, 0, 32) == original[:32]
+    with pytest.raises(ValueError, match="Decryption failed"):
+        decrypt_byte_range(enc_path, 30, 40)
+
+
+def test_decrypt_byte_range_legacy_token(sample_csv, input_output_dirs, encryption_key):
+    """Legacy single-token files support the same range API."""
+    _, output_dir = input_output_dirs
+    enc_path = output_dir / "sample_encrypted.bin"
+    enc_path.write_bytes(Fernet(encryption_key.encode()).encrypt(sample_csv.read_bytes()))
+
+    assert decrypt_byte_range(enc_path, 3, 20) == sample_csv.read_bytes()[3:20]
+
+
+def test_decrypt_rows(framed_sample):
+    """Row ranges return the same records as a full parse, keeping their row numbers."""
+    import io
+    import pandas as pd
+
+    original, enc_path = framed_sample
+    full = pd.read_csv(io.BytesIO(original))
+
+    pd.testing.assert_frame_equal(decrypt_rows(enc_path, 5, 9), full.iloc[5:9])
+    assert len(decrypt_rows(enc_path, 0)) == len(full)
+    assert decrypt_rows(enc_path, len(full) + 5, len(full) + 10).empty
+
+
+def test_decrypt_rows_large_start_keeps_memory_flat(framed_sample):
+    """Skipping millions of rows does not allocate per skipped row."""
+    import tracemalloc
+
+    _, enc_path = framed_sample
+    tracemalloc.start()
+    try:
+        assert decrypt_rows(enc_path, 5_000_000, 5_000_010).empty
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak < 20 * 1024 * 1024
+
+
+def test_decrypt_rows_masked(framed_sample):
+    """mask=True masks the returned rows."""
+    import io
+    import pandas as pd
+    from src.mask_sensitive_columns import mask_dataframe
+
+    original, enc_path = framed_sample
+    full = pd.read_csv(io.BytesIO(original))
+    pd.testing.assert_frame_equal(decrypt_rows(enc_path, 3, 7, mask=True), mask_dataframe(full.iloc[3:7]))
+
+
+def test_decrypt_masked_streams_same_output(framed_sample):
+    """Masking fused into the decrypt stream matches masking the whole plaintext."""
+    import io
+    import pandas as pd
+    from src.mask_sensitive_columns import mask_dataframe
+
+    original, enc_path = framed_sample
+    expected = mask_dataframe(pd.read_csv(io.BytesIO(original))).to_csv(index=False).encode("utf-8")
+
+    dec_path = decrypt_csv_output(enc_path, mask=True)
+    assert dec_path.name == "sample_decrypted_masked.csv"
+    assert dec_path.read_bytes() == expected
+
+
+def test_plain_decrypt_does_not_import_pandas(sample_csv, tmp_path, encryption_key):
+    """Encrypting and decrypting without masking never loads pandas or numpy."""
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    code = (
+        "import sys\n"
+        "from pathlib import Path\n"
+        "from src.encrypt_csv import encrypt_csv_output\n"
+        "from src.decrypt_csv import decrypt_byte_range, decrypt_csv_output\n"
+        f"enc = encrypt_csv_output(Path({str(sample_csv)!r}), output_dir=Path({str(tmp_path)!r}))\n"
+        f"decrypt_csv_output(enc, output_dir=Path({str(tmp_path)!r}))\n"
+        "decrypt_byte_range(enc, 0, 10)\n"
+        "print(sorted({'pandas', 'numpy'} & set(sys.modules)))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).resolve().parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert out.strip() == "[]"
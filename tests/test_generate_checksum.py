@@ -35,3 +35,31 @@ def test_generate_checksum_file_not_found():
     """Should raise FileNotFoundError for missing file."""
     with pytest.raises(FileNotFoundError, match="not found"):
         generate_checksum("/nonexistent/file.csv")
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"a,b\r\n1,2\r\n",
+        b"a,b\r1,2\r",
+        b"a,b\n\r\n\r\r\n",
+        "naïve,café\r\n€,✓\r\n".encode("utf-8"),
+        "café\r\n".encode("latin-1"),
+        b"ok\r\n" * 10 + b"\xff\r\n",
+        "tail €".encode("utf-8")[:-1],
+        b"",
+    ],
+)
+@pytest.mark.parametrize("block_size", [1, 2, 3, 7, 1024])
+def test_streaming_checksum_matches_whole_file_digest(monkeypatch, tmp_path, data, block_size):
+    """Block-wise hashing must give the same digest as normalizing the whole file at once."""
+    import hashlib
+    import src.generate_checksum as gc
+
+    monkeypatch.setattr(gc, "_BLOCK_SIZE", block_size)
+    path = tmp_path / "data.csv"
+    path.write_bytes(data)
+    expected = hashlib.sha256(gc._normalize_for_hash(data)).hexdigest()
+
+    assert gc._file_checksum(path) == expected
+    assert gc._bytes_checksum(data) == expected
@@ -1,8 +1,22 @@
 
 """Tests for mask_sensitive_columns """
 
+import pandas as pd
 import pytest
-from src.mask_sensitive_columns import mask_sensitive_columns
+from src.mask_sensitive_columns import (
+    MaskStats,
+    _detect_dialect,
+    _mask_credit_card,
+    _mask_email,
+    _mask_identifier,
+    _mask_phone,
+    _mask_series,
+    _mask_ssn,
+    _mask_value,
+    _read_csv_with_dialect,
+    mask_dataframe,
+    mask_sensitive_columns,
+)
 
 
 def test_mask_sensitive_columns(sample_csv, input_output_dirs):
@@ -46,3 +60,265 @@ def test_mask_sensitive_columns_semicolon_csv(input_output_dirs):
     assert "alice@example.com" not in content
     assert "123-45-6789" not in content
     assert "Alice" in content
+
+
+def test_mask_sensitive_columns_chunked_matches_full(input_output_dirs):
+    """Streaming in small chunks must produce byte-identical output."""
+    input_dir, output_dir = input_output_dirs
+    csv_path = input_dir / "mixed.csv"
+    csv_path.write_text(
+        "name,amount,flag,email,note,phone\n"
+        "Alice,10,True,alice@example.com,,5551234567\n"
+        "Bob,20,False,bob@example.com,,5559876543\n"
+        "Carol,,True,carol@example.org,x,\n"
+        "Dan,4.5,,dan@example.net,y,5550001111\n"
+    )
+
+    full = mask_sensitive_columns(csv_path, output_dir=output_dir / "full").read_bytes()
+    for chunksize in (1, 2, 3):
+        chunked = mask_sensitive_columns(csv_path, output_dir=output_dir / "chunked", chunksize=chunksize)
+        assert chunked.read_bytes() == full
+
+
+@pytest.mark.parametrize("output_format", ["csv", "parquet"])
+def test_mask_chunked_falls_back_to_latin1_after_sample(input_output_dirs, output_format):
+    """Invalid UTF-8 past the sniffed head is read as latin-1 when streaming, as in a whole-file read."""
+    from src.mask_sensitive_columns import _SNIFF_BYTES
+
+    if output_format == "parquet":
+        pytest.importorskip("pyarrow")
+    input_dir, output_dir = input_output_dirs
+    csv_path = input_dir / "late.csv"
+    rows = b"".join(b"%d,user%d@example.com\n" % (i, i) for i in range(5000))
+    csv_path.write_bytes(b"id,email\n" + rows + b"5000,Jos\xe9@example.com\n")
+    assert csv_path.stat().st_size > _SNIFF_BYTES
+
+    full = mask_sensitive_columns(csv_path, output_dir=output_dir / "full", output_format=output_format)
+    chunked = mask_sensitive_columns(
+        csv_path, output_dir=output_dir / "chunked", chunksize=1000, output_format=output_format
+    )
+    if output_format == "csv":
+        assert chunked.read_bytes() == full.read_bytes()
+    else:
+        pd.testing.assert_frame_equal(pd.read_parquet(chunked), pd.read_parquet(full))
+
+
+
+@pytest.mark.parametrize(
+    "kind, scalar",
+    [
+        ("email", _mask_email),
+        ("ssn", _mask_ssn),
+        ("card", _mask_credit_card),
+        ("phone", _mask_phone),
+        ("identifier", _mask_identifier),
+        ("generic", _mask_value),
+    ],
+)
+def test_vectorized_kernels_match_scalar_masking(kind, scalar):
+    """Vectorized masking must return exactly what the per-value functions return."""
+    values = [
+        "", " ", "ab", "abcd", "abcdef", "  padded value  ", "@", "a@", "@b", "a@b", "a@b.",
+        "a@.c", "x@y@z.com", "  jo@ex.com ", "first.last@mail.example.org", "no-at-sign.com",
+        "123-45-6789", "4111 1111 1111 1111", "3400 0000 0000 009", "12", "(555) 123-4567 x89",
+        "1.23E+11", "9.8e5", "ID-00042", "\tcafé@exämple.com", "١٢٣٤٥", "a\x00b", "x" * 300,
+        None, float("nan"),
+    ]
+    series = pd.Series(values, dtype=object)
+
+    expected = [scalar(v) for v in values]
+    actual = _mask_series(series, kind).tolist()
+
+    for value, exp, act in zip(values, expected, actual):
+        assert exp == act or (pd.isna(exp) and pd.isna(act)), value
+
+
+def test_mask_series_masks_each_distinct_value_once(monkeypatch):
+    import src.mask_sensitive_columns as masking
+
+    calls = []
+    mask_strings = masking._mask_strings
+    monkeypatch.setattr(masking, "_mask_strings", lambda values, kind: calls.append(len(values)) or mask_strings(values, kind))
+    series = pd.Series(["alice@example.com", "bob@example.com", None] * 20_000, dtype=object)
+    stats = MaskStats()
+
+    masked = _mask_series(series, "email", stats)
+
+    assert calls == [2]
+    assert masked.tolist()[:3] == [_mask_email("alice@example.com"), _mask_email("bob@example.com"), None]
+    assert stats.detected["email"] == 40_000 and stats.masked["email"] == 40_000 and stats.nulls["email"] == 20_000
+
+
+def test_mask_series_factorizes_by_text():
+    """Values equal as Python objects but printed differently are masked separately."""
+    for series in (pd.Series([0.0, -0.0, 1.0]), pd.Series([1, True, "1", 1.0], dtype=object)):
+        assert _mask_series(series, "generic").tolist() == [_mask_value(str(v)) for v in series]
+
+
+def test_mask_dataframe_inplace(sample_csv):
+    df = pd.read_csv(sample_csv)
+    copy = mask_dataframe(df)
+    assert df.loc[0, "email"] == "alice@example.com"
+
+    same = mask_dataframe(df, inplace=True)
+    assert same is df
+    assert df.equals(copy)
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        (b"name|email|ssn\nAlice|alice@example.com|123-45-6789\n", {"encoding": "utf-8", "delimiter": "|"}),
+        (b"name\temail\tssn\nAlice\talice@example.com\t123-45-6789\n", {"encoding": "utf-8", "delimiter": "\t"}),
+        (b"\xef\xbb\xbfname,email\nAlice,alice@example.com\n", {"encoding": "utf-8-sig", "delimiter": ","}),
+        ("name;email\nJosé;jose@example.com\n".encode("latin-1"), {"encoding": "latin-1", "delimiter": ";"}),
+        (b'name,note\n"Smith, Jo","a;b;c"\n"Lee, Al","d;e;f"\n', {"encoding": "utf-8", "delimiter": ","}),
+    ],
+)
+def test_dialect_detected_from_sample(raw, expected):
+    assert _detect_dialect(raw) == expected
+
+
+def test_read_csv_parses_once(input_output_dirs, monkeypatch):
+    """A pipe-delimited file is parsed in full exactly once."""
+    input_dir, _ = input_output_dirs
+    csv_path = input_dir / "pipes.csv"
+    csv_path.write_text("name|email|ssn\nAlice|alice@example.com|123-45-6789\n")
+
+    full_parses = []
+    original = pd.read_csv
+
+    def counting_read_csv(*args, **kwargs):
+        if "nrows" not in kwargs:
+            full_parses.append(kwargs.get("sep"))
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(pd, "read_csv", counting_read_csv)
+    df, dialect = _read_csv_with_dialect(csv_path)
+
+    assert list(df.columns) == ["name", "email", "ssn"]
+    assert full_parses == ["|"]
+    assert dialect["delimiter"] == "|"
+
+
+def test_mask_stats_counts_per_kind(input_output_dirs):
+    """Masking reports detected, changed and null values per kind, identically when chunked."""
+    input_dir, output_dir = input_output_dirs
+    csv_path = input_dir / "stats.csv"
+    csv_path.write_text(
+        "name,email,ssn,password\n"
+        "Alice,alice@example.com,123-45-6789,hunter2\n"
+        "Bob,,987-65-4321,*\n"
+        "Carol,carol@example.com,,\n"
+    )
+
+    full, chunked = MaskStats(), MaskStats()
+    mask_sensitive_columns(csv_path, stats=full)
+    mask_sensitive_columns(csv_path, chunksize=1, stats=chunked)
+
+    assert full.to_dict() == {
+        "email": {"columns": ["email"], "detected": 2, "masked": 2, "nulls": 1},
+        "ssn": {"columns": ["ssn"], "detected": 2, "masked": 2, "nulls": 1},
+        "generic": {"columns": ["password"], "detected": 2, "masked": 1, "nulls": 1},
+    }
+    assert chunked.to_dict() == full.to_dict()
+
+
+def test_content_detection_masks_unnamed_pii(input_output_dirs, monkeypatch):
+    """With content detection on, PII in innocuously named columns is masked, streamed or not."""
+    import src.config as config
+
+    monkeypatch.setattr(config, "CONTENT_DETECTION", True)
+    monkeypatch.setattr(config, "CONTENT_SAMPLE_ROWS", 3)
+    input_dir, output_dir = input_output_dirs
+    csv_path = input_dir / "contacts.csv"
+    csv_path.write_text(
+        "name,contact,payment,city\n"
+        "Alice,alice@example.com,4111 1111 1111 1111,Springfield\n"
+        "Bob,bob@example.com,5500 0000 0000 0004,Riverside\n"
+        "Carol,,4012 8888 8888 1881,Salem\n"
+        "Dan,dan@example.net,3782 822463 10005,Fairview\n"
+    )
+
+    stats = MaskStats()
+    full = mask_sensitive_columns(csv_path, output_dir=output_dir / "full", stats=stats)
+    masked = pd.read_csv(full)
+
+    assert stats.columns == {"email": ["contact"], "card": ["payment"]}
+    assert masked.loc[0, "contact"] == "a****@e******.com"
+    assert masked.loc[0, "payment"] == "**** **** **** 1111"
+    assert masked.loc[0, "city"] == "Springfield"
+    chunked = mask_sensitive_columns(csv_path, output_dir=output_dir / "chunked", chunksize=1)
+    assert chunked.read_bytes() == full.read_bytes()
+
+
+@pytest.mark.parametrize("chunksize", [None, 1])
+def test_mask_sensitive_columns_parquet_output(input_output_dirs, chunksize):
+    """Parquet output holds the same masked, typed data as the CSV, streamed or not."""
+    pytest.importorskip("pyarrow")
+    input_dir, output_dir = input_output_dirs
+    csv_path = input_dir / "mixed.csv"
+    csv_path.write_text(
+        "name,amount,email,note\n"
+        "Alice,10,alice@example.com,\n"
+        "Bob,20,,x\n"
+        "Carol,4.5,carol@example.org,y\n"
+    )
+
+    csv_out = mask_sensitive_columns(csv_path, output_dir=output_dir, chunksize=chunksize, output_format="both")
+    parquet = pd.read_parquet(output_dir / "mixed_masked.parquet")
+
+    assert csv_out == output_dir / "mixed_masked.csv"
+    assert str(parquet["amount"].dtype) == "float64"
+    pd.testing.assert_frame_equal(parquet, pd.read_csv(csv_out), check_dtype=False)
+    only = mask_sensitive_columns(csv_path, output_dir=output_dir / "only", chunksize=chunksize, output_format="parquet")
+    assert only.suffix == ".parquet"
+    assert not (output_dir / "only" / "mixed_masked.csv").exists()
+
+
+def test_mask_sensitive_columns_parquet_needs_pyarrow(sample_csv, input_output_dirs, monkeypatch):
+    """Without pyarrow, Parquet output fails with a clear error; unknown formats are rejected."""
+    import sys
+
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    with pytest.raises(ImportError, match="pip install pyarrow"):
+        mask_sensitive_columns(sample_csv, output_format="parquet")
+    with pytest.raises(ValueError, match="MASKED_OUTPUT_FORMAT"):
+        mask_sensitive_columns(sample_csv, output_format="xlsx")
+
+
+def test_pyarrow_engine_matches_default(monkeypatch):
+    """The pyarrow engine stores text as string[pyarrow] and masks to the same output."""
+    pytest.importorskip("pyarrow")
+    import src.config as config
+
+    raw = (
+        "name,email,phone,joined,amount,active,note\n"
+        "Alice,alice@example.com,+639757566189,2020-01-01,10,True,\n"
+        "Bob,,+639440325731,2021-02-03T10:00:00,2.5,False,NA\n"
+        "Carol,carol@example.org,,2022-03-04,,True,x\n"
+    ).encode()
+    short_row = b"id,email,phone\n1,a@x.com,555-123-4567\n2,bob@example.com\n3,c@x.com,555-765-4321\n"
+
+    for data in (raw, short_row):
+        monkeypatch.setattr(config, "CSV_ENGINE", "c")
+        default, _ = _read_csv_with_dialect(data)
+        monkeypatch.setattr(config, "CSV_ENGINE", "pyarrow")
+        arrow, _ = _read_csv_with_dialect(data)
+        assert mask_dataframe(arrow).to_csv(index=False) == mask_dataframe(default).to_csv(index=False)
+
+    assert len(arrow) == 3  # the short row is padded, not dropped
+    arrow, _ = _read_csv_with_dialect(raw)
+    assert str(arrow["name"].dtype) == "string"
+    assert arrow["name"].dtype.storage == "pyarrow"
+
+
+def test_pyarrow_engine_falls_back(monkeypatch):
+    """Files Arrow cannot read like pandas (here: duplicate column names) use the default parser."""
+    pytest.importorskip("pyarrow")
+    import src.config as config
+
+    monkeypatch.setattr(config, "CSV_ENGINE", "pyarrow")
+    df, _ = _read_csv_with_dialect(b"email,email,amount\na@example.com,b@example.com,1\n")
+
+    assert list(df.columns) == ["email", "email.1", "amount"]
@@ -24,6 +24,43 @@ def test_process_all_csv_files(sample_csv, input_output_dirs):
     assert "sample_masked.csv" in results[0]["outputs"]
     assert (output_dir / "sample" / "sample_masked.csv").exists()
     assert (output_dir / "sample" / "sample_masked.checksum").exists()
+    assert results[0]["mask_stats"]["email"] == {"columns": ["email"], "detected": 2, "masked": 2, "nulls": 0}
+
+
+def test_process_records_stage_metrics(sample_csv, input_output_dirs):
+    """Each stage that ran records its time and the bytes/rows it handled."""
+    input_dir, output_dir = input_output_dirs
+    (input_dir / "sample.csv").write_text(sample_csv.read_text())
+
+    stages = process_all_csv_files(skip_encryption=True, reports="none")[0]["stages"]
+
+    assert list(stages) == ["read", "verify", "mask", "checksum"]
+    size = (input_dir / "sample.csv").stat().st_size
+    assert stages["read"]["bytes_in"] == size
+    assert stages["mask"]["rows_in"] == stages["mask"]["rows_out"] == 2
+    assert stages["mask"]["bytes_out"] == (output_dir / "sample" / "sample_masked.csv").stat().st_size
+    assert stages["checksum"]["bytes_in"] == stages["mask"]["bytes_out"]
+    assert all(m["wall_s"] >= 0 and m["cpu_s"] >= 0 for m in stages.values())
+
+
+def test_process_writes_and_checksums_parquet(sample_csv, input_output_dirs, monkeypatch):
+    """With MASKED_OUTPUT_FORMAT=both, each masked file gets its own checksum."""
+    pytest.importorskip("pyarrow")
+    import src.config as config
+    from src.generate_checksum import _file_checksum
+
+    monkeypatch.setattr(config, "MASKED_OUTPUT_FORMAT", "both")
+    input_dir, output_dir = input_output_dirs
+    (input_dir / "sample.csv").write_text(sample_csv.read_text())
+
+    result = process_all_csv_files(skip_encryption=True, reports="none")[0]
+
+    file_dir = output_dir / "sample"
+    assert result["status"] == "ok"
+    assert {"sample_masked.csv", "sample_masked.parquet", "sample_masked.checksum",
+            "sample_masked.parquet.checksum"} <= set(result["outputs"])
+    assert (file_dir / "sample_masked.parquet.checksum").read_text() == _file_checksum(file_dir / "sample_masked.parquet")
+    assert (file_dir / "sample_masked.checksum").read_text() == _file_checksum(file_dir / "sample_masked.csv")
 
 
 def test_process_all_integrity_failed(sample_csv, input_output_dirs):
@@ -44,6 +81,26 @@ def test_process_all_integrity_failed(sample_csv, input_output_dirs):
     assert not (output_dir / "sample" / "sample_masked.csv").exists()
 
 
+def test_process_integrity_failure_reports_changed_ranges(sample_csv, input_output_dirs, monkeypatch):
+    """With Merkle checksums, a tampered input's result names the changed byte/row ranges."""
+    import src.config as config
+    from src.generate_checksum import generate_checksum
+
+    monkeypatch.setattr(config, "CHECKSUM_FORMAT", "merkle")
+    monkeypatch.setattr(config, "MERKLE_BLOCK_SIZE", 16)
+    input_dir, output_dir = input_output_dirs
+    csv_path = input_dir / "sample.csv"
+    csv_path.write_text(sample_csv.read_text())
+    generate_checksum(csv_path, output_dir=output_dir / "sample")
+    csv_path.write_text(sample_csv.read_text().replace("Bob", "Eve"))
+
+    results = process_all_csv_files(skip_encryption=True)
+
+    assert results[0]["status"] == "integrity_failed"
+    [changed] = results[0]["changed_ranges"]
+    assert changed["rows"][0] <= 3 <= changed["rows"][1]
+
+
 def test_process_bin_file_skipped_without_key(input_output_dirs):
     """Pipeline should skip .bin files when ENCRYPTION_KEY is not set."""
     input_dir, output_dir = input_output_dirs
@@ -81,3 +138,206 @@ def test_process_bin_file_decrypts_with_key(sample_csv, input_output_dirs, monke
     dec_path = output_dir / "sample" / "sample_decrypted.csv"
     assert dec_path.exists()
     assert dec_path.read_text() == sample_csv.read_text()
+
+
+def test_process_all_csv_files_with_workers(sample_csv, input_output_dirs):
+    """Worker pool should produce the same per-file results, in stable order."""
+    input_dir, output_dir = input_output_dirs
+    for name in ("b_sample.csv", "a_sample.csv", "c_sample.csv"):
+        (input_dir / name).write_text(sample_csv.read_text())
+    (input_dir / "broken.csv").write_text("")
+
+    results = process_all_csv_files(skip_encryption=True, workers=2)
+
+    assert [r["file"] for r in results] == ["a_sample.csv", "b_sample.csv", "broken.csv", "c_sample.csv"]
+    assert [r["status"] for r in results] == ["ok", "ok", "error", "ok"]
+    assert "error" in results[2]
+    for stem in ("a_sample", "b_sample", "c_sample"):
+        assert (output_dir / stem / f"{stem}_masked.csv").exists()
+
+
+def test_process_all_skips_unchanged_files(sample_csv, input_output_dirs, monkeypatch):
+    """Second run should report unchanged files until content, config or --force changes."""
+    input_dir, output_dir = input_output_dirs
+    csv_path = input_dir / "sample.csv"
+    csv_path.write_text(sample_csv.read_text())
+
+    first = process_all_csv_files(skip_encryption=True)
+    assert first[0]["status"] == "ok"
+    assert (output_dir / "run_manifest.json").exists()
+
+    second = process_all_csv_files(skip_encryption=True)
+    assert second[0]["status"] == "unchanged"
+    assert second[0]["outputs"] == first[0]["outputs"]
+
+    assert process_all_csv_files(skip_encryption=True, force=True)[0]["status"] == "ok"
+
+    import src.config as config
+    monkeypatch.setattr(config, "SENSITIVE_COLUMN_PATTERNS", config.SENSITIVE_COLUMN_PATTERNS + ["amount"])
+    assert process_all_csv_files(skip_encryption=True)[0]["status"] == "ok"
+
+    (output_dir / "sample" / "sample_masked.csv").unlink()
+    assert process_all_csv_files(skip_encryption=True)[0]["status"] == "ok"
+
+
+def test_process_large_file_streams(sample_csv, input_output_dirs, monkeypatch):
+    """Files over the streaming threshold are masked in chunks by the pipeline."""
+    import src.config as config
+
+    input_dir, output_dir = input_output_dirs
+    (input_dir / "sample.csv").write_text(sample_csv.read_text())
+    monkeypatch.setattr(config, "STREAMING_THRESHOLD_BYTES", 0)
+    monkeypatch.setattr(config, "MASK_CHUNK_ROWS", 1)
+
+    results = process_all_csv_files(skip_encryption=True)
+
+    assert results[0]["status"] == "ok"
+    content = (output_dir / "sample" / "sample_masked.csv").read_text()
+    assert content.count("name,email,ssn,amount") == 1
+    assert "alice@example.com" not in content
+
+
+def test_process_records_dialect(input_output_dirs):
+    """Detected dialect is reported per file and kept in the run manifest."""
+    import json
+
+    input_dir, output_dir = input_output_dirs
+    (input_dir / "pipes.csv").write_text("name|email|ssn\nAlice|alice@example.com|123-45-6789\n")
+
+    results = process_all_csv_files(skip_encryption=True)
+
+    assert results[0]["dialect"] == {"encoding": "utf-8", "delimiter": "|"}
+    manifest = json.loads((output_dir / "run_manifest.json").read_text())
+    assert manifest["files"]["pipes.csv"]["dialect"] == results[0]["dialect"]
+    assert process_all_csv_files(skip_encryption=True)[0]["dialect"] == results[0]["dialect"]
+
+
+def test_process_reports_none_draws_no_images(sample_csv, input_output_dirs):
+    """reports="none" runs the data stages only."""
+    input_dir, output_dir = input_output_dirs
+    (input_dir / "sample.csv").write_text(sample_csv.read_text())
+
+    results = process_all_csv_files(skip_encryption=True, reports="none")
+
+    assert results[0]["status"] == "ok"
+    assert (output_dir / "sample" / "sample_masked.csv").exists()
+    assert not any(name.endswith(".png") for name in results[0]["outputs"])
+    assert not list(output_dir.rglob("*.png"))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_process_reports_deferred(sample_csv, input_output_dirs, workers):
+    """Deferred images are listed in the outputs and exist once processing returns."""
+    input_dir, output_dir = input_output_dirs
+    (input_dir / "sample.csv").write_text(sample_csv.read_text())
+    (input_dir / "broken.csv").write_text("")
+
+    results = process_all_csv_files(skip_encryption=True, workers=workers, reports="deferred")
+
+    by_file = {r["file"]: r for r in results}
+    assert "render_jobs" not in by_file["sample.csv"]
+    assert "sample_security_summary.png" in by_file["sample.csv"]["outputs"]
+    assert (output_dir / "sample" / "sample_security_summary.png").stat().st_size > 0
+    assert by_file["broken.csv"]["status"] == "error"
+    assert (output_dir / "broken" / "broken_security_summary.png").exists()
+
+
+def test_run_deferred_writes_json_before_images(sample_csv, input_output_dirs, monkeypatch):
+    """The summary JSON is written before any queued image is drawn."""
+    import src.config as config
+    import src.processor as processor
+
+    monkeypatch.setattr(config, "DEFAULT_KEY", None)
+    input_dir, output_dir = input_output_dirs
+    (input_dir / "sample.csv").write_text(sample_csv.read_text())
+    json_seen_at_drain = []
+    original_drain = processor.RenderQueue.drain
+
+    def drain(self):
+        json_seen_at_drain.append((output_dir / config.SUMMARY_JSON_NAME).exists())
+        return original_drain(self)
+
+    monkeypatch.setattr(processor.RenderQueue, "drain", drain)
+
+    assert processor.run(["--workers", "1", "--reports", "deferred"]) == 0
+    assert json_seen_at_drain and json_seen_at_drain[0]
+    assert (output_dir / config.SUMMARY_PNG_NAME).exists()
+    assert (output_dir / "sample" / "sample_security_summary.png").exists()
+
+
+def test_run_reports_none_writes_json_only(sample_csv, input_output_dirs, monkeypatch):
+    """--reports=none still writes the summary JSON, but no chart."""
+    import src.config as config
+    from src.processor import run
+
+    monkeypatch.setattr(config, "DEFAULT_KEY", None)
+    input_dir, output_dir = input_output_dirs
+    (input_dir / "sample.csv").write_text(sample_csv.read_text())
+
+    assert run(["--workers", "1", "--reports", "none"]) == 0
+    assert (output_dir / config.SUMMARY_JSON_NAME).exists()
+    assert not list(output_dir.rglob("*.png"))
+
+
+def test_import_does_not_load_heavy_dependencies():
+    """pandas, numpy and matplotlib are loaded by the stages that use them, not on import."""
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    code = "import sys, src.processor; print(sorted({'pandas', 'numpy', 'matplotlib'} & set(sys.modules)))"
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).resolve().parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert out.strip() == "[]"
+
+
+def test_run_summary_includes_stage_totals_and_throughput(sample_csv, input_output_dirs, monkeypatch):
+    """pipeline_summary.json carries per-stage totals and run-level throughput."""
+    import json
+
+    import src.config as config
+    from src.processor import run
+
+    monkeypatch.setattr(config, "DEFAULT_KEY", None)
+    input_dir, output_dir = input_output_dirs
+    (input_dir / "sample.csv").write_text(sample_csv.read_text())
+
+    assert run(["--workers", "1", "--reports", "none"]) == 0
+    summary = json.loads((output_dir / config.SUMMARY_JSON_NAME).read_text())
+
+    assert summary["stages"]["mask"]["files"] == 1
+    assert summary["stages"]["mask"]["rows_out"] == 2
+    assert summary["throughput"]["files_read"] == 1
+    assert summary["throughput"]["bytes_in"] == (input_dir / "sample.csv").stat().st_size
+    assert summary["throughput"]["rows"] == 2
+
+
+def test_spawned_workers_mirror_runtime_config(monkeypatch):
+    """Workers started with spawn see config set in code, including the key ring."""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    from cryptography.fernet import Fernet
+
+    import src.config as config
+    from src.key_ring import configured_key_ring
+    from src.processor import _init_worker, _worker_config
+
+    monkeypatch.setattr(config, "DEFAULT_KEY", Fernet.generate_key().decode())
+    monkeypatch.setattr(config, "ENCRYPTION_KEY_ID", "2026")
+    monkeypatch.setattr(config, "ENCRYPTION_KEYRING", f"2025:{Fernet.generate_key().decode()}")
+
+    with ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(_worker_config(),),
+    ) as pool:
+        ring = pool.submit(configured_key_ring).result()
+
+    assert ring == configured_key_ring()
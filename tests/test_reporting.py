@@ -25,3 +25,20 @@ def test_write_pipeline_summary_creates_json_and_chart(input_output_dirs):
     assert summary["status_counts"]["ok"] == 1
     assert summary["status_counts"]["error"] == 1
     assert len(summary["results"]) == 2
+
+
+def test_render_file_security_summary_reads_no_files(tmp_path):
+    """The per-file image is drawn from masking stats alone."""
+    from src.reporting import render_file_security_summary
+
+    stats = {"email": {"columns": ["email"], "detected": 3, "masked": 3, "nulls": 0}}
+    img = render_file_security_summary(
+        file_path=tmp_path / "missing.csv",
+        mask_stats=stats,
+        integrity_verified=True,
+        status="ok",
+        output_dir=tmp_path,
+    )
+
+    assert img == tmp_path / "missing_security_summary.png"
+    assert img.stat().st_size > 0
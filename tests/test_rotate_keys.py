@@ -0,0 +1,174 @@
+"""Tests for envelope encryption key rings and key rotation."""
+
+import pytest
+from cryptography.fernet import Fernet
+
+import src.config as config
+from src.decrypt_csv import decrypt_csv_output
+from src.encrypt_csv import encrypt_csv_output
+from src.encrypted_format import ENVELOPE_HEADER_SIZE, HEADER, read_key_id
+from src.key_ring import configured_key_ring, default_key_id, parse_key_ring
+from src.rotate_keys import rotate_keys
+
+OLD_KEY = Fernet.generate_key().decode()
+NEW_KEY = Fernet.generate_key().decode()
+
+
+@pytest.fixture
+def keys(monkeypatch):
+    """Start with OLD_KEY as the current master key under ID "2025"."""
+    monkeypatch.setattr(config, "DEFAULT_KEY", OLD_KEY)
+    monkeypatch.setattr(config, "ENCRYPTION_KEY_ID", "2025")
+    monkeypatch.setattr(config, "ENCRYPTION_KEYRING", "")
+
+    def rotate_to_new_key(keep_old: bool = True):
+        monkeypatch.setattr(config, "DEFAULT_KEY", NEW_KEY)
+        monkeypatch.setattr(config, "ENCRYPTION_KEY_ID", "2026")
+        monkeypatch.setattr(config, "ENCRYPTION_KEYRING", f"2025:{OLD_KEY}" if keep_old else "")
+
+    return rotate_to_new_key
+
+
+@pytest.fixture
+def encrypted(sample_csv, input_output_dirs, keys, monkeypatch):
+    monkeypatch.setattr(config, "ENCRYPTION_CHUNK_SIZE", 16)
+    input_dir, output_dir = input_output_dirs
+    csv_path = input_dir / "sample.csv"
+    csv_path.write_bytes(sample_csv.read_bytes())
+    return csv_path.read_bytes(), encrypt_csv_output(csv_path, output_dir=output_dir / "sample")
+
+
+def test_key_ring_from_config(monkeypatch):
+    monkeypatch.setattr(config, "DEFAULT_KEY", NEW_KEY)
+    monkeypatch.setattr(config, "ENCRYPTION_KEY_ID", None)
+    monkeypatch.setattr(config, "ENCRYPTION_KEYRING", f" 2025:{OLD_KEY} ,")
+
+    ring = configured_key_ring()
+    assert ring.current_id == default_key_id(NEW_KEY) and ring.current == NEW_KEY
+    assert ring.get("2025") == OLD_KEY
+    with pytest.raises(ValueError, match="not configured"):
+        ring.get("1999")
+
+    for bad in ("no-separator", "bad id:key", f"a:{OLD_KEY},a:{NEW_KEY}"):
+        with pytest.raises(ValueError):
+            parse_key_ring(bad)
+
+
+def test_rotation_rewrites_only_the_key_block(encrypted, input_output_dirs, keys):
+    original, enc_path = encrypted
+    before = enc_path.read_bytes()
+    assert read_key_id(enc_path) == "2025"
+
+    keys()
+    assert [r["status"] for r in rotate_keys(dry_run=True)] == ["would_rotate"]
+    assert enc_path.read_bytes() == before
+    [result] = rotate_keys()
+
+    after = enc_path.read_bytes()
+    assert result["status"] == "rotated" and read_key_id(enc_path) == "2026"
+    assert after[:HEADER.size] == before[:HEADER.size]
+    assert after[ENVELOPE_HEADER_SIZE:] == before[ENVELOPE_HEADER_SIZE:]  # frames untouched
+    assert [r["status"] for r in rotate_keys()] == ["current"]
+
+    # The old master key is no longer needed
+    keys(keep_old=False)
+    assert decrypt_csv_output(enc_path).read_bytes() == original
+
+
+def test_decrypt_selects_master_key_by_id(encrypted, keys):
+    original, enc_path = encrypted
+
+    keys()  # new current key; the file is still under "2025"
+    assert decrypt_csv_output(enc_path).read_bytes() == original
+
+    keys(keep_old=False)
+    with pytest.raises(ValueError, match="'2025' is not configured"):
+        decrypt_csv_output(enc_path)
+
+
+def test_rotation_without_old_key_fails_and_keeps_file(encrypted, keys):
+    _, enc_path = encrypted
+    before = enc_path.read_bytes()
+
+    keys(keep_old=False)
+    [result] = rotate_keys()
+
+    assert result["status"] == "failed" and "not configured" in result["error"]
+    assert enc_path.read_bytes() == before
+
+
+def _version1_file(path, key, plaintext):
+    """Framed file as written before envelope encryption: frames under a key derived from the master key."""
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+    from src.encrypted_format import FLAG_FINAL, FRAME_AAD, FRAME_HEADER, LEGACY_VERSION, MAGIC, derive_key
+
+    header = HEADER.pack(MAGIC, LEGACY_VERSION, 1024, b"\x00" * 8)
+    ciphertext = AESGCM(derive_key(key)).encrypt(b"\x00" * 8 + b"\x00" * 4, plaintext, header + FRAME_AAD.pack(0, FLAG_FINAL))
+    path.write_bytes(header + FRAME_HEADER.pack(0, FLAG_FINAL, len(ciphertext)) + ciphertext)
+
+
+def test_rotation_upgrades_legacy_files(input_output_dirs, keys):
+    _, output_dir = input_output_dirs
+    plaintext = b"a,b\n1,2\n"
+    token = output_dir / "token_encrypted.bin"
+    token.write_bytes(Fernet(OLD_KEY.encode()).encrypt(plaintext))
+    version1 = output_dir / "v1_encrypted.bin"
+    _version1_file(version1, OLD_KEY, plaintext)
+
+    # After the key change, the old key in the ring still decrypts them
+    keys()
+    for path in (token, version1):
+        assert decrypt_csv_output(path).read_bytes() == plaintext
+
+    before = {path: path.read_bytes() for path in (token, version1)}
+    assert [r["status"] for r in rotate_keys(dry_run=True)] == ["would_upgrade"] * 2
+    assert {path: path.read_bytes() for path in before} == before
+
+    results = rotate_keys()
+    assert [(r["status"], r["key_id"]) for r in results] == [("upgraded", "2026")] * 2
+    assert [r["status"] for r in rotate_keys()] == ["current"] * 2
+    assert not list(output_dir.glob("*.tmp"))
+
+    keys(keep_old=False)
+    for path in (token, version1):
+        assert read_key_id(path) == "2026"
+        assert decrypt_csv_output(path).read_bytes() == plaintext
+
+
+def test_legacy_file_without_its_key_fails_and_is_kept(input_output_dirs, keys):
+    _, output_dir = input_output_dirs
+    version1 = output_dir / "v1_encrypted.bin"
+    _version1_file(version1, OLD_KEY, b"a,b\n1,2\n")
+    before = version1.read_bytes()
+
+    keys(keep_old=False)
+    [result] = rotate_keys()
+
+    assert result["status"] == "failed" and "wrong encryption key" in result["error"]
+    assert version1.read_bytes() == before
+    assert not list(output_dir.glob("*.tmp"))
+
+
+def test_rotation_keeps_pipeline_outputs_unchanged(sample_csv, input_output_dirs, keys):
+    from src.processor import process_all_csv_files
+
+    input_dir, output_dir = input_output_dirs
+    (input_dir / "sample.csv").write_bytes(sample_csv.read_bytes())
+    [first] = process_all_csv_files(skip_encryption=False)
+    enc_path = output_dir / "sample" / "sample_encrypted.bin"
+    assert first["status"] == "ok" and read_key_id(enc_path) == "2025"
+
+    keys()
+    assert [r["status"] for r in rotate_keys([enc_path])] == ["rotated"]
+    before = enc_path.read_bytes()
+
+    [second] = process_all_csv_files(skip_encryption=False)
+    assert second["status"] == "unchanged"
+    assert enc_path.read_bytes() == before
+
+    # An output whose master key is no longer configured is encrypted again
+    keys(keep_old=False)
+    enc_path.write_bytes(before[:HEADER.size] + b"\x04" + b"1999".ljust(31, b"\x00") + before[HEADER.size + 32 :])
+    assert process_all_csv_files(skip_encryption=False)[0]["status"] == "ok"
+    assert read_key_id(enc_path) == "2026"
@@ -0,0 +1,43 @@
+"""Tests for per-stage metrics."""
+
+import pytest
+
+from src.stage_metrics import run_throughput, stage_totals, timed_stage
+
+
+def test_timed_stage_records_even_on_error():
+    """A stage that raises still records its timing."""
+    result = {}
+    with pytest.raises(RuntimeError):
+        with timed_stage(result, "mask", bytes_in=10) as metrics:
+            metrics["rows_out"] = 3
+            raise RuntimeError("boom")
+
+    assert result["stages"]["mask"]["bytes_in"] == 10
+    assert result["stages"]["mask"]["rows_out"] == 3
+    assert result["stages"]["mask"]["wall_s"] >= 0
+
+
+def test_stage_totals_and_throughput():
+    """Totals sum over files in pipeline order; throughput uses the first stage's input bytes."""
+    results = [
+        {"stages": {
+            "mask": {"wall_s": 1.0, "cpu_s": 0.5, "bytes_in": 100, "bytes_out": 90, "rows_in": 5, "rows_out": 5},
+            "read": {"wall_s": 0.5, "cpu_s": 0.5, "bytes_in": 100, "bytes_out": None, "rows_in": None, "rows_out": None},
+        }},
+        {"stages": {
+            "read": {"wall_s": 0.5, "cpu_s": 0.5, "bytes_in": 300, "bytes_out": None, "rows_in": None, "rows_out": None},
+        }},
+        {"status": "skipped"},
+    ]
+
+    totals = stage_totals(results)
+    assert list(totals) == ["read", "mask"]
+    assert totals["read"]["files"] == 2
+    assert totals["read"]["bytes_in"] == 400
+    assert totals["mask"]["rows_out"] == 5
+
+    throughput = run_throughput(results, wall_s=2.0)
+    assert throughput["files_read"] == 2
+    assert throughput["bytes_in"] == 400
+    assert throughput["rows_per_s"] == 2.5
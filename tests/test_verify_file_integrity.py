@@ -44,3 +44,120 @@ def test_verify_file_integrity_file_not_found():
     """Should raise FileNotFoundError for missing file."""
     with pytest.raises(FileNotFoundError, match="not found"):
         verify_file_integrity("/nonexistent/file.csv")
+
+
+@pytest.fixture
+def merkle_config(monkeypatch):
+    """Merkle checksum files with small blocks so the sample spans several of them."""
+    import src.config as config
+
+    monkeypatch.setattr(config, "CHECKSUM_FORMAT", "merkle")
+    monkeypatch.setattr(config, "MERKLE_BLOCK_SIZE", 32)
+    monkeypatch.setattr(config, "CHECKSUM_THREADS", 3)
+
+
+def _rows_csv(count):
+    return "name,email,amount\n" + "".join(f"User{i},user{i}@example.com,{i}\n" for i in range(count))
+
+
+def test_merkle_checksum_file(input_output_dirs, merkle_config):
+    """Merkle checksum files are JSON with per-block digests; the root is returned."""
+    import json
+
+    input_dir, output_dir = input_output_dirs
+    csv_path = input_dir / "data.csv"
+    csv_path.write_text(_rows_csv(10))
+
+    checksum_path, root = generate_checksum(csv_path)
+    document = json.loads(checksum_path.read_text())
+
+    assert document["format"] == "merkle-sha256"
+    assert document["root"] == root
+    assert document["size"] == len(csv_path.read_bytes())
+    assert len(document["blocks"]) == -(-document["size"] // 32)
+    assert verify_file_integrity(csv_path) is True
+
+
+def test_merkle_ignores_line_ending_changes(input_output_dirs, merkle_config):
+    """CRLF conversion does not change any block digest."""
+    input_dir, output_dir = input_output_dirs
+    csv_path = input_dir / "data.csv"
+    csv_path.write_bytes(_rows_csv(10).encode())
+    generate_checksum(csv_path)
+
+    csv_path.write_bytes(_rows_csv(10).replace("\n", "\r\n").encode())
+    assert verify_file_integrity(csv_path) is True
+
+
+@pytest.mark.parametrize("payload", [b"PAR1\xff\x00" + b"a\r\nb" * 20, b"a\r\nb" * 20 + b"\xff\x00PAR1"])
+def test_merkle_hashes_binary_content_raw(input_output_dirs, merkle_config, payload):
+    """Binary files are not line-ending-normalized, wherever the invalid UTF-8 first appears."""
+    import json
+
+    input_dir, _ = input_output_dirs
+    path = input_dir / "data.parquet"
+    path.write_bytes(payload)
+    checksum_path, _ = generate_checksum(path)
+    assert json.loads(checksum_path.read_text())["size"] == len(payload)
+
+    path.write_bytes(payload.replace(b"\r\n", b"\n"))
+    assert verify_file_integrity(path) is False
+
+
+def test_merkle_reports_changed_ranges(input_output_dirs, merkle_config):
+    """An in-place edit is localized to the blocks and rows it touched."""
+    from src.verify_file_integrity import check_file_integrity
+
+    input_dir, output_dir = input_output_dirs
+    csv_path = input_dir / "data.csv"
+    original = _rows_csv(20)
+    csv_path.write_text(original)
+    generate_checksum(csv_path)
+
+    offset = original.index("User12,")
+    csv_path.write_text(original[:offset] + "Eve!!!" + original[offset + 6 :])
+    report = check_file_integrity(csv_path)
+
+    assert report["verified"] is False
+    assert report["format"] == "merkle"
+    [changed] = report["changed"]
+    start, end = changed["bytes"]
+    assert start <= offset < offset + 6 <= end
+    assert end - start <= 2 * 32
+    first_row, last_row = changed["rows"]
+    assert first_row <= 14 <= last_row  # header is line 1, User12 is line 14
+    assert last_row - first_row <= 3
+
+
+def test_merkle_reports_truncation(input_output_dirs, merkle_config):
+    """Blocks missing from the end of the file are reported as changed."""
+    from src.verify_file_integrity import check_file_integrity
+
+    input_dir, output_dir = input_output_dirs
+    csv_path = input_dir / "data.csv"
+    original = _rows_csv(20)
+    csv_path.write_text(original)
+    generate_checksum(csv_path)
+
+    csv_path.write_text(original[:64])
+    report = check_file_integrity(csv_path)
+
+    assert report["verified"] is False
+    assert report["changed"] == [{"bytes": [64, 64], "rows": [3, 3]}]
+
+
+def test_legacy_checksum_still_verified_in_merkle_mode(sample_csv, input_output_dirs, merkle_config):
+    """Existing single-digest checksum files keep working after switching formats."""
+    import src.config as config
+    from src.verify_file_integrity import check_file_integrity
+
+    input_dir, output_dir = input_output_dirs
+    csv_path = input_dir / "sample.csv"
+    csv_path.write_text(sample_csv.read_text())
+    config.CHECKSUM_FORMAT = "sha256"
+    generate_checksum(csv_path)
+    config.CHECKSUM_FORMAT = "merkle"
+
+    assert check_file_integrity(csv_path) == {"verified": True, "format": "sha256"}
+    csv_path.write_text(sample_csv.read_text() + "Mallory,m@example.com,000-00-0000,1\n")
+    assert check_file_integrity(csv_path) == {"verified": False, "format": "sha256"}
@@ -0,0 +1,103 @@
+"""Tests for watch mode."""
+
+import threading
+import time
+
+from src.watch import FileWatcher, watch
+
+
+def test_file_watcher_debounces_until_stable(input_output_dirs):
+    """A file is reported once it stops changing for the settle time, and again only after it changes."""
+    input_dir, _ = input_output_dirs
+    watcher = FileWatcher(settle_seconds=1.0)
+    csv_path = input_dir / "data.csv"
+    csv_path.write_text("a,b\n1,2\n")
+    (input_dir / "data2.csv.part").write_text("a,b\n")
+
+    assert watcher.poll(now=0.0) == []
+    csv_path.write_text("a,b\n1,2\n3,4\n")  # still being written
+    assert watcher.poll(now=0.5) == []
+    assert watcher.poll(now=1.0) == []
+    assert watcher.poll(now=1.6) == [csv_path]
+
+    watcher.mark_handled(csv_path)
+    assert watcher.poll(now=3.0) == []
+    csv_path.write_text("a,b\n5,6\n7,8\n9,0\n")
+    assert watcher.poll(now=3.1) == []
+    assert watcher.poll(now=4.2) == [csv_path]
+
+
+def test_watch_processes_dropped_file(sample_csv, input_output_dirs):
+    """Files dropped into input/ are masked while watch mode runs."""
+    input_dir, output_dir = input_output_dirs
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=watch,
+        kwargs={"skip_encryption": True, "reports": "none", "poll_seconds": 0.05, "settle_seconds": 0.1, "stop": stop},
+    )
+    thread.start()
+    try:
+        # Written under a temporary name and renamed, like a finished upload
+        part = input_dir / "sample.csv.part"
+        part.write_text(sample_csv.read_text())
+        part.rename(input_dir / "sample.csv")
+
+        masked = output_dir / "sample" / "sample_masked.csv"
+        deadline = time.monotonic() + 10
+        while not masked.exists() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert masked.exists()
+    finally:
+        stop.set()
+        thread.join(timeout=10)
+
+    assert not thread.is_alive()
+    assert (output_dir / "pipeline_summary.json").exists()
+
+
+def test_watch_keeps_one_worker_pool(sample_csv, input_output_dirs, monkeypatch):
+    """With several workers, every batch runs in the same pool, started once."""
+    import src.processor as processor
+    import src.watch as watch_module
+
+    input_dir, output_dir = input_output_dirs
+    pools = []
+
+    class CountingPool(watch_module.ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            pools.append(self)
+
+    def no_new_pool(*args, **kwargs):
+        raise AssertionError("a batch started its own pool")
+
+    monkeypatch.setattr(watch_module, "ProcessPoolExecutor", CountingPool)
+    monkeypatch.setattr(processor, "ProcessPoolExecutor", no_new_pool)
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=watch,
+        kwargs={
+            "skip_encryption": True,
+            "workers": 2,
+            "reports": "none",
+            "poll_seconds": 0.05,
+            "settle_seconds": 0.1,
+            "stop": stop,
+        },
+    )
+    thread.start()
+    try:
+        for batch in ("ab", "cd"):
+            for name in batch:
+                (input_dir / f"{name}.csv").write_text(sample_csv.read_text())
+            masked = [output_dir / name / f"{name}_masked.csv" for name in batch]
+            deadline = time.monotonic() + 20
+            while not all(path.exists() for path in masked) and time.monotonic() < deadline:
+                time.sleep(0.05)
+            assert all(path.exists() for path in masked)
+    finally:
+        stop.set()
+        thread.join(timeout=20)
+
+    assert not thread.is_alive()
+    assert len(pools) == 1